@@ -5,6 +5,7 @@
 -- A ordem de drop é importante devido às dependências de chaves estrangeiras
 ---
 
+DROP TABLE IF EXISTS branch_commits CASCADE;
 DROP TABLE IF EXISTS parents_commits CASCADE;
 DROP TABLE IF EXISTS commits CASCADE;
 DROP TABLE IF EXISTS branch CASCADE;
@@ -178,6 +179,8 @@ CREATE TABLE parents_commits (
     id SERIAL PRIMARY KEY,    -- ID auto-incrementável para a tabela de junção
     parent_sha VARCHAR(40) NOT NULL, -- SHA do commit pai
     commit_id INTEGER NOT NULL,      -- Chave estrangeira para o commit filho
+    parent_number SMALLINT NOT NULL DEFAULT 0, -- Ordem do pai no commit (0 = primeiro pai, 1+ = branches mescladas)
+    parent_id BIGINT,                -- ID do commit pai, resolvido pelo ETL após a carga (NULL se o pai não foi carregado)
 
     -- Não estamos usando parent_sha como FK para a tabela commits diretamente,
     -- pois isso implicaria que todo parent_sha precisa ser um commit existente no DB.
@@ -189,9 +192,44 @@ CREATE TABLE parents_commits (
         FOREIGN KEY (commit_id)
         REFERENCES commits (id)
         ON DELETE CASCADE, -- Se o commit filho for excluído, suas relações de pais também são
+    CONSTRAINT fk_pc_parent_id
+        FOREIGN KEY (parent_id)
+        REFERENCES commits (id)
+        ON DELETE SET NULL,
     CONSTRAINT unq_pc_parent_commit UNIQUE (parent_sha, commit_id) -- Garante que a relação pai-filho é única
 );
 
+CREATE INDEX idx_pc_commit_id ON parents_commits (commit_id);
+CREATE INDEX idx_pc_parent_id ON parents_commits (parent_id);
+
+---
+
+-- Table: branch_commits
+-- Grafo de commits materializado pelo ETL: todos os commits alcançáveis a partir do último commit de cada branch.
+-- position é a posição, na cadeia de primeiros pais da branch (1 = commit mais antigo), do commit que levou o commit
+-- para a branch: o próprio commit, se ele está na cadeia, ou o merge que o trouxe.
+-- "O que entrou na branch depois do commit X" vira position > (position de X); "commits da branch X que não estão
+-- na main" vira um anti-join pela chave primária.
+CREATE TABLE branch_commits (
+    branch_id INTEGER NOT NULL,  -- Chave estrangeira para a branch
+    commit_id BIGINT NOT NULL,   -- Chave estrangeira para o commit alcançável a partir da branch
+    position INTEGER NOT NULL,   -- Posição (na cadeia de primeiros pais) em que o commit entrou na branch
+    first_parent BOOLEAN NOT NULL, -- TRUE se o commit está na cadeia de primeiros pais da branch
+    PRIMARY KEY (branch_id, commit_id),
+
+    CONSTRAINT fk_bc_branch
+        FOREIGN KEY (branch_id)
+        REFERENCES branch (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_bc_commit
+        FOREIGN KEY (commit_id)
+        REFERENCES commits (id)
+        ON DELETE CASCADE
+);
+
+CREATE INDEX idx_bc_branch_position ON branch_commits (branch_id, position);
+CREATE INDEX idx_bc_commit_id ON branch_commits (commit_id);
+
 ---
 
 -- Table: issue_assignees
@@ -228,4 +266,64 @@ CREATE TABLE pull_request_assignees (
         FOREIGN KEY (user_id)
         REFERENCES user_info (id)
         ON DELETE CASCADE
-);
\ No newline at end of file
+);
+
+---
+
+-- Schema: etl
+-- Tabelas de controle do ETL (fora do schema public para não aparecerem no schema do Vanna)
+CREATE SCHEMA IF NOT EXISTS etl;
+
+-- Table: etl.sync_state
+-- Marca d'água (maior updated_at/created_at carregado) por repositório e stream, usada no modo --incremental
+CREATE TABLE IF NOT EXISTS etl.sync_state (
+    repository VARCHAR(255) NOT NULL, -- Nome do repositório (owner/repo)
+    stream VARCHAR(100) NOT NULL,     -- Nome da stream do Airbyte (e.g., 'issues', 'commits')
+    watermark TIMESTAMP NOT NULL,     -- Maior cursor já carregado para a stream
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP, -- Quando a marca foi atualizada
+    PRIMARY KEY (repository, stream)
+);
+
+-- Table: etl.runs
+-- Uma linha por execução do ETL; execuções que não terminaram com sucesso podem ser retomadas com --resume
+CREATE TABLE IF NOT EXISTS etl.runs (
+    id BIGSERIAL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'running', -- 'running', 'success' ou 'failed'
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Table: etl.run_ledger
+-- Checkpoints de cada execução: extração, lotes concluídos e posição (último commit) de cada entidade por lote
+CREATE TABLE IF NOT EXISTS etl.run_ledger (
+    run_id BIGINT NOT NULL REFERENCES etl.runs (id) ON DELETE CASCADE,
+    scope VARCHAR(100) NOT NULL,         -- 'extract', 'batch', nome da entidade (e.g., 'commits') ou 'sql_transform:<schema>'
+    batch_number INTEGER NOT NULL DEFAULT 0, -- Número do lote (0 para etapas fora dos lotes)
+    position INTEGER NOT NULL DEFAULT 0, -- Linhas da entidade já commitadas no lote
+    last_key TEXT,                       -- Chave da última linha commitada (ou fingerprint do lote / schemas do cache)
+    status VARCHAR(20) NOT NULL,         -- 'running' ou 'done'
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, scope, batch_number)
+);
+
+-- Table: etl.data_version
+-- Versão dos dados do public, incrementada a cada escrita bem-sucedida (execução do ETL ou lote de webhooks); chave dos caches da API
+CREATE TABLE IF NOT EXISTS etl.data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id), -- Linha única
+    version BIGINT NOT NULL DEFAULT 0,
+    source VARCHAR(20),                  -- 'etl' ou 'webhook'
+    run_id BIGINT,                       -- Execução do ETL (etl.runs) que gerou a versão
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table: etl.sync_requests
+-- Pedidos de sincronização atendidos pelo worker em segundo plano (agendados ou via POST /admin/etl/sync)
+CREATE TABLE IF NOT EXISTS etl.sync_requests (
+    id BIGSERIAL PRIMARY KEY,
+    reason VARCHAR(20) NOT NULL,                     -- 'schedule' ou 'manual'
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',   -- 'pending', 'running', 'success' ou 'failed'
+    run_id BIGINT,                                   -- Execução do ETL (etl.runs) que atendeu o pedido
+    requested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
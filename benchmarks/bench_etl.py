@@ -0,0 +1,197 @@
+"""
+Benchmark offline do ETL com dados sintéticos (benchmarks/synthetic.py), sem GitHub/Airbyte.
+
+Para cada escala gera os dados, roda o transform (StreamTransformer) e carrega cada
+entidade com os loaders do ETL (linha a linha ou --bulk) em um Postgres local, na ordem
+das chaves estrangeiras, e materializa o grafo de commits (branch_commits). Reporta por etapa: linhas, tempo, linhas/s e pico de memória
+alocada (tracemalloc). Para o transform também reporta a memória retida pelo lote
+transformado depois que os registros de origem são liberados (o que fica em memória
+até o load).
+
+As tabelas do banco de benchmark são esvaziadas (TRUNCATE) antes de cada escala, então
+use um banco separado, criado com .docker/db/init_db.sql, e informe-o explicitamente
+em --database-url ou BENCH_DATABASE_URL. Sem banco, use --transform-only.
+
+Para pegar regressões: salve um resultado com --output e compare as próximas execuções
+com --baseline; etapas mais lentas (ou com mais memória) que a tolerância fazem o
+comando sair com código 1.
+
+Uso:
+    python -m benchmarks.bench_etl --scales small,medium --database-url postgresql+psycopg2://.../oraculo_bench
+    python -m benchmarks.bench_etl --bulk --output bench.json
+    python -m benchmarks.bench_etl --baseline bench.json --tolerance 0.2
+    python -m benchmarks.bench_etl --transform-only --scales large
+
+Observação: o tracemalloc deixa o Python mais lento; use --no-tracemalloc para medir só o tempo.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from benchmarks.synthetic import generate
+from src.etl.transform import StreamTransformer
+
+SCALES = {
+    "small": {"repos": 5, "users": 50, "commits": 2_000},
+    "medium": {"repos": 20, "users": 500, "commits": 20_000},
+    "large": {"repos": 50, "users": 2_000, "commits": 100_000},
+}
+
+# Tabelas do ETL esvaziadas antes de cada escala
+TABLES = ["branch_commits", "parents_commits", "issue_assignees", "pull_request_assignees", "commits", "branch", "pull_requests", "issue", "milestone", "repository", "user_info"]
+
+
+class StageRecorder:
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    ''' Executa func() medindo tempo e pico de memória alocada durante a etapa.
+        rows(resultado) informa quantas linhas a etapa processou.
+    '''
+    def measure(self, name, func, rows):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - baseline if self.trace_memory else None
+
+        count = rows(result)
+        self.stages[name] = {
+            "rows": count,
+            "seconds": seconds,
+            "rows_per_sec": count / seconds if seconds > 0 else None,
+            "peak_mb": peak / 2 ** 20 if peak is not None else None,
+        }
+        return result
+
+
+def run_scale(scale, args):
+    recorder = StageRecorder(trace_memory=not args.no_tracemalloc)
+
+    start_memory = tracemalloc.get_traced_memory()[0] if recorder.trace_memory else None
+    read_result = recorder.measure("generate", lambda: generate(seed=args.seed, **SCALES[scale]), lambda result: sum(result.counts().values()))
+    batch = recorder.measure("transform", lambda: StreamTransformer().collect(read_result), lambda result: sum(len(rows) for rows in result.values()))
+
+    # Memória que o lote mantém viva sem os registros de origem (referências a objetos do Airbyte inclusas)
+    del read_result
+    gc.collect()
+    if recorder.trace_memory:
+        recorder.stages["transform"]["retained_mb"] = (tracemalloc.get_traced_memory()[0] - start_memory) / 2 ** 20
+
+    if not args.transform_only:
+        load_batch(batch, recorder, args)
+    return recorder.stages
+
+
+def load_batch(batch, recorder, args):
+    from sqlalchemy import create_engine, text
+    from src.etl.ETL import ETL, LOAD_DEPENDENCIES
+    from src.etl.bulk_loader import BulkLoader
+    from src.etl.commit_graph import CommitGraph
+    from src.etl.id_resolver import IdResolver
+
+    engine = create_engine(args.database_url)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+
+    etl = ETL([], [], None, bulk_load=args.bulk)
+    etl.engine = engine
+    etl.id_resolver = IdResolver(engine)
+    etl.id_resolver.load()
+    loader = BulkLoader(engine, etl.localize_timestamps) if args.bulk else etl
+
+    # LOAD_DEPENDENCIES está em ordem topológica; cada entidade é medida isoladamente
+    for entity in LOAD_DEPENDENCIES:
+        rows = batch[entity]
+        ok = recorder.measure(f"load.{entity}", lambda: getattr(loader, f"load_{entity}")(rows), lambda result: len(rows))
+        if ok is False:
+            raise RuntimeError(f"Falha ao carregar {entity}")
+
+    recorder.measure("commit_graph", lambda: CommitGraph(engine).build(), lambda report: report["rows"])
+    engine.dispose()
+
+
+def print_report(results):
+    print(f"{'escala':<8} {'etapa':<20} {'linhas':>9} {'tempo (s)':>10} {'linhas/s':>12} {'pico (MB)':>10} {'retido (MB)':>12}")
+    for scale, stages in results.items():
+        for name, stage in stages.items():
+            rate = f"{stage['rows_per_sec']:.0f}" if stage['rows_per_sec'] else "-"
+            peak = f"{stage['peak_mb']:.1f}" if stage['peak_mb'] is not None else "-"
+            retained = f"{stage['retained_mb']:.1f}" if stage.get('retained_mb') is not None else "-"
+            print(f"{scale:<8} {name:<20} {stage['rows']:>9} {stage['seconds']:>10.3f} {rate:>12} {peak:>10} {retained:>12}")
+
+
+''' Compara com um resultado salvo: retorna as etapas com vazão ou pico de memória piores que a tolerância.
+'''
+def regressions(results, baseline, tolerance):
+    found = []
+    for scale, stages in results.items():
+        for name, stage in stages.items():
+            previous = baseline.get(scale, {}).get(name)
+            if previous is None:
+                continue
+            if previous.get("rows_per_sec") and stage["rows_per_sec"] is not None and stage["rows_per_sec"] < previous["rows_per_sec"] * (1 - tolerance):
+                found.append(f"{scale}/{name}: {stage['rows_per_sec']:.0f} linhas/s (antes {previous['rows_per_sec']:.0f})")
+            for field, label in (("peak_mb", "pico"), ("retained_mb", "retido")):
+                if previous.get(field) and stage.get(field) is not None and stage[field] > previous[field] * (1 + tolerance):
+                    found.append(f"{scale}/{name}: {label} de {stage[field]:.1f} MB (antes {previous[field]:.1f} MB)")
+    return found
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark offline do ETL com dados sintéticos do GitHub")
+    parser.add_argument("--scales", default="small,medium", help=f"Escalas separadas por vírgula ({', '.join(SCALES)})")
+    parser.add_argument("--bulk", action="store_true", help="Usa o BulkLoader (execute_values) em vez dos loaders linha a linha")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"), help="Banco de benchmark (será esvaziado a cada escala)")
+    parser.add_argument("--transform-only", action="store_true", help="Mede só geração e transform, sem banco")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Não mede memória (tempos sem o overhead do tracemalloc)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Salva o resultado em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa aceita em relação ao baseline (padrão: 0.2)")
+    args = parser.parse_args(argv)
+
+    unknown = [scale for scale in args.scales.split(",") if scale not in SCALES]
+    if unknown:
+        parser.error(f"Escalas desconhecidas: {', '.join(unknown)}")
+    if not args.transform_only and not args.database_url:
+        parser.error("Informe o banco de benchmark com --database-url (ou BENCH_DATABASE_URL), ou use --transform-only.")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+
+    results = {}
+    for scale in args.scales.split(","):
+        print(f"--- Escala {scale}: {SCALES[scale]} ---")
+        results[scale] = run_scale(scale, args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Resultado salvo em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for message in found:
+            print(f"REGRESSÃO {message}")
+        if found:
+            return 1
+        print("Nenhuma regressão em relação ao baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark da latência do MyVanna.run_sql: uma conexão nova por consulta (caminho antigo,
+psycopg2.connect + close) contra o pool de conexões (src/api/database/pool.py).
+
+Roda a mesma consulta N vezes em cada caminho, sequencialmente e com várias threads (como o
+threadpool da API), e reporta p50/p95/média por consulta e consultas/s.
+
+Uso:
+    python -m benchmarks.bench_run_sql --database-url postgresql://.../oraculo_bench
+    python -m benchmarks.bench_run_sql --queries 2000 --threads 8 --sql "SELECT count(*) FROM commits"
+"""
+import os
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from src.api.database.pool import ConnectionPool
+
+DEFAULT_SQL = "SELECT 1"
+
+
+def connect_per_query(database_url, sql):
+    conn = psycopg2.connect(database_url)
+    cursor = conn.cursor()
+    cursor.execute(sql)
+    result = cursor.fetchall()
+    conn.close()
+    return result
+
+
+def pooled(pool, sql):
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def measure(execute, queries, threads):
+    def timed(_):
+        start = time.perf_counter()
+        execute()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(timed, range(queries)))
+    elapsed = time.perf_counter() - start
+    return {
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p95_ms": 1000 * latencies[int(len(latencies) * 0.95) - 1],
+        "mean_ms": 1000 * statistics.fmean(latencies),
+        "qps": queries / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"), help="Banco consultado (ou BENCH_DATABASE_URL)")
+    parser.add_argument("--sql", default=DEFAULT_SQL, help="Consulta executada em cada chamada")
+    parser.add_argument("--queries", type=int, default=500, help="Consultas por caminho")
+    parser.add_argument("--threads", type=int, default=4, help="Threads da rodada concorrente")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("informe --database-url ou BENCH_DATABASE_URL")
+
+    pool = ConnectionPool(args.database_url, maxconn=args.threads)
+    pooled(pool, args.sql) # Aquecimento: a primeira conexão do pool não entra na medição
+
+    print(f"{args.queries} consultas: {args.sql}")
+    print(f"{'caminho':<22}{'threads':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'média (ms)':>12}{'consultas/s':>13}")
+    for threads in (1, args.threads):
+        for name, execute in (("connect por consulta", lambda: connect_per_query(args.database_url, args.sql)), ("pool", lambda: pooled(pool, args.sql))):
+            result = measure(execute, args.queries, threads)
+            print(f"{name:<22}{threads:>8}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['mean_ms']:>12.2f}{result['qps']:>13.0f}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark da normalização de fuso horário dos timestamps do ETL.
+
+Compara o caminho antigo (pytz.timezone(...).localize por linha, como em
+handlingTimeZoneToPostgres) com a conversão vetorizada por lote (localize_many)
+e confere que os dois produzem exatamente os mesmos valores.
+
+Uso:
+    python -m benchmarks.bench_timezone [quantidade]   (padrão: 1.000.000)
+"""
+import sys
+import time
+import random
+import datetime
+
+import pytz
+
+from src.etl.timezone import TIMEZONE, localize_many
+
+
+def per_row(values, timezone):
+    result = []
+    for value in values:
+        # Mesmo código do handlingTimeZoneToPostgres original
+        brazil_tz = pytz.timezone(timezone)
+        result.append(brazil_tz.localize(value, is_dst=None))
+    return result
+
+
+def sample(amount, timezone, seed=42):
+    random.seed(seed)
+    start = datetime.datetime(2015, 1, 1)
+    values = []
+    while len(values) < amount:
+        value = start + datetime.timedelta(seconds=random.randint(0, 10 ** 9))
+        try:
+            pytz.timezone(timezone).localize(value, is_dst=None)
+        except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError):
+            continue # Horários da troca de horário de verão levantam erro nos dois caminhos
+        values.append(value)
+    return values
+
+
+def main(amount):
+    values = sample(amount, TIMEZONE)
+    print(f"{amount} timestamps, fuso {TIMEZONE}")
+
+    start = time.perf_counter()
+    expected = per_row(values, TIMEZONE)
+    per_row_seconds = time.perf_counter() - start
+    print(f"por linha (pytz.localize): {per_row_seconds:.2f}s")
+
+    start = time.perf_counter()
+    result = localize_many(values, TIMEZONE)
+    vectorized_seconds = time.perf_counter() - start
+    print(f"vetorizado (localize_many): {vectorized_seconds:.2f}s")
+
+    assert result == expected and all(a.utcoffset() == b.utcoffset() for a, b in zip(result, expected))
+    print(f"Resultados idênticos. Speedup: {per_row_seconds / vectorized_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,239 @@
+"""
+Gerador de dados sintéticos do GitHub para testar e medir o ETL sem rede.
+
+Produz um objeto compatível com o read_result do Airbyte (atributo .streams com
+as streams issue_milestones, issues, pull_requests, pull_request_commits, commits
+e assignees), no mesmo formato de registro que o StreamTransformer consome.
+
+Distribuições:
+    - atividade dos usuários segue uma lei de potência (Zipf): poucos usuários fazem
+      a maior parte dos commits, issues e PRs, e cada repositório tem seus próprios
+      contribuidores principais;
+    - tamanho dos repositórios (commits por repo) segue uma distribuição de Pareto;
+    - commits formam uma cadeia por branch (~70% na main), com ~8% de merges (dois
+      pais) e ~3% sem autor vinculado (ignorados pelo transform, como no GitHub);
+    - ~1 PR a cada 8 commits e ~1,5 issue por PR, com numeração compartilhada por
+      repositório, 0-3 assignees e milestone em ~30% delas;
+    - tamanho dos textos segue uma log-normal.
+
+Uso:
+    from benchmarks.synthetic import generate
+    read_result = generate(repos=10, users=200, commits=10_000)
+"""
+import random
+import datetime
+from types import SimpleNamespace
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt "
+    "ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco "
+    "laboris nisi ut aliquip ex ea commodo consequat. Duis aute irure dolor in reprehenderit in "
+    "voluptate velit esse cillum dolore eu fugiat nulla pariatur. "
+) * 40
+
+START = datetime.datetime(2020, 1, 1)
+PERIOD_DAYS = 5 * 365
+
+MAIN_BRANCH_SHARE = 0.7
+MERGE_SHARE = 0.08
+NO_AUTHOR_SHARE = 0.03
+COMMITS_PER_PR = 8
+ISSUES_PER_PR = 1.5
+MILESTONE_SHARE = 0.3
+PR_STATES = (("merged", 0.65), ("closed", 0.15), ("open", 0.2))
+ASSIGNEE_WEIGHTS = (0.5, 0.3, 0.15, 0.05) # Chance de 0, 1, 2 ou 3 assignees
+
+
+class SyntheticReadResult:
+    def __init__(self, streams):
+        self.streams = streams
+
+    def counts(self):
+        return {stream_name: len(records) for stream_name, records in self.streams.items()}
+
+
+class SyntheticGitHub:
+    def __init__(self, repos, users, commits, seed=42):
+        if repos < 1 or users < 1 or commits < repos:
+            raise ValueError("É preciso ao menos 1 repositório, 1 usuário e 1 commit por repositório.")
+        self.n_repos = repos
+        self.n_users = users
+        self.n_commits = commits
+        self.rng = random.Random(seed)
+
+        self.users = [{"id": 1000 + i, "login": f"dev-{i}", "html_url": f"https://github.com/dev-{i}"} for i in range(users)]
+        # Pesos acumulados de Zipf (s=1.1) para sortear usuários por atividade
+        self.user_cum_weights = []
+        total = 0.0
+        for rank in range(users):
+            total += 1.0 / (rank + 1) ** 1.1
+            self.user_cum_weights.append(total)
+
+        self.next_ids = {"milestone": 1, "issue": 1, "pull_request": 1}
+        self.streams = {"assignees": [], "issue_milestones": [], "issues": [], "pull_requests": [], "pull_request_commits": [], "commits": []}
+
+    def generate(self):
+        for index, commits in enumerate(self.repo_sizes()):
+            self.generate_repository(index, commits)
+        return SyntheticReadResult(self.streams)
+
+    # --- Sorteios ---
+    ''' Divide os commits entre os repositórios com pesos de Pareto (alguns repos grandes, muitos pequenos).
+    '''
+    def repo_sizes(self):
+        weights = [self.rng.paretovariate(1.2) for _ in range(self.n_repos)]
+        total = sum(weights)
+        spare = self.n_commits - self.n_repos # Cada repositório tem ao menos um commit
+        sizes = [1 + int(spare * weight / total) for weight in weights]
+        sizes[weights.index(max(weights))] += self.n_commits - sum(sizes)
+        return sizes
+
+    def user(self, offset):
+        # offset rotaciona o ranking, então cada repositório tem contribuidores principais diferentes
+        rank = self.rng.choices(range(self.n_users), cum_weights=self.user_cum_weights)[0]
+        return self.users[(rank + offset) % self.n_users]
+
+    ''' Horários entre 8h e 22h: nunca caem na troca de horário de verão (que acontece de madrugada),
+        então a normalização de fuso do ETL não rejeita nenhum deles.
+    '''
+    def timestamp(self, after=None):
+        if after is None:
+            day = START + datetime.timedelta(days=self.rng.randrange(PERIOD_DAYS))
+        else:
+            day = after.replace(hour=0, minute=0, second=0) + datetime.timedelta(days=int(self.rng.expovariate(1 / 3)))
+        return day.replace(hour=self.rng.randint(8, 21), minute=self.rng.randrange(60), second=self.rng.randrange(60))
+
+    def text(self, mean_length=5.0, empty_share=0.1):
+        if self.rng.random() < empty_share:
+            return None
+        return LOREM[:min(int(self.rng.lognormvariate(mean_length, 1.0)), len(LOREM))]
+
+    def assignees(self, offset):
+        amount = self.rng.choices(range(len(ASSIGNEE_WEIGHTS)), weights=ASSIGNEE_WEIGHTS)[0]
+        assignees = {}
+        for _ in range(amount):
+            user = self.user(offset)
+            assignees[user['id']] = user
+        return list(assignees.values())
+
+    def next_id(self, entity):
+        value = self.next_ids[entity]
+        self.next_ids[entity] += 1
+        return value
+
+    # --- Repositório ---
+    def generate_repository(self, index, n_commits):
+        repository = f"org-{index % 7}/repo-{index}"
+        offset = index * 17
+        contributors = {}
+
+        shas = self.generate_commits(repository, index, offset, n_commits, contributors)
+        milestones = self.generate_milestones(repository, offset, contributors)
+
+        # Issues e PRs compartilham a numeração do repositório
+        n_prs = max(1, n_commits // COMMITS_PER_PR)
+        n_issues = int(n_prs * ISSUES_PER_PR)
+        kinds = ["pull_request"] * n_prs + ["issue"] * n_issues
+        self.rng.shuffle(kinds)
+
+        pr_shas = list(shas)
+        self.rng.shuffle(pr_shas)
+        for number, kind in enumerate(kinds, start=1):
+            if kind == "issue":
+                self.generate_issue(repository, number, offset, milestones, contributors)
+            else:
+                self.generate_pull_request(repository, number, offset, milestones, contributors, pr_shas)
+
+        # Stream assignees: usuários atribuíveis do repositório
+        for user in contributors.values():
+            self.streams["assignees"].append(SimpleNamespace(id=user['id'], login=user['login'], html_url=user['html_url'], repository=repository))
+
+    def generate_commits(self, repository, index, offset, n_commits, contributors):
+        branches = ["main"] + [f"feature-{index}-{number}" for number in range(min(5, n_commits // 50))]
+        heads = {}
+        shas = []
+        first_day = START + datetime.timedelta(days=self.rng.randrange(PERIOD_DAYS // 2))
+        span_days = (START + datetime.timedelta(days=PERIOD_DAYS) - first_day).days
+        for number in range(n_commits):
+            branch = "main" if len(branches) == 1 or self.rng.random() < MAIN_BRANCH_SHARE else self.rng.choice(branches[1:])
+            sha = f"{index:04x}{number:012x}".ljust(40, "0")
+            # Commits espalhados em ordem pelo histórico do repositório
+            day = first_day + datetime.timedelta(days=span_days * number // n_commits)
+            created_at = day.replace(hour=self.rng.randint(8, 21), minute=self.rng.randrange(60), second=self.rng.randrange(60))
+
+            parents = []
+            head = heads.get(branch, heads.get("main"))
+            if head is not None:
+                parents.append({"sha": head})
+            feature_heads = [heads[name] for name in branches[1:] if name in heads]
+            if branch == "main" and feature_heads and self.rng.random() < MERGE_SHARE:
+                parents.append({"sha": self.rng.choice(feature_heads)})
+            heads[branch] = sha
+
+            author = None
+            if self.rng.random() >= NO_AUTHOR_SHARE:
+                author = self.user(offset)
+                contributors[author['id']] = author
+
+            message = f"Commit {number} em {branch}"
+            if self.rng.random() < 0.4:
+                message += "\n\n" + self.text(empty_share=0)
+
+            self.streams["commits"].append(SimpleNamespace(
+                sha=sha, repository=repository, branch=branch, created_at=created_at,
+                html_url=f"https://github.com/{repository}/commit/{sha}", commit={"message": message},
+                author=author, parents=parents
+            ))
+            shas.append(sha)
+        return shas
+
+    def generate_milestones(self, repository, offset, contributors):
+        milestones = []
+        for number in range(1, self.rng.randint(0, 4) + 1):
+            creator = self.user(offset)
+            contributors[creator['id']] = creator
+            created_at = self.timestamp()
+            milestone = SimpleNamespace(
+                id=self.next_id("milestone"), repository=repository, title=f"v{number}.0", description=self.text(4.0),
+                number=number, state=self.rng.choice(["open", "closed"]), created_at=created_at,
+                updated_at=self.timestamp(after=created_at), creator=creator
+            )
+            self.streams["issue_milestones"].append(milestone)
+            milestones.append(milestone)
+        return milestones
+
+    def common_fields(self, repository, number, offset, milestones, contributors, kind):
+        user = self.user(offset)
+        assignees = self.assignees(offset)
+        for person in [user] + assignees:
+            contributors[person['id']] = person
+        milestone = None
+        if milestones and self.rng.random() < MILESTONE_SHARE:
+            milestone = {"id": self.rng.choice(milestones).id}
+        created_at = self.timestamp()
+        return {
+            "repository": repository, "number": number, "title": f"{kind.capitalize()} {number} de {repository}",
+            "body": self.text(), "html_url": f"https://github.com/{repository}/{kind}/{number}",
+            "created_at": created_at, "updated_at": self.timestamp(after=created_at),
+            "user": user, "assignees": assignees, "milestone": milestone
+        }
+
+    def generate_issue(self, repository, number, offset, milestones, contributors):
+        fields = self.common_fields(repository, number, offset, milestones, contributors, "issues")
+        self.streams["issues"].append(SimpleNamespace(id=self.next_id("issue"), **fields))
+
+    def generate_pull_request(self, repository, number, offset, milestones, contributors, pr_shas):
+        fields = self.common_fields(repository, number, offset, milestones, contributors, "pull")
+        state = self.rng.choices([name for name, _ in PR_STATES], weights=[share for _, share in PR_STATES])[0]
+        merged_at = self.timestamp(after=fields["created_at"]) if state == "merged" else None
+        self.streams["pull_requests"].append(SimpleNamespace(
+            id=self.next_id("pull_request"), state="open" if state == "open" else "closed", merged_at=merged_at, **fields
+        ))
+
+        # Cada PR leva de 1 a 6 commits ainda não vinculados do repositório
+        for _ in range(min(len(pr_shas), self.rng.randint(1, 6))):
+            self.streams["pull_request_commits"].append(SimpleNamespace(sha=pr_shas.pop(), pull_number=number, repository=repository))
+
+
+def generate(repos, users, commits, seed=42):
+    return SyntheticGitHub(repos, users, commits, seed=seed).generate()
@@ -1,4 +1,5 @@
 from src.etl.ETL import ETL 
+from src.etl.worker import start_worker, SYNC_INTERVAL
 import uvicorn
 from src.assets.aux.flags import flags
 
@@ -15,22 +16,33 @@ repos = ["bpthiago/oraculo-documentation", "bpthiago/oraculo"]
 # Quais informações deseja trazer do github
 streams = ["issues", "repositories", "pull_requests", "commits", "teams", "users", "issue_milestones", "projects_v2", "team_members", "team_memberships", "assignees", "branches","pull_request_commits"]
 
-if(flags.etl == True or flags.etl_only == True):
-    etl = ETL(repos, streams, GITHUB_TOKEN)
-    try:
-        etl.run()
-    except Exception as e:
-        print(f"Ocorreu um erro inesperado: {e}")
+if __name__ == "__main__":
+    etl_options = dict(bulk_load=flags.bulk_load, incremental=flags.incremental, sql_transform=flags.sql_transform, batch_size=flags.batch_size, load_workers=flags.load_workers, extract_shards=flags.extract_shards, extract_workers=flags.extract_workers, resume=flags.resume, commit_every=flags.commit_every, cache_backend=flags.cache_backend, cache_retention=flags.cache_retention, maintenance=not flags.skip_maintenance, commit_graph=not flags.skip_commit_graph, swap_load=flags.swap_load)
 
     if(flags.etl_only == True):
+        etl = ETL(repos, streams, GITHUB_TOKEN, **etl_options)
+        try:
+            etl.run()
+        except Exception as e:
+            print(f"Ocorreu um erro inesperado: {e}")
         print("Fim do programa")
         exit(0)
 
-print("Prosseguindo para inicio da API.")
-# --- API ---
+    # --etl: sincronizações incrementais em um processo separado; a API sobe sem esperar a extração
+    worker = None
+    if(flags.etl == True):
+        worker = start_worker(repos, streams, GITHUB_TOKEN, etl_options, interval=SYNC_INTERVAL if flags.sync_interval is None else flags.sync_interval)
+
+    print("Prosseguindo para inicio da API.")
+    # --- API ---
 
-api_root_path = "src.api.app"
-port = 8000
-config = uvicorn.Config(api_root_path + ":app",host="0.0.0.0", port=port, log_level="info", reload=True)
-server = uvicorn.Server(config)
-server.run()
\ No newline at end of file
+    api_root_path = "src.api.app"
+    port = 8000
+    config = uvicorn.Config(api_root_path + ":app",host="0.0.0.0", port=port, log_level="info", reload=True)
+    server = uvicorn.Server(config)
+    try:
+        server.run()
+    finally:
+        if worker is not None:
+            worker.terminate()
+            worker.join()
@@ -1,4 +1,6 @@
 from src.api.endpoints.routes import router
+from src.api.endpoints.webhooks import router as webhooks_router
+from src.api.endpoints.admin import router as admin_router
 
 from fastapi import FastAPI, HTTPException
 from google import genai
@@ -7,4 +9,6 @@ from src.api.database.MyVanna import MyVanna
 
 app = FastAPI()
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
+app.include_router(webhooks_router)
+app.include_router(admin_router)
\ No newline at end of file
@@ -0,0 +1,82 @@
+from src.assets.pattern.singleton import SingletonMeta
+
+import hmac
+from sqlalchemy import create_engine, text
+
+from src.etl.data_version import DataVersion
+from src.etl.sync_requests import SyncRequests
+from src.api.database.result_cache import ResultCache
+from src.etl.telemetry import configure_logging, get_logger
+
+from src.assets.aux.env import env
+# Admin env vars
+ADMIN_TOKEN = env.get("ETL_ADMIN_TOKEN", "")
+
+logger = get_logger("admin")
+
+RECENT_RUNS_SQL = "SELECT id, status, started_at, finished_at FROM etl.runs ORDER BY id DESC LIMIT :limit"
+
+
+class AdminError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+''' Administração da sincronização em segundo plano (Authorization: Bearer <ETL_ADMIN_TOKEN>).
+    A API não executa o ETL: pedidos vão para etl.sync_requests e são atendidos pelo worker
+    (src/etl/worker.py); o status vem das tabelas de controle do schema etl e, para o cache de
+    resultados do Vanna, do ResultCache deste processo.
+'''
+class AdminController(metaclass=SingletonMeta):
+    def __init__(self, token=ADMIN_TOKEN, engine=None):
+        self.token = token
+        self.engine = engine # Criado na primeira requisição
+        self.requests = None
+        self.data_version = None
+        configure_logging()
+
+    def authorize(self, authorization):
+        if not self.token:
+            raise AdminError(503, "ETL_ADMIN_TOKEN não configurado.")
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), self.token.encode()):
+            raise AdminError(401, "Token de administração inválido.")
+
+    def connect(self):
+        if self.engine is None:
+            self.engine = create_engine(self.database_url(), pool_pre_ping=True)
+        if self.requests is None:
+            self.requests = SyncRequests(self.engine)
+            self.data_version = DataVersion(self.engine)
+
+    def trigger(self, authorization):
+        self.authorize(authorization)
+        self.connect()
+        request, created = self.requests.request("manual")
+        return {"status": "queued" if created else "already_queued", "request": request}
+
+    def status(self, authorization):
+        self.authorize(authorization)
+        self.connect()
+        with self.engine.connect() as connection:
+            exists = connection.execute(text("SELECT to_regclass('etl.runs') IS NOT NULL")).scalar()
+            runs = connection.execute(text(RECENT_RUNS_SQL), {'limit': 5}).fetchall() if exists else []
+        return {
+            "data_version": self.data_version.current(),
+            "requests": self.requests.recent(),
+            "runs": [dict(row._mapping) for row in runs],
+            "result_cache": ResultCache().stats(),
+        }
+
+    def request(self, authorization, request_id):
+        self.authorize(authorization)
+        self.connect()
+        request = self.requests.get(request_id)
+        if request is None:
+            raise AdminError(404, f"Sincronização {request_id} não encontrada.")
+        return request
+
+    def database_url(self):
+        return f"postgresql+psycopg2://{env['DB_USER']}:{env['DB_PASSWORD']}@{env['DB_HOST']}:{env['DB_PORT']}/{env['DB_NAME']}"
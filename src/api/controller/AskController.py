@@ -12,6 +12,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import SystemMessage, HumanMessage
 from google import genai
 from src.api.database.MyVanna import MyVanna
+from src.api.database.pagination import encode_token, decode_token
 
 from src.assets.aux.env import env
 # Gemini env vars
@@ -81,7 +82,11 @@ class AskController(metaclass=SingletonMeta):
                 if "SELECT" not in sql_gerado.upper():
                     return {"output": "Não consegui entender sua pergunta bem o suficiente para gerar uma resposta SQL válida."}
 
-                resultado = self.vn.run_sql(sql_gerado)
+                try:
+                    _, resultado, has_more = self.vn.run_sql_page(sql_gerado)
+                except Exception as e:
+                    print(f"Erro ao executar SQL: {e}")
+                    resultado, has_more = [], False
 
                 if not resultado:
                     return {"output": "A consulta foi feita, mas não há dados correspondentes no banco."}
@@ -101,6 +106,9 @@ class AskController(metaclass=SingletonMeta):
                     }
                 )
                 texto = response.parsed[0].texto
+                # Resultado maior que uma página: o cliente busca o resto em /ask/page, sem passar pelo LLM
+                if has_more:
+                    return {"output": texto, "next_page": encode_token(sql_gerado, len(resultado))}
                 return {"output": texto}
 
             # -----------------------------
@@ -166,3 +174,14 @@ class AskController(metaclass=SingletonMeta):
 
         except Exception as e:
             return {"output": f"Ocorreu um erro ao processar sua pergunta: {str(e)}"}
+
+    ''' Página seguinte do resultado de uma pergunta, a partir do token de /ask (ou da página anterior).
+    '''
+    def page(self, token):
+        sql, offset = decode_token(token)
+        columns, rows, has_more = self.vn.run_sql_page(sql, offset=offset)
+        return {
+            "columns": columns,
+            "rows": rows,
+            "next_page": encode_token(sql, offset + len(rows)) if has_more else None,
+        }
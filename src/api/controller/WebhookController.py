@@ -0,0 +1,162 @@
+from src.assets.pattern.singleton import SingletonMeta
+
+import hmac
+import json
+import time
+import queue
+import hashlib
+import threading
+from functools import partial
+from sqlalchemy import create_engine
+
+from src.etl.bulk_loader import BulkLoader
+from src.etl.migrations import upgrade_schema
+from src.etl.data_version import DataVersion
+from src.etl.timezone import TIMEZONE, localize_many
+from src.etl.webhook_transform import WebhookTransformer, merge_batches
+from src.etl.telemetry import configure_logging, get_logger
+
+from src.assets.aux.env import env
+# Webhook env vars
+WEBHOOK_SECRET = env.get("GITHUB_WEBHOOK_SECRET", "")
+QUEUE_SIZE = int(env.get("WEBHOOK_QUEUE_SIZE", "1000"))
+BATCH_SIZE = int(env.get("WEBHOOK_BATCH_SIZE", "100"))
+FLUSH_SECONDS = float(env.get("WEBHOOK_FLUSH_SECONDS", "1.0"))
+
+logger = get_logger("webhooks")
+
+
+class WebhookError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+''' Ingestão dos webhooks do GitHub (push, issues, pull_request).
+    A requisição só valida a assinatura, transforma o payload em linhas no formato do ETL e
+    enfileira; uma thread escreve em lote (até BATCH_SIZE eventos ou FLUSH_SECONDS de espera)
+    pelo BulkLoader, o mesmo caminho de escrita do ETL. A fila é limitada: cheia, a requisição
+    recebe 503 e o GitHub registra a entrega como falha (pode ser reenviada).
+'''
+class WebhookController(metaclass=SingletonMeta):
+    def __init__(self, secret=WEBHOOK_SECRET, engine=None, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.secret = secret
+        self.engine = engine # Criado na primeira escrita
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.transformer = WebhookTransformer()
+        self.data_version = None # Criado na primeira escrita
+        self.worker = None
+        self.lock = threading.Lock() # Início da thread de escrita e stats (requisições e consumidor)
+        self.stats = {"received": 0, "written": 0, "failed": 0, "rejected": 0}
+        configure_logging()
+
+    # --- Requisição ---
+    def verify(self, body, signature):
+        if not signature or not signature.startswith("sha256="):
+            return False
+        expected = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature[len("sha256="):])
+
+    def receive(self, event, body, signature):
+        if not self.secret:
+            raise WebhookError(503, "GITHUB_WEBHOOK_SECRET não configurado.")
+        if not self.verify(body, signature):
+            raise WebhookError(401, "Assinatura inválida.")
+
+        if event == "ping":
+            return {"status": "pong"}
+        if not self.transformer.supports(event):
+            return {"status": "ignored", "event": event}
+
+        try:
+            batch = self.transformer.transform(event, json.loads(body))
+        except (ValueError, KeyError, TypeError) as e:
+            raise WebhookError(400, f"Payload inválido para o evento {event}: {e}")
+
+        rows = sum(len(entity_rows) for entity_rows in batch.values())
+        if rows == 0:
+            return {"status": "ignored", "event": event}
+
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            with self.lock:
+                self.stats["rejected"] += 1
+            logger.warning("Fila de webhooks cheia; evento %s rejeitado.", event)
+            raise WebhookError(503, "Fila de webhooks cheia, tente novamente.")
+        with self.lock:
+            self.stats["received"] += 1
+        self.start()
+        return {"status": "queued", "event": event, "rows": rows}
+
+    # --- Escrita ---
+    def start(self):
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.consume, name="webhook-writer", daemon=True)
+                self.worker.start()
+
+    def consume(self):
+        while True:
+            batches = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batches) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batches.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.write(batches)
+
+    ''' Escreve na thread atual tudo o que estiver na fila (desligamento da API e testes).
+    '''
+    def drain(self):
+        while True:
+            batches = []
+            while len(batches) < self.batch_size:
+                try:
+                    batches.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batches:
+                return
+            self.write(batches)
+
+    def write(self, batches):
+        try:
+            if self.engine is None:
+                self.engine = create_engine(self.database_url(), pool_pre_ping=True)
+                upgrade_schema(self.engine)
+            ok = BulkLoader(self.engine, partial(localize_many, timezone=TIMEZONE)).load_batch(merge_batches(batches))
+        except Exception as e:
+            logger.error("Erro ao gravar eventos de webhook: %s", e)
+            ok = False
+        finally:
+            for _ in batches:
+                self.queue.task_done()
+
+        with self.lock:
+            self.stats["written" if ok else "failed"] += len(batches)
+        if ok:
+            logger.info("%d eventos de webhook gravados.", len(batches))
+            self.bump_data_version()
+        else:
+            logger.error("%d eventos de webhook não foram gravados.", len(batches))
+        return ok
+
+    # Caches keyed na versão dos dados deixam de valer; os eventos já estão gravados mesmo se falhar
+    def bump_data_version(self):
+        try:
+            if self.data_version is None:
+                self.data_version = DataVersion(self.engine)
+            self.data_version.bump("webhook")
+        except Exception as e:
+            logger.error("Erro ao atualizar a versão dos dados: %s", e)
+
+    def database_url(self):
+        return f"postgresql+psycopg2://{env['DB_USER']}:{env['DB_PASSWORD']}@{env['DB_HOST']}:{env['DB_PORT']}/{env['DB_NAME']}"
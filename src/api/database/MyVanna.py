@@ -3,8 +3,14 @@ from src.assets.pattern.singleton import SingletonMeta
 from vanna.vannadb import VannaDB_VectorStore
 from vanna.google import GoogleGeminiChat
 from vanna.chromadb import ChromaDB_VectorStore
-import psycopg2
 import os
+import threading
+
+from src.api.database.schema import SCHEMA_FINGERPRINT_SQL, SCHEMA_CATALOG_SQL, render_schema
+from src.api.database.training import IncrementalTraining
+from src.api.database.pool import ConnectionPool
+from src.api.database.pagination import fetch_page, MAX_ROWS
+from src.api.database.result_cache import ResultCache, normalize_sql, read_data_version
 
 from src.assets.aux.env import env
 # DB env vars
@@ -15,21 +21,24 @@ DB_USER = env["DB_USER"]
 DB_PASSWORD = env["DB_PASSWORD"]
 DB_URL = env["DB_URL"]
 
-class ChromaDB_VectorStoreReset(ChromaDB_VectorStore):
+# Chroma persistente: o treino fica no disco entre execuções e só muda o que mudou no prepare()
+CHROMA_PATH = env.get("VANNA_CHROMA_PATH", ".vanna_chroma")
+CHROMA_RESET = env.get("VANNA_CHROMA_RESET", "false").lower() == "true"
+
+class ChromaDB_VectorStorePersistent(ChromaDB_VectorStore):
     def __init__(self, config=None):
         if config is None:
             config = {}
-        
-        # Força o reset na inicialização
-        config["reset_on_init"] = config.get("reset_on_init", True)
-        
+
+        config["path"] = config.get("path", CHROMA_PATH)
+        config["reset_on_init"] = config.get("reset_on_init", CHROMA_RESET)
+
         super().__init__(config=config)
-        
-        # Limpa as coleções após a inicialização padrão
+
+        # Reset explícito (VANNA_CHROMA_RESET=true): recria as coleções vazias
         if config["reset_on_init"]:
             self._reset_collections()
-            
-            # Recria as coleções vazias
+
             collection_metadata = config.get("collection_metadata", None)
             self.documentation_collection = self.chroma_client.get_or_create_collection(
                 name="documentation",
@@ -64,12 +73,12 @@ class ChromaDB_VectorStoreReset(ChromaDB_VectorStore):
         except Exception:
             pass
 
-class MyVanna(ChromaDB_VectorStoreReset, GoogleGeminiChat):
+class MyVanna(ChromaDB_VectorStorePersistent, GoogleGeminiChat):
     def __init__(self, config=None):
         if config is None:
             config = {}
         
-        ChromaDB_VectorStoreReset.__init__(self, config=config)
+        ChromaDB_VectorStorePersistent.__init__(self, config=config)
         
         GEMINI_API_KEY = config.get('api_key')
         GEMINI_MODEL_NAME = config.get('model_name')
@@ -82,86 +91,73 @@ class MyVanna(ChromaDB_VectorStoreReset, GoogleGeminiChat):
         self.print_prompt = config.get('print_prompt', False)
         self.print_sql = config.get('print_sql', False)
         self.db_url = DB_URL
-
+        self.schema_cache = None # ((db_url, impressão digital do catálogo), DDL)
+        self.connection_pool = None # Criado na primeira consulta (src/api/database/pool.py)
+        self.pool_lock = threading.Lock()
+        self.result_cache = ResultCache() # Compartilhado no processo (estatísticas em /admin/etl/sync)
+
+    ''' DDL das tabelas do public. Uma consulta barata (impressão digital do catálogo) decide se o
+        DDL memorizado ainda vale; só quando o schema mudou o catálogo é relido, em uma única consulta.
+    '''
     def get_schema(self):
         try:
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = 'public' AND table_type = 'BASE TABLE';
-            """)
-            tables = cursor.fetchall()
-
-            schema = []
-            for table in tables:
-                table_name = table[0]
-
-                cursor.execute("""
-                    SELECT 
-                        column_name,
-                        data_type,
-                        is_nullable,
-                        column_default
-                    FROM information_schema.columns
-                    WHERE table_name = %s AND table_schema = 'public';
-                """, (table_name,))
-                columns = cursor.fetchall()
-
-                cursor.execute("""
-                    SELECT kcu.column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu 
-                        ON tc.constraint_name = kcu.constraint_name
-                    WHERE tc.table_name = %s 
-                    AND tc.constraint_type = 'PRIMARY KEY'
-                    AND tc.table_schema = 'public';
-                """, (table_name,))
-                pk_columns = {row[0] for row in cursor.fetchall()}
-
-                create_stmt = f"CREATE TABLE {table_name} (\n"
-                for i, col in enumerate(columns):
-                    col_name, col_type, is_nullable, default = col
-                    not_null = "NOT NULL" if is_nullable == "NO" else ""
-                    is_pk = "PRIMARY KEY" if col_name in pk_columns else ""
-                    default_str = f"DEFAULT {default}" if default else ""
-
-                    parts = [col_name, col_type, default_str, not_null, is_pk]
-                    col_def = "    " + " ".join(p for p in parts if p)
-
-                    if i < len(columns) - 1:
-                        col_def += ",\n"
-                    else:
-                        col_def += "\n"
-
-                    create_stmt += col_def
-                create_stmt += ");"
-                schema.append(create_stmt)
-
-            conn.close()
-            return "\n\n".join(schema)
+            with self.pool().connection() as conn, conn.cursor() as cursor:
+                cursor.execute(SCHEMA_FINGERPRINT_SQL)
+                fingerprint = cursor.fetchone()[0]
+                if self.schema_cache is not None and self.schema_cache[0] == (self.db_url, fingerprint):
+                    return self.schema_cache[1]
+
+                cursor.execute(SCHEMA_CATALOG_SQL)
+                schema = render_schema(cursor.fetchall())
+            self.schema_cache = ((self.db_url, fingerprint), schema)
+            return schema
         except Exception as e:
             print(f"Erro ao obter esquema: {e}")
             return ""
 
+    ''' Pool de conexões do db_url atual (criado no primeiro uso e recriado se o db_url mudar).
+    '''
+    def pool(self):
+        with self.pool_lock:
+            if self.connection_pool is None or self.connection_pool.dsn != self.db_url:
+                if self.connection_pool is not None:
+                    self.connection_pool.close()
+                self.connection_pool = ConnectionPool(self.db_url)
+            return self.connection_pool
+
     def connect_to_postgres(self, host, dbname, user, password, port):
         self.db_url = f'postgresql://{user}:{password}@{host}:{port}/{dbname}'
         self.schema = self.get_schema()
 
+    # Primeira página do resultado (no máximo VANNA_MAX_ROWS linhas)
     def run_sql(self, sql):
         try:
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            result = cursor.fetchall()
-            conn.close()
-            return result
+            return self.run_sql_page(sql)[1]
         except Exception as e:
             print(f"Erro ao executar SQL: {e}")
             return []
 
+    ''' (colunas, linhas, há mais linhas) da página que começa em offset, lida por um cursor server-side.
+        Páginas já lidas na versão atual dos dados vêm do ResultCache, sem ir ao banco.
+    '''
+    def run_sql_page(self, sql, offset=0, limit=MAX_ROWS):
+        if not self.result_cache.enabled:
+            with self.pool().connection() as conn:
+                return fetch_page(conn, sql, offset=offset, limit=limit)
+
+        version = self.result_cache.refresh_version(self.read_data_version)
+        key = (self.db_url, normalize_sql(sql), offset, limit)
+        page = self.result_cache.get(key)
+        if page is None:
+            with self.pool().connection() as conn:
+                page = fetch_page(conn, sql, offset=offset, limit=limit)
+            self.result_cache.put(key, page, version)
+        return page
+
+    def read_data_version(self):
+        with self.pool().connection() as conn:
+            return read_data_version(conn)
+
 
     def prepare(self):
         self.connect_to_postgres(
@@ -172,9 +168,12 @@ class MyVanna(ChromaDB_VectorStoreReset, GoogleGeminiChat):
             password = DB_PASSWORD
         )
 
-        self.train(ddl=self.get_schema())
+        # Declara o treino; o sync() embute só o que é novo ou mudou desde a última execução
+        training = IncrementalTraining(self)
+
+        training.add(ddl=self.schema)
 
-        self.train(documentation="""
+        training.add(documentation="""
 Table: user_info
 
     id: Bigint primary key with default value from sequence
@@ -289,6 +288,20 @@ Table: parents_commits
 
     commit_id: Child commit ID (integer, required)
 
+    parent_number: Parent order in the child commit, 0 is the first parent and 1+ are merged branches (smallint, required)
+
+    parent_id: Parent commit ID in commits, NULL when the parent was not loaded (bigint, optional)
+
+Table: branch_commits
+
+    branch_id: Branch ID (integer, required, part of primary key)
+
+    commit_id: ID of a commit reachable from the branch (bigint, required, part of primary key)
+
+    position: Position in the branch first-parent chain (1 = oldest) of the commit that brought this commit into the branch, itself or the merge commit. Commits that landed on a branch after commit X have position greater than the position of X in that branch (integer, required)
+
+    first_parent: True when the commit is on the branch first-parent chain (boolean, required)
+
 Table: issue_assignees
 
     issue_id: Issue ID (bigint, required, part of primary key)
@@ -302,7 +315,7 @@ Table: pull_request_assignees
     user_id: Assigned user ID (bigint, required, part of primary key)
         """)
         
-        self.train(sql="""
+        training.add(sql="""
         -- 1. Repositórios com mais issues abertas
         SELECT
             r.name AS repositorio,
@@ -321,7 +334,7 @@ Table: pull_request_assignees
         LIMIT 10;
         """)
 
-        self.train(sql="""
+        training.add(sql="""
         -- 2. Top 5 usuários com mais commits registrados
         SELECT
             u.login,
@@ -337,7 +350,7 @@ Table: pull_request_assignees
         LIMIT 5;
         """)
 
-        self.train(sql="""
+        training.add(sql="""
         -- 3. Total de pull requests abertos por repositório
         SELECT
             r.name AS repositorio,
@@ -354,7 +367,7 @@ Table: pull_request_assignees
             total_pr_abertos DESC;
         """)
 
-        self.train(sql="""
+        training.add(sql="""
         -- 4. Número de issues por milestone
         SELECT
             m.title AS milestone,
@@ -369,7 +382,7 @@ Table: pull_request_assignees
             total_issues DESC;
         """)
 
-        self.train(sql="""
+        training.add(sql="""
         -- 5. Commits feitos por branch
         SELECT
             b.name AS branch,
@@ -384,4 +397,49 @@ Table: pull_request_assignees
             total_commits DESC;
         """)
 
+        training.add(sql="""
+        -- 6. Commits que entraram na branch main do repositório depois de um commit (ex.: o da última release)
+        SELECT
+            c.sha,
+            c.message,
+            c.created_at
+        FROM
+            branch_commits bc
+        JOIN
+            branch b ON bc.branch_id = b.id
+        JOIN
+            repository r ON b.repository_id = r.id
+        JOIN
+            commits c ON bc.commit_id = c.id
+        WHERE
+            r.name = 'owner/repo'
+            AND b.name = 'main'
+            AND bc.position > (
+                SELECT release.position
+                FROM branch_commits release
+                JOIN commits rc ON release.commit_id = rc.id
+                WHERE release.branch_id = b.id AND rc.sha = '<sha da release>'
+            )
+        ORDER BY
+            bc.position;
+        """)
+
+        training.add(sql="""
+        -- 7. Quantos commits a branch feature está à frente da main (commits da feature que não estão na main)
+        SELECT
+            COUNT(*) AS commits_a_frente
+        FROM
+            branch_commits f
+        JOIN
+            branch fb ON f.branch_id = fb.id
+        JOIN
+            branch mb ON mb.repository_id = fb.repository_id AND mb.name = 'main'
+        WHERE
+            fb.name = 'feature'
+            AND NOT EXISTS (
+                SELECT 1 FROM branch_commits m
+                WHERE m.branch_id = mb.id AND m.commit_id = f.commit_id
+            );
+        """)
 
+        training.sync()
@@ -0,0 +1,68 @@
+import os
+import hmac
+import json
+import uuid
+import base64
+import hashlib
+
+from src.assets.aux.env import env
+
+''' Leitura paginada do resultado do SQL gerado, com memória da API limitada qualquer que seja o SQL.
+    O SQL roda em um cursor nomeado (server-side): o Postgres guarda o resultado e a API busca só
+    MAX_ROWS linhas (+1, para saber se há mais) a partir do offset, pulado no servidor com MOVE.
+    Páginas seguintes são pedidas com um token opaco (SQL + offset), assinado com HMAC para o
+    cliente não conseguir mandar SQL próprio; o SQL é executado de novo, sem passar pelo LLM.
+
+    Configuração: VANNA_MAX_ROWS (padrão 500) e ASK_PAGE_SECRET (chave dos tokens; sem ela uma
+    chave aleatória é gerada e os tokens valem só enquanto o processo da API estiver de pé).
+'''
+
+MAX_ROWS = int(env.get("VANNA_MAX_ROWS", "500"))
+PAGE_SECRET = env.get("ASK_PAGE_SECRET", "").encode() or os.urandom(32)
+
+
+class PageTokenError(Exception):
+    pass
+
+
+''' (colunas, linhas, há mais linhas) de uma página do resultado do sql.
+    O cursor nomeado precisa de uma transação: a conexão sai do autocommit enquanto ele existe.
+'''
+def fetch_page(conn, sql, offset=0, limit=MAX_ROWS):
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor(name=f"vanna_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = limit + 1
+            cursor.execute(sql.strip().rstrip(";"))
+            if offset:
+                cursor.scroll(offset)
+            rows = cursor.fetchmany(limit + 1)
+            columns = [column.name for column in cursor.description] if cursor.description else []
+    finally:
+        conn.rollback()
+        conn.autocommit = autocommit
+    return columns, rows[:limit], len(rows) > limit
+
+
+def signature(payload, secret):
+    return hmac.new(secret, payload, hashlib.sha256).hexdigest()
+
+
+def encode_token(sql, offset, secret=PAGE_SECRET):
+    payload = json.dumps({"sql": sql, "offset": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode() + "." + signature(payload, secret)
+
+
+''' Retorna (sql, offset) de um token gerado por encode_token.
+'''
+def decode_token(token, secret=PAGE_SECRET):
+    try:
+        encoded, _, signed = token.rpartition(".")
+        payload = base64.urlsafe_b64decode(encoded.encode())
+    except (ValueError, TypeError):
+        raise PageTokenError("Token de página malformado.")
+    if not hmac.compare_digest(signature(payload, secret), signed):
+        raise PageTokenError("Token de página inválido.")
+    data = json.loads(payload)
+    return data["sql"], data["offset"]
@@ -0,0 +1,94 @@
+import time
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+from src.assets.aux.env import env
+
+''' Pool de conexões das consultas do Vanna (run_sql e get_schema), para cada pergunta do chat
+    não pagar o handshake TCP/autenticação de um psycopg2.connect novo.
+        - Tamanho mínimo/máximo configurável; com todas as conexões em uso, quem pede espera
+          (até POOL_WAIT_SECONDS) em vez de receber erro, então threads da API podem dividir o pool.
+        - Sessão de cada conexão: autocommit, somente leitura (o SQL vem do LLM) e statement_timeout.
+        - Health check: conexão ociosa há mais de POOL_PING_SECONDS passa por um SELECT 1 antes de
+          ser entregue; conexão que o psycopg2 marcou como fechada (perdida) é descartada do pool.
+    O pool é thread-safe (ThreadedConnectionPool); o endpoint assíncrono chama o Vanna em uma
+    thread do threadpool, nunca no event loop.
+
+    Configuração: VANNA_POOL_MIN (1), VANNA_POOL_MAX (8), VANNA_POOL_WAIT_SECONDS (10),
+    VANNA_POOL_PING_SECONDS (30), VANNA_STATEMENT_TIMEOUT (30s) e VANNA_READ_ONLY (true).
+'''
+
+POOL_MIN = int(env.get("VANNA_POOL_MIN", "1"))
+POOL_MAX = int(env.get("VANNA_POOL_MAX", "8"))
+POOL_WAIT_SECONDS = float(env.get("VANNA_POOL_WAIT_SECONDS", "10"))
+POOL_PING_SECONDS = float(env.get("VANNA_POOL_PING_SECONDS", "30"))
+STATEMENT_TIMEOUT = env.get("VANNA_STATEMENT_TIMEOUT", "30s")
+READ_ONLY = env.get("VANNA_READ_ONLY", "true").lower() == "true"
+
+
+class ConnectionPool:
+    def __init__(self, dsn, minconn=POOL_MIN, maxconn=POOL_MAX, wait_seconds=POOL_WAIT_SECONDS, ping_seconds=POOL_PING_SECONDS, statement_timeout=STATEMENT_TIMEOUT, readonly=READ_ONLY):
+        self.dsn = dsn
+        self.wait_seconds = wait_seconds
+        self.ping_seconds = ping_seconds
+        # Somente leitura pelo GUC da sessão: vale também nas transações dos cursores server-side
+        self.options = f"-c statement_timeout={statement_timeout}" + (" -c default_transaction_read_only=on" if readonly else "")
+        self.pool = ThreadedConnectionPool(minconn, maxconn, dsn, options=self.options)
+        self.slots = threading.BoundedSemaphore(maxconn) # getconn não espera: o semáforo faz a fila
+        self.last_used = {} # id(conexão) -> time.monotonic() da devolução
+        self.stats = {"checkouts": 0, "pings": 0, "discarded": 0}
+
+    ''' Empresta uma conexão do pool (context manager) e a devolve ao final. Só conexões perdidas
+        (conn.closed) são descartadas: um erro no SQL ou um statement_timeout não derruba a sessão.
+    '''
+    @contextmanager
+    def connection(self):
+        if not self.slots.acquire(timeout=self.wait_seconds):
+            raise PoolError(f"Nenhuma conexão livre no pool após {self.wait_seconds}s")
+        conn = None
+        try:
+            conn = self.checkout()
+            yield conn
+        finally:
+            if conn is not None:
+                self.release(conn, bool(conn.closed))
+            self.slots.release()
+
+    def checkout(self):
+        conn = self.pool.getconn()
+        if not self.healthy(conn):
+            self.release(conn, True)
+            conn = self.pool.getconn()
+        if not conn.autocommit:
+            # Conexão nova: configura a sessão uma vez
+            conn.set_session(autocommit=True)
+        self.stats["checkouts"] += 1
+        return conn
+
+    def healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self.last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.ping_seconds:
+            return True
+        self.stats["pings"] += 1
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def release(self, conn, broken=False):
+        if broken:
+            self.stats["discarded"] += 1
+            self.last_used.pop(id(conn), None)
+        else:
+            self.last_used[id(conn)] = time.monotonic()
+        self.pool.putconn(conn, close=broken)
+
+    def close(self):
+        self.pool.closeall()
@@ -0,0 +1,178 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+
+from src.assets.pattern.singleton import SingletonMeta
+from src.assets.aux.env import env
+
+''' Cache dos resultados do SQL gerado pelo Vanna, para perguntas repetidas (ex.: "PRs abertos por
+    repositório") não irem ao Postgres de novo até chegarem dados novos.
+        - Chave: banco + SQL normalizado (sem comentários, espaços colapsados, caixa baixa fora de
+          literais ('...' e $tag$...$tag$) e identificadores entre aspas, listas IN de literais
+          ordenadas) + página, sempre na versão atual dos dados.
+        - A versão (etl.data_version, incrementada pelo ETL e pelos webhooks) é relida no máximo a cada
+          DATA_VERSION_TTL segundos; quando muda, o cache inteiro é descartado.
+        - Limite de RESULT_CACHE_SIZE páginas, com descarte LRU; estatísticas de acertos/faltas em stats().
+
+    Configuração: VANNA_RESULT_CACHE_SIZE (padrão 256; 0 desliga) e VANNA_DATA_VERSION_TTL (padrão 5s).
+'''
+
+RESULT_CACHE_SIZE = int(env.get("VANNA_RESULT_CACHE_SIZE", "256"))
+DATA_VERSION_TTL = float(env.get("VANNA_DATA_VERSION_TTL", "5"))
+
+DATA_VERSION_EXISTS_SQL = "SELECT to_regclass('etl.data_version') IS NOT NULL"
+DATA_VERSION_SQL = "SELECT COALESCE(max(version), 0) FROM etl.data_version"
+
+# Literais (inclusive $tag$...$tag$) e identificadores entre aspas ficam como estão; comentários
+# somem; palavras-chave e nomes sem aspas viram caixa baixa
+SQL_TOKENS = re.compile(r"""
+    (?P<string>'(?:[^']|'')*')
+  | (?P<identifier>"(?:[^"]|"")*")
+  | (?P<dollar>\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<space>\s+)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+LITERALS = ("string", "dollar", "number")
+
+
+def normalize_sql(sql):
+    tokens = [] # (tipo, texto); espaços e comentários viram um único " "
+    for token in SQL_TOKENS.finditer(sql):
+        kind = token.lastgroup
+        if kind in ("comment", "space"):
+            if tokens and tokens[-1][0] != "space":
+                tokens.append(("space", " "))
+        elif kind in ("word", "other"):
+            tokens.append((kind, token.group().lower()))
+        else:
+            tokens.append((kind, token.group()))
+    return "".join(text for _, text in sort_in_lists(tokens)).strip().rstrip(";").strip()
+
+
+''' x IN (3, 1, 2) e x IN (1, 2, 3) são a mesma consulta: listas IN só de literais saem ordenadas.
+    Trabalha sobre os tokens, então o texto de dentro de um literal nunca é reordenado.
+'''
+def sort_in_lists(tokens):
+    result = []
+    position = 0
+    while position < len(tokens):
+        if tokens[position] == ("word", "in"):
+            items, end = in_list(tokens, position + 1)
+            if items is not None:
+                result += [("word", "in"), ("space", " "), ("list", "(" + ", ".join(sorted(items)) + ")")]
+                position = end
+                continue
+        result.append(tokens[position])
+        position += 1
+    return result
+
+
+''' Lê "(literal, literal, ...)" a partir de start; retorna (literais, posição depois do ")")
+    ou (None, start) quando não é uma lista de dois ou mais literais.
+'''
+def in_list(tokens, start):
+    def skip_space(position):
+        while position < len(tokens) and tokens[position][0] == "space":
+            position += 1
+        return position
+
+    def is_symbol(position, symbol):
+        return position < len(tokens) and tokens[position] == ("other", symbol)
+
+    position = skip_space(start)
+    if not is_symbol(position, "("):
+        return None, start
+    items = []
+    while True:
+        position = skip_space(position + 1)
+        sign = ""
+        if is_symbol(position, "-"):
+            sign, position = "-", skip_space(position + 1)
+        if position >= len(tokens) or tokens[position][0] not in (("number",) if sign else LITERALS):
+            return None, start
+        items.append(sign + tokens[position][1])
+        position = skip_space(position + 1)
+        if is_symbol(position, ")"):
+            return (items, position + 1) if len(items) > 1 else (None, start)
+        if not is_symbol(position, ","):
+            return None, start
+
+
+class ResultCache(metaclass=SingletonMeta):
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, version_ttl=DATA_VERSION_TTL):
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.entries = OrderedDict() # (db_url, sql normalizado, offset, limit) -> página, do menos para o mais recente
+        self.lock = threading.Lock()
+        self.data_version = None
+        self.version_checked_at = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    ''' Versão dos dados atual; read_version (conexão do pool) só é chamado depois do TTL.
+        Uma versão nova descarta as páginas cacheadas da versão anterior.
+    '''
+    def refresh_version(self, read_version):
+        now = time.monotonic()
+        if self.version_checked_at is not None and now - self.version_checked_at < self.version_ttl:
+            return self.data_version
+        version = read_version()
+        with self.lock:
+            if version != self.data_version:
+                if self.entries:
+                    self.counters["invalidations"] += 1
+                self.entries.clear()
+                self.data_version = version
+            self.version_checked_at = now
+        return version
+
+    def get(self, key):
+        with self.lock:
+            page = self.entries.get(key)
+            if page is None:
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return page
+
+    def put(self, key, page, version):
+        with self.lock:
+            # Página lida enquanto a versão mudou: já nasce velha
+            if version != self.data_version:
+                return
+            self.entries[key] = page
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "data_version": self.data_version,
+            }
+
+
+''' Versão dos dados em etl.data_version (0 se o ETL ainda não criou a tabela).
+'''
+def read_data_version(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(DATA_VERSION_EXISTS_SQL)
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute(DATA_VERSION_SQL)
+        return cursor.fetchone()[0]
@@ -0,0 +1,70 @@
+''' DDL das tabelas do public para o treino do Vanna, lido do pg_catalog em uma única consulta
+    (colunas, chaves primárias/únicas, chaves estrangeiras e índices).
+    A impressão digital do schema muda com qualquer DDL nas tabelas (pg_class, pg_attribute e
+    pg_constraint ganham um novo xmin), mas não com escritas de dados nem com VACUUM/ANALYZE,
+    então o DDL só é relido quando o schema realmente mudou.
+'''
+
+SCHEMA_FINGERPRINT_SQL = """
+    SELECT md5(string_agg(entry, ',' ORDER BY entry))
+    FROM (
+        SELECT 'c' || c.oid || ':' || c.xmin AS entry FROM pg_class c WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p', 'i')
+        UNION ALL
+        SELECT 'a' || a.attrelid || '.' || a.attnum || ':' || a.xmin FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid
+        WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p') AND a.attnum > 0
+        UNION ALL
+        SELECT 'k' || k.oid || ':' || k.xmin FROM pg_constraint k WHERE k.connamespace = 'public'::regnamespace
+    ) entries
+"""
+
+# Uma linha por coluna, constraint e índice: (tabela, tipo, posição, nome, definição, not null, default, colunas)
+SCHEMA_CATALOG_SQL = """
+    SELECT c.relname, 'column', a.attnum, a.attname, format_type(a.atttypid, a.atttypmod), a.attnotnull, pg_get_expr(d.adbin, d.adrelid), NULL::text[]
+    FROM pg_class c
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+    WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p')
+    UNION ALL
+    SELECT c.relname, CASE k.contype WHEN 'p' THEN 'primary_key' WHEN 'u' THEN 'unique' ELSE 'foreign_key' END, 0, k.conname, pg_get_constraintdef(k.oid), NULL, NULL,
+           ARRAY(SELECT a.attname::text FROM unnest(k.conkey) WITH ORDINALITY key(attnum, n) JOIN pg_attribute a ON a.attrelid = k.conrelid AND a.attnum = key.attnum ORDER BY key.n)
+    FROM pg_constraint k
+    JOIN pg_class c ON c.oid = k.conrelid
+    WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p') AND k.contype IN ('p', 'u', 'f')
+    UNION ALL
+    SELECT c.relname, 'index', 0, ic.relname, pg_get_indexdef(i.indexrelid), NULL, NULL, NULL
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indrelid
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p')
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = i.indexrelid AND k.contype IN ('p', 'u', 'x'))
+    ORDER BY 1, 3, 4
+"""
+
+
+''' CREATE TABLE (e CREATE INDEX) de cada tabela, a partir das linhas do SCHEMA_CATALOG_SQL.
+    Chave primária de uma coluna fica na própria coluna; as demais constraints vão ao fim da tabela.
+'''
+def render_schema(rows):
+    tables = {}
+    for table, kind, _, name, definition, not_null, default, columns in rows:
+        entry = tables.setdefault(table, {"columns": [], "constraints": [], "indexes": [], "primary_key": None})
+        if kind == "column":
+            entry["columns"].append((name, definition, not_null, default))
+        elif kind == "index":
+            entry["indexes"].append(definition.replace("public.", "", 1) + ";")
+        else:
+            if kind == "primary_key" and columns is not None and len(columns) == 1:
+                entry["primary_key"] = columns[0]
+                continue
+            entry["constraints"].append(f"CONSTRAINT {name} {definition}")
+
+    schema = []
+    for table, entry in tables.items():
+        lines = []
+        for name, data_type, not_null, default in entry["columns"]:
+            parts = [name, data_type, f"DEFAULT {default}" if default else "", "NOT NULL" if not_null else "", "PRIMARY KEY" if name == entry["primary_key"] else ""]
+            lines.append("    " + " ".join(part for part in parts if part))
+        lines.extend("    " + constraint for constraint in entry["constraints"])
+        statement = f"CREATE TABLE {table} (\n" + ",\n".join(lines) + "\n);"
+        schema.append("\n".join([statement] + entry["indexes"]))
+    return "\n\n".join(schema)
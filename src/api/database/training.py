@@ -0,0 +1,63 @@
+import json
+import hashlib
+
+''' Treino incremental do Vanna sobre o Chroma persistente.
+    O prepare() declara o que deve estar treinado (DDL, documentação e SQLs de exemplo) e o
+    sync() compara com o que já está no disco pelo id de cada item, um hash do conteúdo:
+        - itens novos ou alterados são embutidos (em lote, um add por coleção);
+        - itens que saíram do prepare() são apagados;
+        - o resto não é tocado.
+    Com o store já treinado, subir a API (ou um reload do uvicorn) só lê os ids das coleções.
+    SQLs de exemplo sem pergunta só passam pelo generate_question (chamada ao LLM) quando são novos.
+    Uma coleção sem nenhum item declarado (ex.: DDL vazio porque o banco não respondeu) é mantida como está.
+'''
+
+SUFFIXES = {"ddl": "-ddl", "documentation": "-doc", "sql": "-sql"}
+
+
+def content_hash(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class IncrementalTraining:
+    def __init__(self, vn):
+        self.vn = vn
+        self.items = {kind: {} for kind in SUFFIXES} # tipo -> id -> (conteúdo, pergunta)
+
+    def add(self, ddl=None, documentation=None, sql=None, question=None):
+        for kind, content in (("ddl", ddl), ("documentation", documentation), ("sql", sql)):
+            if content:
+                item_id = content_hash(content, question or "") + SUFFIXES[kind]
+                self.items[kind][item_id] = (content, question)
+
+    def collections(self):
+        return {"ddl": self.vn.ddl_collection, "documentation": self.vn.documentation_collection, "sql": self.vn.sql_collection}
+
+    # Documento no formato que o ChromaDB_VectorStore do Vanna grava e lê
+    def document(self, kind, content, question):
+        if kind != "sql":
+            return content
+        if question is None:
+            question = self.vn.generate_question(content)
+        return json.dumps({"question": question, "sql": content}, ensure_ascii=False)
+
+    def sync(self):
+        report = {"added": 0, "deleted": 0, "kept": 0}
+        for kind, collection in self.collections().items():
+            wanted = self.items[kind]
+            if not wanted:
+                continue
+
+            existing = set(collection.get(include=[])["ids"])
+            stale = [item_id for item_id in existing if item_id not in wanted]
+            new = [item_id for item_id in wanted if item_id not in existing]
+            if stale:
+                collection.delete(ids=stale)
+            if new:
+                collection.add(ids=new, documents=[self.document(kind, *wanted[item_id]) for item_id in new])
+
+            report["added"] += len(new)
+            report["deleted"] += len(stale)
+            report["kept"] += len(wanted) - len(new)
+        print(f"Treino do Vanna: {report['added']} itens embutidos, {report['deleted']} removidos, {report['kept']} já treinados")
+        return report
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Header
+from src.api.controller.AdminController import AdminController, AdminError
+
+admin = AdminController()
+
+router = APIRouter(prefix="/admin")
+
+# Pede uma sincronização ao worker do ETL
+@router.post("/etl/sync", status_code=202)
+def trigger_sync(authorization: str = Header(None)):
+    try:
+        return admin.trigger(authorization)
+    except AdminError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+# Versão dos dados, últimos pedidos e últimas execuções do ETL
+@router.get("/etl/sync")
+def sync_status(authorization: str = Header(None)):
+    try:
+        return admin.status(authorization)
+    except AdminError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.get("/etl/sync/{request_id}")
+def sync_request(request_id: int, authorization: str = Header(None)):
+    try:
+        return admin.request(authorization, request_id)
+    except AdminError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
-from src.api.models import Question
+from fastapi.concurrency import run_in_threadpool
+from src.api.models import Question, PageRequest
 from src.api.controller.AskController import AskController
+from src.api.database.pagination import PageTokenError
 import os
 
 router = APIRouter()
@@ -11,11 +13,22 @@ ask = AskController()
 @router.post("/ask")
 async def ask_question(question: Question):
     try:
-        return ask.ask(question)
+        # Vanna e Gemini bloqueiam: a pergunta roda no threadpool, fora do event loop
+        return await run_in_threadpool(ask.ask, question)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Próximas páginas do resultado de uma pergunta (token next_page), sem gerar o SQL de novo
+@router.post("/ask/page")
+async def ask_page(page: PageRequest):
+    try:
+        return await run_in_threadpool(ask.page, page.token)
+    except PageTokenError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Endpoint para servir arquivos de gráficos
 @router.get("/static/graficos/{filename}")
 def serve_grafico(filename: str):
@@ -0,0 +1,21 @@
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, HTTPException, Request, Header
+from src.api.controller.WebhookController import WebhookController, WebhookError
+
+webhooks = WebhookController()
+
+# Grava o que ainda estiver na fila antes de a API parar
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    webhooks.drain()
+
+router = APIRouter(lifespan=lifespan)
+
+@router.post("/webhooks/github", status_code=202)
+async def github_webhook(request: Request, x_github_event: str = Header(None), x_hub_signature_256: str = Header(None)):
+    body = await request.body()
+    try:
+        return webhooks.receive(x_github_event, body, x_hub_signature_256)
+    except WebhookError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
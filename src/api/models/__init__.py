@@ -4,4 +4,7 @@ class Question(BaseModel):
     question: str
     
 class Response(BaseModel):
-    texto: str
\ No newline at end of file
+    texto: str
+
+class PageRequest(BaseModel):
+    token: str
\ No newline at end of file
@@ -9,4 +9,49 @@ parser.add_argument("--etl", action="store_true", help="Habilita o airbyte ao ex
 # --etl-only
 parser.add_argument("--etl-only", action="store_true", help="Roda somente o airbyte ao executar o código")
 
-flags = parser.parse_args()
+# --bulk-load
+parser.add_argument("--bulk-load", action="store_true", help="Carrega os dados em lote (execute_values + ON CONFLICT) ao invés de linha a linha")
+
+# --incremental
+parser.add_argument("--incremental", action="store_true", help="Sincroniza somente o que mudou desde a última execução do ETL")
+
+# --sql-transform
+parser.add_argument("--sql-transform", action="store_true", help="Executa o transform dentro do Postgres, direto das tabelas de cache do Airbyte")
+
+# --batch-size
+parser.add_argument("--batch-size", type=int, default=5000, help="Máximo de linhas transformadas entregues aos loaders por lote")
+
+# --load-workers
+parser.add_argument("--load-workers", type=int, default=4, help="Quantidade de tabelas carregadas em paralelo (respeitando as chaves estrangeiras)")
+
+# --extract-shards
+parser.add_argument("--extract-shards", type=int, default=1, help="Divide os repositórios em N shards, cada um extraído por um source do Airbyte em um processo separado")
+
+# --extract-workers
+parser.add_argument("--extract-workers", type=int, default=4, help="Quantidade máxima de shards extraídos ao mesmo tempo")
+
+# --resume
+parser.add_argument("--resume", action="store_true", help="Retoma a última execução do ETL interrompida, a partir dos checkpoints de etl.run_ledger")
+
+# --commit-every
+parser.add_argument("--commit-every", type=int, default=1000, help="Linhas carregadas por commit (e checkpoint) em cada tabela")
+
+# --cache-backend
+parser.add_argument("--cache-backend", choices=["postgres", "duckdb"], default=None, help="Onde o Airbyte grava os dados brutos: schemas no Postgres ou arquivo DuckDB local (padrão: ETL_CACHE_BACKEND ou postgres)")
+
+# --cache-retention
+parser.add_argument("--cache-retention", choices=["keep", "truncate"], default=None, help="Após um load bem-sucedido, mantém ou esvazia as tabelas de cache do Airbyte no Postgres (padrão: ETL_CACHE_RETENTION ou keep)")
+
+# --skip-maintenance
+parser.add_argument("--skip-maintenance", action="store_true", help="Não executa a manutenção pós-load (retenção do cache e VACUUM ANALYZE)")
+
+# --skip-commit-graph
+parser.add_argument("--skip-commit-graph", action="store_true", help="Não materializa o grafo de commits (parents_commits.parent_id e branch_commits) após o load")
+
+# --swap-load
+parser.add_argument("--swap-load", action="store_true", help="Carrega em um schema sombra e troca as tabelas do public de uma vez ao final (consultas nunca veem uma carga pela metade)")
+
+# --sync-interval
+parser.add_argument("--sync-interval", type=int, default=None, help="Com --etl, segundos entre as sincronizações incrementais do worker em segundo plano; 0 = só sob pedido (padrão: ETL_SYNC_INTERVAL ou 3600)")
+
+flags = parser.parse_args()
\ No newline at end of file
@@ -1,10 +1,25 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
 import datetime # Para timestamps
-import pytz
+import time
 import json
-
-from src.etl.airbyte import airbyte
+from functools import partial
+
+from src.etl.airbyte import airbyte, extract_sharded, read_cached, CACHE_SCHEMA, CACHE_BACKEND, EXTRACT_WORKERS
+from src.etl.bulk_loader import BulkLoader
+from src.etl.sync_state import SyncState
+from src.etl.sql_transform import SqlTransform
+from src.etl.transform import StreamTransformer, BATCH_SIZE
+from src.etl.id_resolver import IdResolver
+from src.etl.scheduler import LoadScheduler
+from src.etl.telemetry import Telemetry, configure_logging, get_logger
+from src.etl.timezone import TIMEZONE, localize, localize_many
+from src.etl.run_ledger import RunLedger, row_key, batch_fingerprint
+from src.etl.maintenance import Maintenance, CACHE_RETENTION
+from src.etl.commit_graph import CommitGraph
+from src.etl.migrations import upgrade_schema
+from src.etl.shadow import ShadowSchema
+from src.etl.data_version import DataVersion
 from src.assets.pattern.singleton import SingletonMeta
 from src.assets.aux.env import env
 # GitHub env var
@@ -16,17 +31,77 @@ DB_NAME = env["DB_NAME"]
 DB_USER = env["DB_USER"]
 DB_PASSWORD = env["DB_PASSWORD"]
 
+logger = get_logger("pipeline")
+
 # String de conexão SQLAlchemy
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+LOAD_WORKERS = 4
+COMMIT_EVERY = 1000
+
+# Mensagens dos loaders linha-a-linha para cada resultado do upsert
+STATUS_MESSAGES = {
+    "inserted": "inserido",
+    "updated": "atualizado",
+    "unchanged": "sem alteração",
+}
+
+# Ordem de inserção é crucial devido às chaves estrangeiras:
+# entidade -> entidades que precisam estar carregadas antes dela
+LOAD_DEPENDENCIES = {
+    "users": [],
+    "repositories": [],
+    "milestones": ["users", "repositories"],
+    "branches": ["repositories"],
+    "issues": ["users", "repositories", "milestones"],
+    "pull_requests": ["users", "repositories", "milestones"],
+    "commits": ["users", "branches", "pull_requests"],
+}
+
+def batch_rows(batch):
+    return sum(len(rows) for rows in batch.values())
+
 class ETL(metaclass=SingletonMeta):
-    def __init__(self, repos, streams, github_token):
+    def __init__(self, repos, streams, github_token, bulk_load=False, incremental=False, sql_transform=False, batch_size=BATCH_SIZE, load_workers=LOAD_WORKERS, extract_shards=1, extract_workers=EXTRACT_WORKERS, resume=False, commit_every=COMMIT_EVERY, cache_backend=None, cache_retention=None, maintenance=True, commit_graph=True, swap_load=False):
         self.repos = repos
         self.streams = streams
         self.github_token = github_token
+        self.bulk_load = bulk_load # Carregamento set-based (execute_values + ON CONFLICT)
+        self.incremental = incremental # Sincroniza somente o que mudou desde a última execução
+        self.sql_transform = sql_transform # Transform + load dentro do Postgres, direto das tabelas do cache
+        self.batch_size = batch_size # Máximo de linhas transformadas entregues aos loaders por vez
+        self.load_workers = load_workers # Loads independentes executados em paralelo
+        self.extract_shards = extract_shards # Quantidade de shards de repositórios na extração
+        self.extract_workers = extract_workers # Shards extraídos em paralelo (processos)
+        self.timezone = TIMEZONE # Fuso em que os horários do GitHub são interpretados (ETL_TIMEZONE)
+        self.resume = resume # Retoma a última execução interrompida a partir dos checkpoints
+        self.commit_every = commit_every # Linhas por commit (e checkpoint) em cada tabela
+        self.cache_backend = cache_backend or CACHE_BACKEND # Cache dos dados brutos do Airbyte (postgres ou duckdb)
+        self.cache_retention = cache_retention or CACHE_RETENTION # O que fazer com o cache bruto após o load (keep ou truncate)
+        self.maintenance = maintenance # Retenção do cache + VACUUM ANALYZE ao fim de uma execução bem-sucedida
+        self.commit_graph = commit_graph # Materializa o grafo de commits (branch_commits) após um load bem-sucedido
+        self.swap_load = swap_load # Carrega em um schema sombra e troca as tabelas do public de uma vez ao final
+
+        # O transform em SQL lê as tabelas do cache de dentro do Postgres
+        if self.sql_transform and self.cache_backend != "postgres":
+            raise ValueError("--sql-transform requer o cache do Airbyte no Postgres (ETL_CACHE_BACKEND=postgres).")
         
-        # Conexão do branco de dados
-        self.engine = create_engine(DATABASE_URL)
+        # Conexão do branco de dados (pool com uma conexão por worker do load)
+        self.engine = create_engine(DATABASE_URL, pool_size=max(load_workers, 1), max_overflow=max(load_workers, 1), pool_pre_ping=True)
+
+        # Cache de IDs de repositórios/branches (recriado a cada run)
+        self.id_resolver = IdResolver(self.engine)
+
+        # Logs, contadores e tempos por etapa (recriado a cada run)
+        configure_logging()
+        self.telemetry = Telemetry()
+
+        # Checkpoints da execução (criado a cada run)
+        self.ledger = None
+        self.load_failed = False # Algum nó do último load_data falhou
+        self.cache_schemas = [] # Schemas de cache do Airbyte lidos na execução
+        self.shadow = None # Schema sombra do --swap-load (criado a cada run)
+        self.pending_watermarks = [] # No --swap-load, marcas d'água salvas só depois da troca das tabelas
 
     def getAirbyteRepos():
         return repos
@@ -46,232 +121,314 @@ class ETL(metaclass=SingletonMeta):
         self.github_token = github_token
 
     def airbyte_extract(self):
-        airbyte_instance = airbyte(self.repos, self.streams, self.github_token)
         try:
+            if self.extract_shards > 1:
+                return extract_sharded(self.repos, self.streams, self.github_token, self.extract_shards, max_workers=self.extract_workers, incremental=self.incremental, cache_backend=self.cache_backend)
+
+            airbyte_instance = airbyte(self.repos, self.streams, self.github_token, incremental=self.incremental, cache_backend=self.cache_backend)
             return airbyte_instance.extract()
         except Exception as e:
-            print(f"Ocorreu um erro na execução do airbyte: {e}")
+            logger.error("Ocorreu um erro na execução do airbyte: %s", e)
             return None
 
-    def load_data(self, transformed_data):
-        # print("\nUsers")
-        # print(transformed_data['users'])
-        # print("\nRepos")
-        # print(transformed_data['repositories'])
-        # print("\nBranches")
-        # print(transformed_data['branches'])
-        # print("\nMilestones")
-        # print(transformed_data['milestones'])
-        # print("\nissues")
-        # print(transformed_data['issues'][0])
-        # print("\nPull requests")
-        # print(transformed_data['pull_requests'][0])
-        # print("\ncommits")
-        # print(transformed_data['commits'][0])
-
-        # Ordem de inserção é crucial devido às chaves estrangeiras
-        self.load_users(transformed_data['users'])
-        self.load_repositories(transformed_data['repositories'])
-        self.load_milestones(transformed_data['milestones']) # Depende de repositorios
-        self.load_branches(transformed_data['branches']) # Depende de repositórios
-        self.load_issues(transformed_data['issues'])
-        self.load_pull_requests(transformed_data['pull_requests'])
-        self.load_commits(transformed_data['commits'])
+    def load_data(self, transformed_data, batch_number=1):
+        # Cada entidade é um nó do DAG; nós sem dependência entre si rodam em paralelo
+        loader = BulkLoader(self.engine, self.localize_timestamps) if self.bulk_load else self
+        scheduler = LoadScheduler(max_workers=self.load_workers)
+        for entity, depends_on in LOAD_DEPENDENCIES.items():
+            load = partial(self.checkpointed_load, entity, batch_number, getattr(loader, f"load_{entity}"))
+            scheduler.add(entity, partial(self.timed_load, entity, load, transformed_data[entity]), depends_on)
+
+        scheduler.run()
+        self.load_failed = len(scheduler.failed) > 0
+
+        # Contadores do bulk load (inseridas/atualizadas/sem alteração) entram no resumo da execução
+        if self.bulk_load:
+            for table, stats in loader.stats.items():
+                for key in ("rows", "inserted", "updated", "unchanged", "errors"):
+                    if key in stats:
+                        self.telemetry.count(table, key, stats[key])
+        return loader.stats if self.bulk_load else scheduler.timings
+
+    ''' Executa um loader medindo a etapa load.<entidade> e reporta linhas/s.
+    '''
+    def timed_load(self, entity, loader, rows):
+        start = time.perf_counter()
+        with self.telemetry.stage(f"load.{entity}", rows=len(rows)):
+            loader(rows)
+        elapsed = time.perf_counter() - start
+        rate = len(rows) / elapsed if elapsed > 0 else float(len(rows))
+        logger.info("%s: %d linhas em %.2fs (%.0f linhas/s)", entity, len(rows), elapsed, rate)
+        return {"rows": len(rows), "seconds": elapsed, "rows_per_sec": rate}
+
+    ''' Carrega as linhas de uma entidade em blocos de commit_every, cada um com seu commit, e
+        registra um checkpoint após cada bloco. Na retomada, começa do primeiro bloco não commitado.
+    '''
+    def checkpointed_load(self, entity, batch_number, load, rows):
+        if self.ledger is None:
+            if load(rows) is False:
+                raise RuntimeError(f"Falha no load de {entity}")
+            return
+
+        start = self.ledger.resume_position(entity, batch_number, rows)
+        if start > 0:
+            logger.info("%s: retomando do checkpoint (%d de %d linhas já carregadas)", entity, start, len(rows))
+
+        for chunk_start in range(start, len(rows), self.commit_every):
+            chunk = rows[chunk_start:chunk_start + self.commit_every]
+            if load(chunk) is False:
+                raise RuntimeError(f"Falha no load de {entity} (lote {batch_number}, linhas {chunk_start}-{chunk_start + len(chunk)})")
+            position = chunk_start + len(chunk)
+            self.ledger.checkpoint(entity, batch_number, position=position, last_key=row_key(entity, chunk[-1]), status="done" if position == len(rows) else "running")
+
+        if len(rows) == 0:
+            load(rows) # Mantém o log de "nenhum dado" dos loaders
 
     # --- Orquestração da Inserção ---
     def run(self):
-        airbyte_cached_data = self.airbyte_extract()            # Extract
-        transformed_data = self.data_transform(airbyte_cached_data)  # Transform
-        self.load_data(transformed_data)                             # Load
-
-    def data_transform(self, read_result):
-        print("\n--- Data Transform Initiated---")
-        added_user_logins = [] # Mapeia logins ja inseridos no users
-        added_repo_branches = [] # Mapeia repo:branch ja inseridos
-
-        users = []
-        issues = []
-        commits = []
-        branches = []
-        pr_commits = []
-        milestones = []
-        repositories = []
-        pull_requests = []
-
-        for stream_name, dataset in read_result.streams.items():
-            for i, record in enumerate(dataset):
-                ## Populando usuários em todas as streams
-                if(getattr(record, 'user', False) != False):
-                    # print(f"  Record {i+1}: id: {record.user['id']}, login:{record.user['login']}") # Imprime toda vez q encontra usuario
-                    user_login = record.user['login'].lower()
-                    if(user_login not in added_user_logins):
-                        users.append({
-                            "id": record.user['id'],
-                            "login": user_login,
-                            "html_url": record.user['html_url']
-                        })
-                        added_user_logins.append(user_login)
-
-                ## Populando repos em todas as streams
-                if(getattr(record, 'repository', False) != False):
-                    repo = record.repository.lower()
-                    # print(f"  Record {i+1}: repo: {repo}") # Imprime toda vez q encontra um repositório
-                    if(repo not in repositories):
-                        repositories.append(repo)
-                
-                ## Populando branches em todas as streams
-                if(getattr(record, 'branch', False) != False):
-                    branch = record.branch
-                    # print(f"  Record {i+1}: branch: {record}") # Imprime toda vez q encontra um branch
-                    repository = record.repository.lower()
-                    branch = record.branch.lower()
-                    repo_branch = f"{repository}:{branch}"
-                    if(repo_branch not in added_repo_branches):
-                        branches.append({
-                            "repository": repository,
-                            "branch": branch
-                        })
-                        added_repo_branches.append(repo_branch)
-                        
-                ## Populando milestones em todas as streams
-                if (stream_name.lower() == 'issue_milestones'):
-                    # print(f"    milestone {i+1}: id: {record.id}, title: {record.title}, body: {record.description}, number: {record.number}, state: {record.state}, created_at: {record.created_at}, updated_at: {record.updated_at}, creator: {record.creator['id']}") # Imprime toda vez q encontra milestone
-                    
-                    milestones.append({
-                        "id": record.id, "repository": record.repository.lower(), "title": record.title, "description": record.description, "number": record.number, "state": record.state, "created_at": record.created_at, "updated_at": record.updated_at, "creator": record.creator['id']
-                    })
-
-                # Se a stream for issues
-                if (stream_name.lower() == 'issues'):
-                    # print(f"    issue {i+1}: {record}") # Imprime toda vez q encontra issues
-
-                    issues.append({
-                        "id": record.id, "title": record.title, "body": record.body, "number": record.number, "html_url": record.html_url, "created_at": record.created_at, "updated_at": record.updated_at, "assignees": record.assignees, "created_by": record.user['id'], "repository": record.repository.lower(), "milestone": record.milestone 
-                    })
-
-                # Se a stream for pull requests
-                if (stream_name.lower() == 'pull_requests'):
-                    # print(f"    assignee {i+1}: id: {record.id}, login: {record.login}, html_url: {record.html_url}") # Imprime toda vez q encontra pull_requests
-
-                    pull_requests.append({
-                        "id": record.id, "created_by": record.user['id'], "repository": record.repository.lower(), "number": record.number, "state": record.state, "title": record.title, "body": record.body, "html_url": record.html_url, "created_at": record.created_at, "updated_at": record.updated_at, "merged_at": record.merged_at, "milestone": record.milestone, "assignees": record.assignees 
-                    })
-
-                # Se a stream for commits
-                if (stream_name.lower() == 'commits'):
-                    # print(f"    commit {i+1}: {record}") # Imprime toda vez q encontra commit
-
-                    # caso nao tenha author no commit, ele será ignorado.
-                    # possivelmente problemas de vinculo email no commit -> email cadastrado no github
-                    commitHasAuthor = getattr(record, 'author', False)
-                    if(commitHasAuthor != False and commitHasAuthor != None):
-                        user_login = record.author['login'].lower()
-                        if(user_login not in added_user_logins):
-                            users.append({
-                                "id": record.author['id'],
-                                "login": user_login,
-                                "html_url": record.author['html_url']
-                            })
-                            added_user_logins.append(user_login)
-
-                        commits.append({
-                            "user_id": record.author['id'], "repository": record.repository.lower(), "pull_request_id": None, "branch": record.branch.lower(), "created_at": record.created_at, "message": record.commit['message'], "sha": record.sha, "parents": record.parents, "html_url": record.html_url 
-                        })
-                
-                # Se a stream for assginees, adiciona mais usuarios, se possível
-                if (stream_name.lower() == 'assignees'):
-                    # print(f"    assignee {i+1}: id: {record.id}, login: {record.login}, html_url: {record.html_url}") # Imprime toda vez q encontra usuario em assignees
-                    user_login = record.login.lower()
-                    if(user_login not in added_user_logins):
-                        users.append({
-                            "id": record.id,
-                            "login": user_login,
-                            "html_url": record.html_url
-                        })
-                        added_user_logins.append(user_login)
-
-                ## Vinculando commits a suas pull requests
-                if(stream_name.lower() == 'pull_request_commits'):
-                    # print(f"  pr_commit {i+1}: {record.sha}, {record.pull_number}") # Imprime toda vez q encontra um branch
-                    pr_commits.append({
-                        'sha': record.sha, 'pr_number': record.pull_number, 'pr_id': None
-                    })
-
-        self.map_commit_sha_to_pr_id(commits, pull_requests, pr_commits)
-
-        print("--- Data Transform Completed ---")
-
-        return {
-            "users": users,
-            "repositories": repositories,
-            "branches": branches,
-            "milestones": milestones,
-            "issues": issues,
-            "pull_requests": pull_requests,
-            "commits": commits
-        } 
+        self.telemetry = Telemetry()
+        self.ledger = RunLedger(self.engine)
+        self.ledger.start(resume=self.resume)
+        self.pending_watermarks = []
+        serving_engine = self.engine
+        try:
+            upgrade_schema(self.engine) # Antes do schema sombra, que copia as tabelas do public
+            if self.swap_load:
+                self.engine = self.prepare_shadow()
+            success = self.run_stages()
+            if success and self.commit_graph:
+                self.build_commit_graph()
+            if success and self.swap_load:
+                success = self.publish_shadow()
+        except Exception:
+            self.ledger.finish("failed")
+            self.telemetry.write_summary(status="failed")
+            raise
+        finally:
+            if self.engine is not serving_engine:
+                self.engine.dispose()
+                self.engine = serving_engine
+        if success:
+            self.bump_data_version()
+        if success and self.maintenance:
+            self.maintain()
+        self.ledger.finish("success" if success else "failed")
+        self.telemetry.write_summary(status="success" if success else "failed")
+        return success
+
+    def run_stages(self):
+        self.id_resolver = IdResolver(self.engine)
+        self.id_resolver.load()
+
+        sync_state = None
+        if self.incremental:
+            sync_state = SyncState(self.engine)
+            sync_state.load()
+
+        with self.telemetry.stage("extract"):
+            airbyte_cached_data = self.checkpointed_extract()            # Extract
+        if airbyte_cached_data is None:
+            return False
+        self.cache_schemas = getattr(airbyte_cached_data, 'schemas', [CACHE_SCHEMA])
+
+        if self.sql_transform:
+            # Transform + Load no banco, um schema de cache por shard
+            with self.telemetry.stage("sql_transform"):
+                for cache_schema in getattr(airbyte_cached_data, 'schemas', [CACHE_SCHEMA]):
+                    scope = f"sql_transform:{cache_schema}"
+                    if self.ledger.is_done(scope):
+                        logger.info("SQL transform de %s já concluído nesta execução.", cache_schema)
+                        continue
+                    transform = SqlTransform(self.engine, cache_schema=cache_schema, timezone=self.timezone, incremental=self.incremental, update_watermarks=not self.swap_load)
+                    stats = transform.run()
+                    if self.incremental and self.swap_load:
+                        self.pending_watermarks.append(transform.save_state)
+                    for table, rows in stats.items():
+                        self.telemetry.count(table, "rows", rows)
+                    self.ledger.checkpoint(scope, status="done")
+            return True
+
+        # Transform + Load em streaming: cada lote transformado é carregado antes do próximo
+        logger.info("--- Data Transform Initiated---")
+        success = True
+        transformer = StreamTransformer(sync_state, batch_size=self.batch_size)
+        batches = self.telemetry.timed_iter("transform", transformer.batches(airbyte_cached_data), size=batch_rows)
+        for batch_number, transformed_data in enumerate(batches, start=1):
+            # Lotes já carregados na execução retomada são pulados (se o conteúdo for o mesmo)
+            fingerprint = batch_fingerprint(transformed_data)
+            if self.ledger.is_done("batch", batch_number, last_key=fingerprint):
+                logger.info("--- Lote %d já carregado, pulando ---", batch_number)
+                continue
+
+            logger.info("--- Lote %d ---", batch_number)
+            self.load_data(transformed_data, batch_number)
+            if self.load_failed:
+                success = False
+            else:
+                self.ledger.checkpoint("batch", batch_number, last_key=fingerprint, status="done")
+        logger.info("--- Data Transform Completed ---")
+
+        # As marcas d'água só avançam se todos os lotes foram carregados (no --swap-load, depois da troca)
+        if sync_state is not None and success:
+            if self.swap_load:
+                self.pending_watermarks.append(sync_state.save)
+            else:
+                sync_state.save()
+        return success
+
+    ''' --swap-load: copia as tabelas do public para o schema sombra (ou reaproveita o da execução
+        interrompida, no --resume) e retorna a engine que escreve nele.
+    '''
+    def prepare_shadow(self):
+        self.shadow = ShadowSchema(self.engine)
+        with self.telemetry.stage("shadow_prepare"):
+            self.shadow.prepare(reuse=self.resume)
+        return self.shadow.shadow_engine(pool_size=max(self.load_workers, 1), max_overflow=max(self.load_workers, 1), pool_pre_ping=True)
+
+    ''' Publica as tabelas do schema sombra no public e só então avança as marcas d'água.
+        Se a troca falhar o public fica como estava, e o schema sombra é reaproveitado pelo --resume.
+    '''
+    def publish_shadow(self):
+        try:
+            with self.telemetry.stage("swap"):
+                self.shadow.swap()
+        except Exception as e:
+            logger.error("Erro ao trocar as tabelas do schema sombra: %s", e)
+            return False
+
+        for save in self.pending_watermarks:
+            save()
+        return True
+
+    ''' Incrementa etl.data_version depois que os dados da execução ficam visíveis no public
+        (caches da API usam a versão na chave). Uma falha aqui é registrada, mas não invalida a carga.
+    '''
+    def bump_data_version(self):
+        try:
+            return DataVersion(self.engine).bump("etl", run_id=self.ledger.run_id)
+        except Exception as e:
+            logger.error("Erro ao atualizar a versão dos dados: %s", e)
+            return None
+
+    ''' Resolve os pais dos commits e regrava branch_commits das branches que mudaram.
+        Uma falha aqui é registrada, mas não invalida a carga.
+    '''
+    def build_commit_graph(self):
+        try:
+            with self.telemetry.stage("commit_graph"):
+                report = CommitGraph(self.engine).build()
+        except Exception as e:
+            logger.error("Erro ao materializar o grafo de commits: %s", e)
+            return None
+
+        for key in ("parents_resolved", "branches", "rebuilt", "rows"):
+            self.telemetry.count("commit_graph", key, report[key])
+        return report
+
+    ''' Manutenção pós-load: retenção do cache bruto do Airbyte e VACUUM (ANALYZE) nas tabelas carregadas.
+        Uma falha aqui é registrada, mas não invalida a carga.
+    '''
+    def maintain(self):
+        # O cache DuckDB fica fora do Postgres: só as tabelas carregadas passam pela manutenção
+        cache_schemas = self.cache_schemas if self.cache_backend == "postgres" else []
+        try:
+            with self.telemetry.stage("maintenance"):
+                report = Maintenance(self.engine, cache_schemas, retention=self.cache_retention).run()
+        except Exception as e:
+            logger.error("Erro na manutenção pós-load: %s", e)
+            return None
+
+        for key in ("truncated", "analyzed", "bytes_before", "bytes_after", "reclaimed_bytes"):
+            self.telemetry.count("maintenance", key, report[key])
+        return report
+
+    ''' Extrai do GitHub ou, se a execução retomada já concluiu a extração, reabre o cache do Airbyte
+        (o checkpoint "extract" guarda "<backend>:<schema>,<schema>,...").
+    '''
+    def checkpointed_extract(self):
+        if self.ledger.is_done("extract"):
+            cache_backend, _, schemas = self.ledger.entry("extract")["last_key"].rpartition(":")
+            schemas = schemas.split(",")
+            logger.info("Extração já concluída nesta execução; lendo o cache (%s)", ", ".join(schemas))
+            return read_cached(schemas, cache_backend or "postgres")
+
+        airbyte_cached_data = self.airbyte_extract()
+        if airbyte_cached_data is None:
+            return None
+
+        schemas = getattr(airbyte_cached_data, 'schemas', [CACHE_SCHEMA])
+        self.ledger.checkpoint("extract", last_key=f"{self.cache_backend}:{','.join(schemas)}", status="done")
+        return airbyte_cached_data
+
+    ''' sync_state (opcional): quando informado, somente registros alterados desde a
+        última execução são transformados.
+    '''
+    def data_transform(self, read_result, sync_state=None):
+        logger.info("--- Data Transform Initiated---")
+        with self.telemetry.stage("transform"):
+            transformed_data = StreamTransformer(sync_state).collect(read_result)
+        logger.info("--- Data Transform Completed ---")
+        return transformed_data
 
     # --- Inserindo Usuários ---
     def load_users(self,users_airbyte):
-        print("\n--- Loading Users ---")
+        logger.info("--- Loading Users ---")
         if len(users_airbyte) == 0:
-            print("Nenhum dado de usuário no cache do Airbyte.")
+            logger.info("Nenhum dado de usuário no cache do Airbyte.")
             return
 
         # print(users_airbyte)
 
+        counts = self.empty_counts()
         try:
-            # Tenta inserir. Se 'id' for PK e já existir, vai dar erro.
-            # O ideal é um UPSERT. Aqui, vamos simular um insert ignorando duplicatas ou um UPSERT.
+            # Upsert: insere usuários novos e atualiza login/html_url somente se mudaram
             with self.engine.connect() as connection:
                 for index, user in enumerate(users_airbyte):
-                    # Verifica se o usuário já existe pelo airbyte_id (se você mantiver essa coluna no seu DB)
-                    # Ou pelo 'login' se 'login' for UNIQUE
-                    
-                    query = text(f"SELECT id FROM user_info WHERE id = :id") # usar "user" por ser palavra reservada
-                    result = connection.execute(query, {'id': user['id']}).fetchone()
-
-                    if result:
-                        print(f"Usuário '{user['login']}' já existe. ID: {result[0]}")
-                    else:
-                        insert_query = text(f"INSERT INTO user_info (id, login, html_url) VALUES (:id, :login, :html_url) RETURNING id")
-                        new_id = connection.execute(insert_query, {'id': user['id'], 'login': user['login'], 'html_url': user['html_url']}).scalar_one()
-                        print(f"Usuário '{user['login']}' inserido com ID: {new_id}")
+                    status, user_id = self.upsert_row(connection, "user_info", "id", user, ["login", "html_url"], counts)
+                    self.telemetry.row("user_info", "Usuário '%s' %s. ID: %s", user['login'], STATUS_MESSAGES[status], user_id)
                 connection.commit() # Commit das operações
 
         except Exception as e:
-            print(f"Erro ao inserir users: {e}")
-        print("--- Users Done ---")
+            logger.error("Erro ao inserir users: %s", e)
+            self.telemetry.count("user_info", "errors")
+            return False
+        self.report_counts("user_info", counts)
+        logger.info("--- Users Done ---")
 
     def load_repositories(self, repos_airbyte):
-        print("\n--- Loading Repositories ---")
+        logger.info("--- Loading Repositories ---")
         if len(repos_airbyte) == 0:
-            print("Nenhum dado de repositório no cache do Airbyte.")
+            logger.info("Nenhum dado de repositório no cache do Airbyte.")
             return
 
         # print(repos_airbyte);
         try:
             with self.engine.connect() as connection:
                 for index, repo_name in enumerate(repos_airbyte):
-                    query = text(f"SELECT id FROM repository WHERE name = :name")
-                    result = connection.execute(query, {'name': repo_name}).fetchone()
+                    repository_id = self.id_resolver.repository_id(connection, repo_name)
 
-                    if result:
-                        print(f"Repositório '{repo_name}' já existe. ID: {result[0]}")
+                    if repository_id:
+                        self.telemetry.row("repository", "Repositório '%s' já existe. ID: %s", repo_name, repository_id)
+                        self.telemetry.count("repository", "unchanged")
                     else:
                         insert_query = text(f"INSERT INTO repository (name) VALUES (:name) RETURNING id")
                         new_id = connection.execute(insert_query, {'name': repo_name}).scalar_one()
-                        print(f"Repositório '{repo_name}' inserido com ID: {new_id}")
+                        self.id_resolver.add_repository(repo_name, new_id)
+                        self.telemetry.row("repository", "Repositório '%s' inserido com ID: %s", repo_name, new_id)
+                        self.telemetry.count("repository", "inserted")
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir repositories: {e}")
+            logger.error("Erro ao inserir repositories: %s", e)
+            self.telemetry.count("repository", "errors")
+            self.id_resolver.load() # Descarta IDs de inserções que sofreram rollback
+            return False
 
-        print("\n--- Repositories Done ---")
+        logger.info("--- Repositories Done ---")
 
     def load_branches(self, branches_airbyte):
-        print("\n--- Loading Branches ---")
+        logger.info("--- Loading Branches ---")
         if len(branches_airbyte) == 0:
-            print("Nenhum dado de branch no cache do Airbyte.")
+            logger.info("Nenhum dado de branch no cache do Airbyte.")
             return
 
         # print(branches_airbyte)
@@ -279,248 +436,250 @@ class ETL(metaclass=SingletonMeta):
         try:
             with self.engine.connect() as connection:
                 for index, branch in enumerate(branches_airbyte):
-                    query = text(f"SELECT id FROM repository WHERE name = :name")
-                    repo_result = connection.execute(query, {'name': branch['repository']}).fetchone()
-                    repository_id = repo_result[0]
-
-                    query = text(f"SELECT id FROM branch WHERE name = :name AND repository_id = :repository_id")
-                    result = connection.execute(query, {'name': branch['branch'], 'repository_id': repository_id}).fetchone()
+                    repository_id = self.id_resolver.repository_id(connection, branch['repository'])
+                    branch_id = self.id_resolver.branch_id(connection, repository_id, branch['branch'])
 
-                    branch_repo = f"{branch['repository']}:{branch['branch']}"
-                    if result:
-                        print(f"Branch '{branch['branch']}' já existe para o repositório {branch['repository']}. ID: {result[0]}")
+                    if branch_id:
+                        self.telemetry.row("branch", "Branch '%s' já existe para o repositório %s. ID: %s", branch['branch'], branch['repository'], branch_id)
+                        self.telemetry.count("branch", "unchanged")
                     else:
                         insert_query = text(f"INSERT INTO branch (name, repository_id) VALUES (:name, :repository_id) RETURNING id")
                         new_id = connection.execute(insert_query, {'name': branch['branch'], 'repository_id': repository_id}).scalar_one()
-                        print(f"Branch '{branch['branch']}' inserida para repo {branch['repository']} com ID: {new_id}")
+                        self.id_resolver.add_branch(repository_id, branch['branch'], new_id)
+                        self.telemetry.row("branch", "Branch '%s' inserida para repo %s com ID: %s", branch['branch'], branch['repository'], new_id)
+                        self.telemetry.count("branch", "inserted")
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir branches: {e}")
+            logger.error("Erro ao inserir branches: %s", e)
+            self.telemetry.count("branch", "errors")
+            self.id_resolver.load() # Descarta IDs de inserções que sofreram rollback
+            return False
 
-        print("\n--- Branches Done ---")
+        logger.info("--- Branches Done ---")
 
 
     def load_milestones(self, milestones_airbyte):
-        print("\n--- Loading Milestones ---")
+        logger.info("--- Loading Milestones ---")
         if len(milestones_airbyte) == 0:
-            print("Nenhum dado de repositório no cache do Airbyte.")
+            logger.info("Nenhum dado de repositório no cache do Airbyte.")
             return
 
         # print(milestones_airbyte);
         # print('\n')
 
+        counts = self.empty_counts()
         try:
+            created_at = self.localize_timestamps([milestone['created_at'] for milestone in milestones_airbyte])
+            updated_at = self.localize_timestamps([milestone['updated_at'] for milestone in milestones_airbyte])
+
             with self.engine.connect() as connection:
                 for index, milestone in enumerate(milestones_airbyte):
-                    query = text(f"SELECT id FROM milestone WHERE id = :id")
-                    result = connection.execute(query, {'id': milestone['id']}).fetchone()
+                    # Resolvendo id repo
+                    repository_id = self.id_resolver.repository_id(connection, milestone['repository'])
 
-                    if result:
-                        print(f"Milestone '{milestone['title']}' já existe. ID: {result[0]}")
-                    else:
-                        # Resolvendo id repo
-                        query = text(f"SELECT id FROM repository WHERE name = :name")
-                        result = connection.execute(query, {'name': milestone['repository']}).fetchone()
-                        repository_id = result[0];
-
-                        # Inserindo SaoPaulo TIMEZONE
-                        milestone['created_at'] = self.handlingTimeZoneToPostgres(milestone['created_at'])
-                        milestone['updated_at'] = self.handlingTimeZoneToPostgres(milestone['updated_at'])
-
-                        insert_query = text(f"INSERT INTO milestone (id, repository_id, title, description, number, state, created_at, updated_at, creator) VALUES (:id, :repository_id, :title, :description, :number, :state, :created_at, :updated_at, :creator) RETURNING id")
-                        new_id = connection.execute(insert_query, {'id': milestone['id'], 'repository_id': repository_id, 'title': milestone['title'], 'description': milestone['description'], 'number': milestone['number'], 'state': milestone['state'], 'created_at': milestone['created_at'], 'updated_at': milestone['updated_at'], 'creator': milestone['creator']}).scalar_one()
-                        print(f"Milestone '{milestone['title']}' inserida com ID: {new_id}")
+                    # Inserindo SaoPaulo TIMEZONE (localizado em lote antes do loop)
+                    milestone['created_at'] = created_at[index]
+                    milestone['updated_at'] = updated_at[index]
+
+                    row = {'id': milestone['id'], 'repository_id': repository_id, 'title': milestone['title'], 'description': milestone['description'], 'number': milestone['number'], 'state': milestone['state'], 'created_at': milestone['created_at'], 'updated_at': milestone['updated_at'], 'creator': milestone['creator']}
+                    status, milestone_id = self.upsert_row(connection, "milestone", "id", row, ["title", "description", "number", "state", "updated_at"], counts)
+                    self.telemetry.row("milestone", "Milestone '%s' %s. ID: %s", milestone['title'], STATUS_MESSAGES[status], milestone_id)
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir milestones: {e}")
+            logger.error("Erro ao inserir milestones: %s", e)
+            self.telemetry.count("milestone", "errors")
+            return False
+        self.report_counts("milestone", counts)
 
-        print("\n--- Milestones Done ---")
+        logger.info("--- Milestones Done ---")
 
     def load_issues(self, issues_airbyte):
-        print("\n--- Loading Issues ---")
+        logger.info("--- Loading Issues ---")
         if len(issues_airbyte) == 0:
-            print("Nenhum dado de issue no cache do Airbyte.")
+            logger.info("Nenhum dado de issue no cache do Airbyte.")
             return
 
         # print(issues_airbyte[0])
 
+        counts = self.empty_counts()
         try:
+            created_at = self.localize_timestamps([issue['created_at'] for issue in issues_airbyte])
+            updated_at = self.localize_timestamps([issue['updated_at'] for issue in issues_airbyte])
+
             with self.engine.connect() as connection:
                 for index, issue in enumerate(issues_airbyte):
-                    # Preparativos para inserir
-                    query = text(f"SELECT id FROM issue WHERE id = :id")
-                    result = connection.execute(query, {'id': issue['id']}).fetchone()
+                    # Resolvendo id repo
+                    repository_id = self.id_resolver.repository_id(connection, issue['repository'])
 
-                    if result:
-                        print(f"Issue '{issue['title']}' já existe. ID: {result[0]}")
-                    else:
-                        # Resolvendo id repo
-                        query = text(f"SELECT id FROM repository WHERE name = :name")
-                        repo_id_result = connection.execute(query, {'name': issue['repository']}).fetchone()
-                        repository_id = repo_id_result[0];
-
-                        # Se existe milestone vinculada
-                        milestone_id = None
-                        if(issue['milestone']):
-                            # print("issue milestone id: ", issue['milestone']['id'])
-                            milestone_id = issue['milestone']['id']
-
-                        # Inserindo SaoPaulo TIMEZONE
-                        issue['created_at'] = self.handlingTimeZoneToPostgres(issue['created_at'])
-                        issue['updated_at'] = self.handlingTimeZoneToPostgres(issue['updated_at'])
-
-                        insert_query = text(f"INSERT INTO issue (id, title, body, number, html_url, created_at, updated_at, created_by, repository_id, milestone_id) VALUES (:id, :title, :body, :number, :html_url, :created_at, :updated_at, :created_by, :repository_id, :milestone_id) RETURNING id")
-
-                        new_issue_id = connection.execute(insert_query, {'id': issue['id'], 'title': issue['title'], 'body': issue['body'], 'number': issue['number'], 'html_url': issue['html_url'], 'created_at': issue['created_at'], 'updated_at': issue['updated_at'], 'created_by': issue['created_by'], 'repository_id': repository_id, 'milestone_id': milestone_id}).scalar_one()
-                        print(f"Issue '{issue['title']}' inserida com ID: {new_issue_id}")
-
-                        # 
-                        if(issue['assignees']):
-                            for assignee in issue['assignees']:
-                                # print(f"Row: issue_id: {issue['id']}; ass: {assignee['id']}")
-                                insert_query = text(f"INSERT INTO issue_assignees (issue_id, user_id) VALUES (:issue_id, :user_id)")
-                                connection.execute(insert_query, {'issue_id': issue['id'], 'user_id': assignee['id']})
-                                print(f"Assignee '{assignee['login']}' adicionado.")
+                    # Se existe milestone vinculada
+                    milestone_id = issue['milestone_id']
+
+                    # Inserindo SaoPaulo TIMEZONE (localizado em lote antes do loop)
+                    issue['created_at'] = created_at[index]
+                    issue['updated_at'] = updated_at[index]
+
+                    row = {'id': issue['id'], 'title': issue['title'], 'body': issue['body'], 'number': issue['number'], 'html_url': issue['html_url'], 'created_at': issue['created_at'], 'updated_at': issue['updated_at'], 'created_by': issue['created_by'], 'repository_id': repository_id, 'milestone_id': milestone_id}
+                    status, issue_id = self.upsert_row(connection, "issue", "id", row, ["title", "body", "html_url", "updated_at", "milestone_id"], counts)
+                    self.telemetry.row("issue", "Issue '%s' %s. ID: %s", issue['title'], STATUS_MESSAGES[status], issue_id)
+
+                    # Assignees só mudam junto com a issue (updated_at); issues novas ou alteradas são sincronizadas
+                    if status != "unchanged":
+                        self.sync_assignees(connection, "issue_assignees", "issue_id", issue_id, issue['assignees'], status == "updated")
                         
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir issues: {e}")
+            logger.error("Erro ao inserir issues: %s", e)
+            self.telemetry.count("issue", "errors")
+            return False
+        self.report_counts("issue", counts)
 
-        print("\n--- Issues Done ---")
+        logger.info("--- Issues Done ---")
 
 
     def load_pull_requests(self, prs_airbyte):
-        print("\n--- Loading Pull Requests ---")
+        logger.info("--- Loading Pull Requests ---")
         if len(prs_airbyte) == 0:
-            print("Nenhum dado de pull request no cache do Airbyte.")
+            logger.info("Nenhum dado de pull request no cache do Airbyte.")
             return
 
         # print(prs_airbyte[0])
         # print(prs_airbyte[1])
 
+        counts = self.empty_counts()
         try:
+            created_at = self.localize_timestamps([pr['created_at'] for pr in prs_airbyte])
+            updated_at = self.localize_timestamps([pr['updated_at'] for pr in prs_airbyte])
+
             with self.engine.connect() as connection:
                 for index, pr in enumerate(prs_airbyte):
-                    # Preparativos para inserir
-                    query = text(f"SELECT id FROM pull_requests WHERE id = :id")
-                    result = connection.execute(query, {'id': pr['id']}).fetchone()
+                    # Resolvendo id repo
+                    repository_id = self.id_resolver.repository_id(connection, pr['repository'])
 
-                    if result:
-                        print(f"Pull request '{pr['title']}' já existe. ID: {result[0]}")
-                    else:
-                        # Resolvendo id repo
-                        query = text(f"SELECT id FROM repository WHERE name = :name")
-                        repo_id_result = connection.execute(query, {'name': pr['repository']}).fetchone()
-                        repository_id = repo_id_result[0];
-
-                        # Se existe milestone vinculada
-                        milestone_id = None
-                        if(pr['milestone']):
-                            print("issue milestone id: ", pr['milestone']['id'])
-                            milestone_id = pr['milestone']['id']
-
-                        # Inserindo SaoPaulo TIMEZONE
-                        pr['created_at'] = self.handlingTimeZoneToPostgres(pr['created_at'])
-                        pr['updated_at'] = self.handlingTimeZoneToPostgres(pr['updated_at'])
-
-                        insert_query = text(f"INSERT INTO pull_requests (id, created_by, repository_id, number, state, title, body, html_url, created_at, updated_at, milestone_id) VALUES (:id, :created_by, :repository_id, :number, :state, :title, :body, :html_url, :created_at, :updated_at, :milestone_id) RETURNING id")
-
-                        new_pr_id = connection.execute(insert_query, {'id': pr['id'], 'created_by': pr['created_by'], 'repository_id': repository_id, 'number': pr['number'], 'state': pr['state'], 'title': pr['title'], 'body': pr['body'], 'html_url': pr['html_url'], 'created_at': pr['created_at'], 'updated_at': pr['updated_at'], 'milestone_id': milestone_id}).scalar_one()
-                        print(f"Pull request '{pr['title']}' inserida com ID: {new_pr_id}")
-
-                        if(pr['assignees']):
-                            for assignee in issue['assignees']:
-                                # print(f"Row: pr_id: {pr['id']}; ass: {assignee['id']}")
-                                insert_query = text(f"INSERT INTO pull_request_assignees (pull_request_id, user_id) VALUES (:pull_request_id, :user_id)")
-                                connection.execute(insert_query, {'pull_request_id': pr['id'], 'user_id': assignee['id']})
-                                print(f"Assignee '{assignee['login']}' adicionado.")
+                    # Se existe milestone vinculada
+                    milestone_id = pr['milestone_id']
+
+                    # Inserindo SaoPaulo TIMEZONE (localizado em lote antes do loop)
+                    pr['created_at'] = created_at[index]
+                    pr['updated_at'] = updated_at[index]
+
+                    row = {'id': pr['id'], 'created_by': pr['created_by'], 'repository_id': repository_id, 'number': pr['number'], 'state': pr['state'], 'title': pr['title'], 'body': pr['body'], 'html_url': pr['html_url'], 'created_at': pr['created_at'], 'updated_at': pr['updated_at'], 'milestone_id': milestone_id}
+                    status, pr_id = self.upsert_row(connection, "pull_requests", "id", row, ["state", "title", "body", "html_url", "updated_at", "milestone_id"], counts)
+                    self.telemetry.row("pull_requests", "Pull request '%s' %s. ID: %s", pr['title'], STATUS_MESSAGES[status], pr_id)
+
+                    if status != "unchanged":
+                        self.sync_assignees(connection, "pull_request_assignees", "pull_request_id", pr_id, pr['assignees'], status == "updated")
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir issues: {e}")
+            logger.error("Erro ao inserir pull requests: %s", e)
+            self.telemetry.count("pull_requests", "errors")
+            return False
+        self.report_counts("pull_requests", counts)
 
-        print("\n--- Pull Requests Done ---")
+        logger.info("--- Pull Requests Done ---")
 
     def load_commits(self, commits_airbyte):
-        print("\n--- Loading Commits ---")
+        logger.info("--- Loading Commits ---")
         if len(commits_airbyte) == 0:
-            print("Nenhum dado de commit no cache do Airbyte.")
+            logger.info("Nenhum dado de commit no cache do Airbyte.")
             return
 
         # print(commits_airbyte[0])
 
+        counts = self.empty_counts()
         try:
+            created_at = self.localize_timestamps([commit['created_at'] for commit in commits_airbyte])
+
             with self.engine.connect() as connection:
-                for index, commit in enumerate(commits_airbyte):
-                    # Necessário para resolver branch id posteriormente
-                    query = text(f"SELECT id FROM repository WHERE name = :name")
-                    repo_result = connection.execute(query, {'name': commit['repository']}).fetchone()
-                    repository_id = repo_result[0]
+                # PRs que não vieram neste lote (ex.: sem alteração no modo incremental): uma consulta para todos
+                missing = {(commit['repository'], commit['pull_number']) for commit in commits_airbyte if commit['pull_request_id'] is None and commit.get('pull_number') is not None}
+                pull_request_ids = self.id_resolver.pull_request_ids(connection, missing)
 
-                    # Checa se ja foi inserido
-                    query = text(f"SELECT id FROM commits WHERE sha = :sha")
-                    result = connection.execute(query, {'sha': commit['sha']}).fetchone()
+                for index, commit in enumerate(commits_airbyte):
+                    if commit['pull_request_id'] is None and commit.get('pull_number') is not None:
+                        commit['pull_request_id'] = pull_request_ids.get((commit['repository'], commit['pull_number']))
 
-                    if result:
-                        print(f"Commit '{commit['sha']}' já foi adicionado. ID: {result[0]}")
-                    else:
-                        # Necessário para inserção 
-                        query = text(f"SELECT id FROM branch WHERE name = :name AND repository_id = :repository_id")
-                        result = connection.execute(query, {'name': commit['branch'], 'repository_id': repository_id}).fetchone()
-                        branch_id = result[0]
-
-                        # Inserindo SaoPaulo TIMEZONE
-                        commit['created_at'] = self.handlingTimeZoneToPostgres(commit['created_at'])
-
-                        # INSERT
-                        insert_query = text(f"""
-                            INSERT INTO commits (user_id, branch_id, pull_request_id, created_at, message, sha, html_url)
-                            VALUES (:user_id, :branch_id, :pull_request_id, :created_at, :message, :sha, :html_url)
-                            RETURNING id
-                        """)
-                        new_commit_id = connection.execute(insert_query, {
-                            'user_id': commit['user_id'], 'branch_id': branch_id, 'pull_request_id': commit['pull_request_id'],
-                            'created_at': commit['created_at'], 'message': commit['message'], 'sha': commit['sha'], 'html_url': commit['html_url']
-                        }).scalar_one()
-                        print(f"Commit '{commit['sha']}' inserido para repo {commit['repository']} com ID: {new_commit_id}")
-
-                        if(len(commit['parents']) > 0):
-                            for parent in commit['parents']:
-                                insert_query = text(f"INSERT INTO parents_commits (parent_sha, commit_id) VALUES (:parent_sha, :commit_id)")
-                                connection.execute(insert_query, {'parent_sha': parent['sha'], 'commit_id': new_commit_id})
-                                print(f"Commit '{parent['sha']}' parent do commit '{commit['sha']}' adicionado.")
+                    # Necessário para resolver branch id posteriormente
+                    repository_id = self.id_resolver.repository_id(connection, commit['repository'])
+                    branch_id = self.id_resolver.branch_id(connection, repository_id, commit['branch'])
+
+                    # Inserindo SaoPaulo TIMEZONE (localizado em lote antes do loop)
+                    commit['created_at'] = created_at[index]
+
+                    row = {
+                        'user_id': commit['user_id'], 'branch_id': branch_id, 'pull_request_id': commit['pull_request_id'],
+                        'created_at': commit['created_at'], 'message': commit['message'], 'sha': commit['sha'], 'html_url': commit['html_url']
+                    }
+                    # O conteúdo de um commit não muda; só o vínculo com o PR pode aparecer depois
+                    compare = ["pull_request_id"] if commit['pull_request_id'] is not None else []
+                    status, commit_id = self.upsert_row(connection, "commits", "sha", row, compare, counts)
+                    self.telemetry.row("commits", "Commit '%s' %s para repo %s. ID: %s", commit['sha'], STATUS_MESSAGES[status], commit['repository'], commit_id)
+
+                    if status == "inserted" and len(commit['parents']) > 0:
+                        for parent_number, parent_sha in enumerate(commit['parents']):
+                            insert_query = text(f"INSERT INTO parents_commits (parent_sha, commit_id, parent_number) VALUES (:parent_sha, :commit_id, :parent_number)")
+                            connection.execute(insert_query, {'parent_sha': parent_sha, 'commit_id': commit_id, 'parent_number': parent_number})
+                            self.telemetry.row("parents_commits", "Commit '%s' parent do commit '%s' adicionado.", parent_sha, commit['sha'])
 
                 connection.commit()
         except Exception as e:
-            print(f"Erro ao inserir commits: {e}")
-
-        print("\n--- Commits Done ---")
-
+            logger.error("Erro ao inserir commits: %s", e)
+            self.telemetry.count("commits", "errors")
+            return False
+        self.report_counts("commits", counts)
+
+        logger.info("--- Commits Done ---")
+
+
+    ''' Upsert de uma linha com detecção de mudança: insere se a chave não existe, atualiza
+        somente as colunas de compare_columns se alguma delas mudou e não escreve nada se a linha
+        está igual. Retorna ("inserted" | "updated" | "unchanged", id).
+    '''
+    def upsert_row(self, connection, table, key_column, row, compare_columns, counts=None):
+        select_columns = ", ".join(["id"] + compare_columns)
+        query = text(f"SELECT {select_columns} FROM {table} WHERE {key_column} = :key")
+        result = connection.execute(query, {'key': row[key_column]}).fetchone()
+
+        if result is None:
+            columns = ", ".join(row.keys())
+            values = ", ".join(f":{column}" for column in row.keys())
+            insert_query = text(f"INSERT INTO {table} ({columns}) VALUES ({values}) RETURNING id")
+            status, row_id = "inserted", connection.execute(insert_query, row).scalar_one()
+        elif tuple(result[1:]) == tuple(row[column] for column in compare_columns):
+            status, row_id = "unchanged", result[0]
+        else:
+            assignments = ", ".join(f"{column} = :{column}" for column in compare_columns)
+            update_query = text(f"UPDATE {table} SET {assignments} WHERE {key_column} = :{key_column}")
+            connection.execute(update_query, row)
+            status, row_id = "updated", result[0]
+
+        if counts is not None:
+            counts[status] += 1
+        return status, row_id
+
+    ''' Reinsere os assignees de uma issue/PR; se o registro foi atualizado, os antigos são removidos antes.
+    '''
+    def sync_assignees(self, connection, table, key_column, key, assignees, replace):
+        if replace:
+            connection.execute(text(f"DELETE FROM {table} WHERE {key_column} = :key"), {'key': key})
+
+        for assignee in assignees or []:
+            insert_query = text(f"INSERT INTO {table} ({key_column}, user_id) VALUES (:key, :user_id) ON CONFLICT DO NOTHING")
+            connection.execute(insert_query, {'key': key, 'user_id': assignee['id']})
+            self.telemetry.row(table, "Assignee '%s' adicionado.", assignee['login'])
+
+    def empty_counts(self):
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    def report_counts(self, table, counts):
+        logger.info("%s: %d inseridos, %d atualizados, %d sem alteração", table, counts['inserted'], counts['updated'], counts['unchanged'])
+        for status, amount in counts.items():
+            self.telemetry.count(table, status, amount)
 
     def handlingTimeZoneToPostgres(self, naive_datetime):
-        # Definir o fuso horário brasileiro de São Paulo
-        brazil_tz = pytz.timezone('America/Sao_Paulo')
-
         # Isso anexa a informação de fuso horário SEM mudar os componentes de hora.
-        dt_localized_brazil = brazil_tz.localize(naive_datetime, is_dst=None) # 'is_dst=None' para inferir DST se houver ambiguidade
-
-        # print(f"Localizado (Brasil): {dt_localized_brazil} | Timezone: {dt_localized_brazil.tzinfo}")
-
-        return dt_localized_brazil
-
-    def map_commit_sha_to_pr_id(self, commits, pull_requests, pr_commits):
-        pr_number_id = {}
-        commit_sha_pr_id = {}
-        # Resolvendo number -> id
-        for pr in pull_requests:
-            pr_number_id[pr['number']] = pr['id']
-
-        # print(pr_commits)
-        # Resolvendo sha -> id
-        for pr_commit in pr_commits:
-            # commit['pr_id'] = pr_number_id[pr_commit['pr_number']]
-            commit_sha_pr_id[pr_commit['sha']] = pr_number_id[pr_commit['pr_number']]
+        return localize(naive_datetime, self.timezone)
 
-        # Se sha do commit no dicionario, atualiza o pull_request_id do commit
-        for commit in commits:
-            # if(commit['sha'] in commit_sha_pr_id.key()):
-            commit['pull_request_id'] = commit_sha_pr_id.get(commit['sha'], None)
\ No newline at end of file
+    ''' Versão vetorizada do handlingTimeZoneToPostgres: localiza uma coluna inteira do lote de uma vez.
+    '''
+    def localize_timestamps(self, naive_datetimes):
+        return localize_many(naive_datetimes, self.timezone)
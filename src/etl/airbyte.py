@@ -1,7 +1,14 @@
+import os
+import itertools
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import airbyte as ab
-from airbyte.caches import PostgresCache
+from airbyte.caches import PostgresCache, DuckDBCache
 
 from src.assets.aux.env import env
+from src.etl.telemetry import get_logger, configure_logging
 # GitHub env var
 GITHUB_TOKEN = env["GITHUB_TOKEN"]
 # Db env vars
@@ -11,11 +18,24 @@ DB_NAME = env["DB_NAME"]
 DB_USER = env["DB_USER"]
 DB_PASSWORD = env["DB_PASSWORD"]
 
+# Cache do Airbyte: "postgres" (schemas no banco do ETL) ou "duckdb" (arquivo local, fora do banco servido)
+CACHE_BACKEND = env.get("ETL_CACHE_BACKEND", "postgres")
+DUCKDB_CACHE_DIR = env.get("ETL_DUCKDB_CACHE_DIR", ".airbyte_cache")
+
+logger = get_logger("extract")
+
+CACHE_SCHEMA = "airbyte_raw"
+CACHE_BACKENDS = ["postgres", "duckdb"]
+EXTRACT_WORKERS = 4
+
 class airbyte:
-    def __init__(self, repos, streams, github_token):
+    def __init__(self, repos, streams, github_token, incremental=False, schema_name=CACHE_SCHEMA, cache_backend=CACHE_BACKEND):
         self.repos = repos
         self.streams = streams
         self.github_token = github_token
+        self.incremental = incremental # Reaproveita o state das streams salvo no cache
+        self.schema_name = schema_name # Schema do cache (cada shard usa o seu)
+        self.cache_backend = cache_backend # Onde o Airbyte grava os dados brutos (postgres ou duckdb)
 
     def extract(self):
         # Configure the GitHub source
@@ -36,14 +56,128 @@ class airbyte:
         # Select the streams to extract
         source.select_streams(self.streams)
 
-        # Define PostgreSQL as a cache
-        cache = PostgresCache(
-            host = DB_HOST,
-            port = DB_PORT,
-            username = DB_USER,
-            password = DB_PASSWORD,
-            database = DB_NAME
-        )
+        # Define o cache (PostgreSQL ou arquivo DuckDB local)
+        cache = make_cache(self.schema_name, self.cache_backend)
 
         # Read from the source
-        return source.read(force_full_refresh=True, cache=cache)
\ No newline at end of file
+        # No modo incremental o PyAirbyte usa o state salvo no cache (<schema>._airbyte_state)
+        # e busca no GitHub somente o que mudou desde a última leitura
+        return source.read(force_full_refresh=not self.incremental, cache=cache)
+
+
+def postgres_cache(schema_name=CACHE_SCHEMA):
+    return PostgresCache(
+        host = DB_HOST,
+        port = DB_PORT,
+        username = DB_USER,
+        password = DB_PASSWORD,
+        database = DB_NAME,
+        schema_name = schema_name
+    )
+
+''' Cache em arquivo DuckDB local: os dados brutos ficam fora do Postgres servido ao chatbot e o
+    transform lê de um arquivo colunar local. Um arquivo por schema, então shards extraídos em
+    processos paralelos não disputam o mesmo arquivo (o DuckDB aceita um só processo escrevendo).
+'''
+def duckdb_cache(schema_name=CACHE_SCHEMA, cache_dir=None):
+    cache_dir = cache_dir or DUCKDB_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    # O nome do arquivo não pode ser igual ao do schema: o DuckDB usa o nome do arquivo como catálogo
+    return DuckDBCache(db_path=os.path.join(cache_dir, f"cache_{schema_name}.duckdb"), schema_name=schema_name)
+
+def make_cache(schema_name=CACHE_SCHEMA, cache_backend=CACHE_BACKEND):
+    if cache_backend == "postgres":
+        return postgres_cache(schema_name)
+    if cache_backend == "duckdb":
+        return duckdb_cache(schema_name)
+    raise ValueError(f"Cache do Airbyte desconhecido: {cache_backend} (opções: {', '.join(CACHE_BACKENDS)})")
+
+class ShardExtractionError(Exception):
+    def __init__(self, shards):
+        super().__init__(f"Extração falhou nos shards {', '.join(map(str, shards))}")
+        self.shards = shards
+
+def shard_schema(shard):
+    return f"{CACHE_SCHEMA}_shard_{shard}"
+
+''' O shard de cada repositório vem de um hash estável do nome, então um repositório continua
+    no mesmo schema (e reaproveita o state incremental) mesmo que a lista de repos mude.
+'''
+def split_repos(repos, shards):
+    buckets = [[] for _ in range(max(1, shards))]
+    for repo in repos:
+        buckets[zlib.crc32(repo.lower().encode()) % len(buckets)].append(repo)
+    return {shard: shard_repos for shard, shard_repos in enumerate(buckets) if len(shard_repos) > 0}
+
+# Executado no processo filho: o ReadResult não atravessa processos, só o nome do schema
+def extract_shard(repos, streams, github_token, incremental, schema_name, cache_backend=CACHE_BACKEND):
+    configure_logging()
+    airbyte(repos, streams, github_token, incremental=incremental, schema_name=schema_name, cache_backend=cache_backend).extract()
+    return schema_name
+
+''' Extração particionada: a lista de repositórios é dividida em shards e cada shard roda
+    seu próprio source-github em um processo separado, gravando em um schema de cache próprio
+    (airbyte_raw_shard_0, airbyte_raw_shard_1, ...). No fim os caches são unidos em um único
+    resultado com .streams, no formato esperado pelo data_transform.
+    Se algum shard falhar, os demais terminam e ShardExtractionError é levantado: um resultado
+    parcial não pode ser registrado como extração concluída.
+'''
+def extract_sharded(repos, streams, github_token, shards, max_workers=EXTRACT_WORKERS, incremental=False, cache_backend=CACHE_BACKEND):
+    shard_repos = split_repos(repos, shards)
+    logger.info("Extraindo %d repositórios em %d shards (%d em paralelo)", len(repos), len(shard_repos), max_workers)
+
+    schemas = []
+    failed = []
+    # spawn: o processo filho não herda conexões/engines abertos no processo pai
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, max_workers), mp_context=context) as executor:
+        futures = {
+            executor.submit(extract_shard, shard_repos[shard], streams, github_token, incremental, shard_schema(shard), cache_backend): shard
+            for shard in shard_repos
+        }
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                schemas.append(future.result())
+                logger.info("Shard %d extraído: %s", shard, ", ".join(shard_repos[shard]))
+            except Exception as e:
+                logger.error("Erro na extração do shard %d (%s): %s", shard, ", ".join(shard_repos[shard]), e)
+                failed.append(shard)
+
+    if failed:
+        raise ShardExtractionError(sorted(failed))
+    return ShardedReadResult([make_cache(schema_name, cache_backend) for schema_name in sorted(schemas)])
+
+
+''' Reabre caches já extraídos (ex.: retomada de uma execução) sem ler o GitHub de novo.
+'''
+def read_cached(schemas, cache_backend=CACHE_BACKEND):
+    return ShardedReadResult([make_cache(schema_name, cache_backend) for schema_name in schemas])
+
+
+class ShardedReadResult:
+    def __init__(self, caches):
+        self.caches = caches
+
+    @property
+    def schemas(self):
+        return [cache.schema_name for cache in self.caches]
+
+    @property
+    def streams(self):
+        streams = {}
+        for cache in self.caches:
+            for stream_name, dataset in cache.streams.items():
+                streams.setdefault(stream_name, []).append(dataset)
+        return {stream_name: ChainedDataset(datasets) for stream_name, datasets in streams.items()}
+
+
+class ChainedDataset:
+    def __init__(self, datasets):
+        self.datasets = datasets
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.datasets)
+
+    def __len__(self):
+        return sum(len(dataset) for dataset in self.datasets)
@@ -0,0 +1,352 @@
+import time
+from psycopg2.extras import execute_values
+from src.etl.telemetry import get_logger
+from src.etl.transform import ENTITIES
+
+''' Carregamento em lote (set-based) das tabelas do ETL.
+    Cada entidade é enviada em páginas multi-row com execute_values e mesclada
+    com INSERT ... ON CONFLICT usando as chaves únicas de init_db.sql, em vez de
+    um SELECT + INSERT por registro.
+
+    Upsert com detecção de mudança: cada linha recebida é comparada (IS DISTINCT FROM)
+    com a linha atual da tabela e só entra no INSERT ... ON CONFLICT DO UPDATE se for nova
+    ou se algum campo mudou. Linhas sem alteração nem chegam ao ON CONFLICT, então não
+    geram escrita (nem lock de linha). O RETURNING (xmax = 0) separa inseridas de atualizadas.
+'''
+
+logger = get_logger("bulk_loader")
+
+USERS_SQL = """
+    INSERT INTO user_info (id, login, html_url)
+    SELECT v.id, v.login, v.html_url
+    FROM (VALUES %s) AS v(id, login, html_url)
+    LEFT JOIN user_info t ON t.id = v.id
+    WHERE t.id IS NULL OR (t.login, t.html_url) IS DISTINCT FROM (v.login, v.html_url)
+    ON CONFLICT (id) DO UPDATE SET login = EXCLUDED.login, html_url = EXCLUDED.html_url
+    RETURNING id, (xmax = 0) AS inserted
+"""
+USERS_TEMPLATE = "(%s::bigint, %s::varchar, %s::text)"
+
+REPOSITORIES_SQL = """
+    INSERT INTO repository (name)
+    VALUES %s
+    ON CONFLICT (name) DO NOTHING
+"""
+REPOSITORIES_TEMPLATE = "(%s::varchar)"
+
+BRANCHES_SQL = """
+    INSERT INTO branch (name, repository_id)
+    SELECT v.name, r.id
+    FROM (VALUES %s) AS v(name, repository)
+    JOIN repository r ON r.name = v.repository
+    ON CONFLICT (name, repository_id) DO NOTHING
+"""
+BRANCHES_TEMPLATE = "(%s::varchar, %s::varchar)"
+
+# Milestones, issues e PRs: uma versão mais antiga que a gravada (webhook reentregue ou fora de ordem)
+# não sobrescreve a atual; sem updated_at de um dos lados, vale a comparação dos campos
+MILESTONES_SQL = """
+    INSERT INTO milestone (id, repository_id, title, description, number, state, created_at, updated_at, creator)
+    SELECT v.id, r.id, v.title, v.description, v.number, v.state, v.created_at, v.updated_at, v.creator
+    FROM (VALUES %s) AS v(id, repository, title, description, number, state, created_at, updated_at, creator)
+    JOIN repository r ON r.name = v.repository
+    LEFT JOIN milestone t ON t.id = v.id
+    WHERE t.id IS NULL
+       OR ((t.title, t.description, t.number, t.state, t.updated_at) IS DISTINCT FROM (v.title, v.description, v.number, v.state, v.updated_at)
+           AND (v.updated_at >= t.updated_at) IS NOT FALSE)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title, description = EXCLUDED.description, number = EXCLUDED.number,
+        state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+    RETURNING id, (xmax = 0) AS inserted
+"""
+MILESTONES_TEMPLATE = "(%s::bigint, %s::varchar, %s::text, %s::text, %s::integer, %s::varchar, %s::timestamptz, %s::timestamptz, %s::bigint)"
+
+ISSUES_SQL = """
+    INSERT INTO issue (id, title, body, number, html_url, created_at, updated_at, created_by, repository_id, milestone_id)
+    SELECT v.id, v.title, v.body, v.number, v.html_url, v.created_at, v.updated_at, v.created_by, r.id, v.milestone_id
+    FROM (VALUES %s) AS v(id, title, body, number, html_url, created_at, updated_at, created_by, repository, milestone_id)
+    JOIN repository r ON r.name = v.repository
+    LEFT JOIN issue t ON t.id = v.id
+    WHERE t.id IS NULL
+       OR ((t.title, t.body, t.html_url, t.updated_at, t.milestone_id) IS DISTINCT FROM (v.title, v.body, v.html_url, v.updated_at, v.milestone_id)
+           AND (v.updated_at >= t.updated_at) IS NOT FALSE)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title, body = EXCLUDED.body, html_url = EXCLUDED.html_url,
+        updated_at = EXCLUDED.updated_at, milestone_id = EXCLUDED.milestone_id
+    RETURNING id, (xmax = 0) AS inserted
+"""
+ISSUES_TEMPLATE = "(%s::bigint, %s::text, %s::text, %s::integer, %s::text, %s::timestamptz, %s::timestamptz, %s::bigint, %s::varchar, %s::bigint)"
+
+ISSUE_ASSIGNEES_SQL = """
+    INSERT INTO issue_assignees (issue_id, user_id)
+    SELECT i.id, u.id
+    FROM (VALUES %s) AS v(issue_id, user_id)
+    JOIN issue i ON i.id = v.issue_id
+    JOIN user_info u ON u.id = v.user_id
+    ON CONFLICT DO NOTHING
+"""
+
+PULL_REQUESTS_SQL = """
+    INSERT INTO pull_requests (id, created_by, repository_id, number, state, title, body, html_url, created_at, updated_at, milestone_id)
+    SELECT v.id, v.created_by, r.id, v.number, v.state, v.title, v.body, v.html_url, v.created_at, v.updated_at, v.milestone_id
+    FROM (VALUES %s) AS v(id, created_by, repository, number, state, title, body, html_url, created_at, updated_at, milestone_id)
+    JOIN repository r ON r.name = v.repository
+    LEFT JOIN pull_requests t ON t.id = v.id
+    WHERE t.id IS NULL
+       OR ((t.state, t.title, t.body, t.html_url, t.updated_at, t.milestone_id) IS DISTINCT FROM (v.state, v.title, v.body, v.html_url, v.updated_at, v.milestone_id)
+           AND (v.updated_at >= t.updated_at) IS NOT FALSE)
+    ON CONFLICT (id) DO UPDATE SET
+        state = EXCLUDED.state, title = EXCLUDED.title, body = EXCLUDED.body, html_url = EXCLUDED.html_url,
+        updated_at = EXCLUDED.updated_at, milestone_id = EXCLUDED.milestone_id
+    RETURNING id, (xmax = 0) AS inserted
+"""
+PULL_REQUESTS_TEMPLATE = "(%s::bigint, %s::bigint, %s::varchar, %s::integer, %s::varchar, %s::text, %s::text, %s::text, %s::timestamptz, %s::timestamptz, %s::bigint)"
+
+# Assignees de issues/PRs atualizados são sincronizados: os antigos são removidos antes da reinserção
+DELETE_ISSUE_ASSIGNEES_SQL = "DELETE FROM issue_assignees WHERE issue_id = ANY(%s)"
+
+PULL_REQUEST_ASSIGNEES_SQL = """
+    INSERT INTO pull_request_assignees (pull_request_id, user_id)
+    SELECT p.id, u.id
+    FROM (VALUES %s) AS v(pull_request_id, user_id)
+    JOIN pull_requests p ON p.id = v.pull_request_id
+    JOIN user_info u ON u.id = v.user_id
+    ON CONFLICT DO NOTHING
+"""
+
+DELETE_PULL_REQUEST_ASSIGNEES_SQL = "DELETE FROM pull_request_assignees WHERE pull_request_id = ANY(%s)"
+
+ASSIGNEES_TEMPLATE = "(%s::bigint, %s::bigint)"
+
+# Vínculo commit -> PR: o id vindo do transform ou, se o PR não veio no lote, o join por (repositório, número)
+COMMITS_SQL = """
+    INSERT INTO commits (user_id, branch_id, pull_request_id, created_at, message, sha, html_url)
+    SELECT v.user_id, b.id, COALESCE(v.pull_request_id, p.id), v.created_at, v.message, v.sha, v.html_url
+    FROM (VALUES %s) AS v(user_id, repository, branch, pull_request_id, pull_number, created_at, message, sha, html_url)
+    JOIN repository r ON r.name = v.repository
+    LEFT JOIN branch b ON b.repository_id = r.id AND b.name = v.branch
+    LEFT JOIN pull_requests p ON v.pull_request_id IS NULL AND p.repository_id = r.id AND p.number = v.pull_number
+    LEFT JOIN commits t ON t.sha = v.sha
+    WHERE t.id IS NULL
+       OR (COALESCE(v.pull_request_id, p.id) IS NOT NULL AND t.pull_request_id IS DISTINCT FROM COALESCE(v.pull_request_id, p.id))
+    ON CONFLICT (sha) DO UPDATE SET pull_request_id = EXCLUDED.pull_request_id
+    RETURNING id, (xmax = 0) AS inserted
+"""
+COMMITS_TEMPLATE = "(%s::bigint, %s::varchar, %s::varchar, %s::bigint, %s::integer, %s::timestamptz, %s::text, %s::varchar, %s::text)"
+
+PARENTS_COMMITS_SQL = """
+    INSERT INTO parents_commits (parent_sha, commit_id, parent_number)
+    SELECT v.parent_sha, c.id, v.parent_number
+    FROM (VALUES %s) AS v(sha, parent_sha, parent_number)
+    JOIN commits c ON c.sha = v.sha
+    ON CONFLICT (parent_sha, commit_id) DO NOTHING
+"""
+PARENTS_COMMITS_TEMPLATE = "(%s::varchar, %s::varchar, %s::smallint)"
+
+USER_IDS_BY_LOGIN_SQL = "SELECT login, id FROM user_info WHERE login = ANY(%s)"
+
+
+class BulkLoader:
+    PAGE_SIZE = 1000
+
+    def __init__(self, engine, localize, page_size=PAGE_SIZE):
+        self.engine = engine
+        self.localize = localize # Localiza uma coluna inteira de timestamps (ETL.localize_timestamps)
+        self.page_size = page_size
+        self.stats = {}
+
+    # --- Execução de um lote ---
+    ''' Retorna as linhas do RETURNING (ou []) e None se o lote falhou (rollback).
+        before: (sql, parâmetros) executado na mesma transação antes do lote, mesmo sem linhas.
+    '''
+    def _execute(self, table, sql, rows, template=None, fetch=False, before=None):
+        if len(rows) == 0 and before is None:
+            logger.info("%s: nenhum dado para carregar.", table)
+            return []
+
+        start = time.perf_counter()
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if before is not None:
+                cursor.execute(*before)
+            result = execute_values(cursor, sql, rows, template=template, page_size=self.page_size, fetch=fetch) if rows else []
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            logger.error("Erro no bulk load de %s: %s", table, e)
+            stats = self.stats.setdefault(table, {"rows": 0, "seconds": 0.0})
+            stats["rows"] += len(rows)
+            stats["errors"] = stats.get("errors", 0) + 1
+            return None
+        finally:
+            connection.close()
+
+        self._report(table, len(rows), time.perf_counter() - start, result if fetch else None)
+        return result or []
+
+    ''' returned: linhas devolvidas pelo RETURNING id, (xmax = 0), ou None quando o statement não separa
+        inseridas/atualizadas (ON CONFLICT DO NOTHING). Os contadores somam todas as chamadas da tabela:
+        a carga com checkpoints (ETL.checkpointed_load) chama uma vez por bloco de commit_every linhas.
+    '''
+    def _report(self, table, count, elapsed, returned=None):
+        rate = count / elapsed if elapsed > 0 else float(count)
+        stats = self.stats.setdefault(table, {"rows": 0, "seconds": 0.0})
+        stats["rows"] += count
+        stats["seconds"] += elapsed
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else float(stats["rows"])
+        summary = ""
+        if returned is not None:
+            inserted = sum(1 for row in returned if row[1])
+            updated = len(returned) - inserted
+            for key, amount in (("inserted", inserted), ("updated", updated), ("unchanged", count - len(returned))):
+                stats[key] = stats.get(key, 0) + amount
+            summary = f": {inserted} inseridas, {updated} atualizadas, {count - len(returned)} sem alteração"
+        logger.info("%s: %d linhas em %.2fs (%.0f linhas/s)%s", table, count, elapsed, rate, summary)
+
+    ''' O mesmo registro pode aparecer mais de uma vez no lote (ex.: re-sync, webhooks do mesmo issue);
+        o ON CONFLICT DO UPDATE não aceita atualizar a mesma linha duas vezes no mesmo statement, então
+        fica a versão com o maior updated_at (a última, no empate ou sem updated_at).
+    '''
+    def _unique(self, records, key='id'):
+        unique = {}
+        for record in records:
+            current = unique.get(record[key])
+            if current is None or not self._older(record, current):
+                unique[record[key]] = record
+        return list(unique.values())
+
+    def _older(self, record, current):
+        updated_at, current_updated_at = record.get('updated_at'), current.get('updated_at')
+        return updated_at is not None and current_updated_at is not None and updated_at < current_updated_at
+
+    ''' Remove os assignees de registros atualizados (o conjunto pode ter mudado) e
+        insere os assignees de todos os registros novos ou atualizados, na mesma transação:
+        se a inserção falhar, os antigos continuam (o registro pai não muda de novo no próximo
+        sync, então os assignees não seriam recriados).
+    '''
+    def _sync_assignees(self, table, delete_sql, insert_sql, returned, assignees):
+        updated_ids = [row[0] for row in returned if not row[1]]
+        changed_ids = {row[0] for row in returned}
+        rows = [assignee for assignee in assignees if assignee[0] in changed_ids]
+        before = (delete_sql, (updated_ids,)) if len(updated_ids) > 0 else None
+        return self._execute(table, insert_sql, rows, ASSIGNEES_TEMPLATE, before=before) is not None
+
+    # --- Entidades ---
+    def load_users(self, users):
+        rows = [(user['id'], user['login'], user['html_url']) for user in self._unique(users)]
+        return self._execute("user_info", USERS_SQL, rows, USERS_TEMPLATE, fetch=True) is not None
+
+    def load_repositories(self, repositories):
+        rows = [(repo_name,) for repo_name in repositories]
+        return self._execute("repository", REPOSITORIES_SQL, rows, REPOSITORIES_TEMPLATE) is not None
+
+    def load_branches(self, branches):
+        rows = [(branch['branch'], branch['repository']) for branch in branches]
+        return self._execute("branch", BRANCHES_SQL, rows, BRANCHES_TEMPLATE) is not None
+
+    def load_milestones(self, milestones):
+        milestones = self._unique(milestones)
+        created_at = self.localize([milestone['created_at'] for milestone in milestones])
+        updated_at = self.localize([milestone['updated_at'] for milestone in milestones])
+        rows = [(
+            milestone['id'], milestone['repository'], milestone['title'], milestone['description'],
+            milestone['number'], milestone['state'], created_at[index], updated_at[index], milestone['creator']
+        ) for index, milestone in enumerate(milestones)]
+        return self._execute("milestone", MILESTONES_SQL, rows, MILESTONES_TEMPLATE, fetch=True) is not None
+
+    def load_issues(self, issues):
+        rows = []
+        assignees = []
+        issues = self._unique(issues)
+        created_at = self.localize([issue['created_at'] for issue in issues])
+        updated_at = self.localize([issue['updated_at'] for issue in issues])
+        for index, issue in enumerate(issues):
+            rows.append((
+                issue['id'], issue['title'], issue['body'], issue['number'], issue['html_url'],
+                created_at[index], updated_at[index],
+                issue['created_by'], issue['repository'], issue['milestone_id']
+            ))
+            for assignee in issue['assignees'] or []:
+                assignees.append((issue['id'], assignee['id']))
+
+        returned = self._execute("issue", ISSUES_SQL, rows, ISSUES_TEMPLATE, fetch=True)
+        if returned is None:
+            return False
+        return self._sync_assignees("issue_assignees", DELETE_ISSUE_ASSIGNEES_SQL, ISSUE_ASSIGNEES_SQL, returned, assignees)
+
+    def load_pull_requests(self, pull_requests):
+        rows = []
+        assignees = []
+        pull_requests = self._unique(pull_requests)
+        created_at = self.localize([pr['created_at'] for pr in pull_requests])
+        updated_at = self.localize([pr['updated_at'] for pr in pull_requests])
+        for index, pr in enumerate(pull_requests):
+            rows.append((
+                pr['id'], pr['created_by'], pr['repository'], pr['number'], pr['state'], pr['title'],
+                pr['body'], pr['html_url'], created_at[index], updated_at[index],
+                pr['milestone_id']
+            ))
+            for assignee in pr['assignees'] or []:
+                assignees.append((pr['id'], assignee['id']))
+
+        returned = self._execute("pull_requests", PULL_REQUESTS_SQL, rows, PULL_REQUESTS_TEMPLATE, fetch=True)
+        if returned is None:
+            return False
+        return self._sync_assignees("pull_request_assignees", DELETE_PULL_REQUEST_ASSIGNEES_SQL, PULL_REQUEST_ASSIGNEES_SQL, returned, assignees)
+
+    def load_commits(self, commits):
+        rows = []
+        parents = []
+        commits = self._unique(commits, key='sha')
+        created_at = self.localize([commit['created_at'] for commit in commits])
+        for index, commit in enumerate(commits):
+            rows.append((
+                commit['user_id'], commit['repository'], commit['branch'], commit['pull_request_id'], commit['pull_number'],
+                created_at[index], commit['message'], commit['sha'], commit['html_url']
+            ))
+            for parent_number, parent_sha in enumerate(commit['parents'] or ()):
+                parents.append((commit['sha'], parent_sha, parent_number))
+
+        if self._execute("commits", COMMITS_SQL, rows, COMMITS_TEMPLATE, fetch=True) is None:
+            return False
+        return self._execute("parents_commits", PARENTS_COMMITS_SQL, parents, PARENTS_COMMITS_TEMPLATE) is not None
+
+    # --- Lote completo ---
+    ''' Carrega um lote inteiro ({entidade: [linhas]}) em sequência, na ordem das chaves estrangeiras.
+        Usado pela ingestão de webhooks; o ETL carrega as entidades em paralelo pelo LoadScheduler.
+    '''
+    def load_batch(self, batch):
+        for entity in ENTITIES:
+            rows = batch.get(entity) or []
+            if entity == "commits":
+                rows = self.resolve_authors(rows)
+            if rows and not getattr(self, f"load_{entity}")(rows):
+                return False
+        return True
+
+    ''' Commits vindos de push só trazem o login do autor: o id é buscado no user_info. Commits de
+        autores desconhecidos são ignorados, como os commits sem autor no transform do ETL.
+    '''
+    def resolve_authors(self, commits):
+        logins = list({commit['author_login'] for commit in commits if commit['user_id'] is None and commit.get('author_login')})
+        user_ids = {}
+        if logins:
+            connection = self.engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(USER_IDS_BY_LOGIN_SQL, (logins,))
+                user_ids = dict(cursor.fetchall())
+            finally:
+                connection.close()
+
+        resolved = []
+        for commit in commits:
+            if commit['user_id'] is None:
+                user_id = user_ids.get(commit.get('author_login'))
+                if user_id is None:
+                    logger.info("Commit %s ignorado: autor '%s' não encontrado.", commit['sha'], commit.get('author_login'))
+                    continue
+                commit['user_id'] = user_id
+            resolved.append(commit)
+        return resolved
@@ -0,0 +1,150 @@
+import time
+from collections import defaultdict
+from psycopg2.extras import execute_values
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Materializa o grafo de commits após o load, para perguntas de ancestralidade virarem
+    buscas por índice em vez de joins recursivos sobre SHAs:
+        1. Resolve parents_commits.parent_id (SHA do pai -> commits.id) em um único UPDATE.
+        2. Acha o último commit de cada branch (o commit da branch que não é pai de nenhum
+           outro commit da mesma branch; havendo mais de um, o mais recente).
+        3. Percorre a cadeia de primeiros pais a partir desse commit (position 1 = mais antigo)
+           e dá a cada commit alcançável a posição do commit da cadeia que o trouxe para a
+           branch (ele mesmo ou o merge), gravando tudo em branch_commits.
+    Só as branches cujo último commit mudou, ou que têm um commit com pai resolvido nesta
+    execução (histórico que chegou depois, sem mover o último commit), são regravadas, então
+    execuções incrementais reescrevem poucas linhas. A troca é feita em uma transação: quem consulta vê o grafo
+    antigo até o commit.
+'''
+
+RESOLVE_PARENTS_SQL = """
+    UPDATE parents_commits pc
+    SET parent_id = c.id
+    FROM commits c
+    WHERE pc.parent_id IS NULL AND c.sha = pc.parent_sha
+    RETURNING pc.commit_id
+"""
+
+# Branches já materializadas que alcançam algum dos commits
+REACHING_BRANCHES_SQL = "SELECT DISTINCT branch_id FROM branch_commits WHERE commit_id = ANY(:ids)"
+
+# Arestas filho -> pai, com o primeiro pai antes dos pais mesclados
+EDGES_SQL = "SELECT commit_id, parent_id FROM parents_commits WHERE parent_id IS NOT NULL ORDER BY commit_id, parent_number"
+
+BRANCH_COMMITS_SQL = "SELECT id, branch_id FROM commits WHERE branch_id IS NOT NULL ORDER BY created_at, id"
+
+# Último commit de cada branch já materializada (o de maior posição na cadeia de primeiros pais)
+CURRENT_HEADS_SQL = """
+    SELECT DISTINCT ON (branch_id) branch_id, commit_id
+    FROM branch_commits
+    WHERE first_parent
+    ORDER BY branch_id, position DESC
+"""
+
+DELETE_BRANCHES_SQL = "DELETE FROM branch_commits WHERE branch_id = ANY(%s)"
+
+INSERT_BRANCH_COMMITS_SQL = "INSERT INTO branch_commits (branch_id, commit_id, position, first_parent) VALUES %s"
+
+logger = get_logger("commit_graph")
+
+
+''' Linhas (commit_id, position, first_parent) de todos os commits alcançáveis a partir de head.
+    parents: commit_id -> [ids dos pais], primeiro pai antes.
+'''
+def walk_branch(head, parents):
+    mainline = []
+    seen = set()
+    commit = head
+    while commit is not None and commit not in seen:
+        mainline.append(commit)
+        seen.add(commit)
+        commit_parents = parents.get(commit)
+        commit = commit_parents[0] if commit_parents else None
+    mainline.reverse()
+
+    # Da raiz para a ponta: o que já foi visitado entrou na branch em uma posição anterior
+    rows = []
+    visited = set()
+    for position, landed in enumerate(mainline, start=1):
+        stack = [landed]
+        while stack:
+            commit = stack.pop()
+            if commit in visited:
+                continue
+            visited.add(commit)
+            rows.append((commit, position, commit == landed))
+            stack.extend(parents.get(commit, ()))
+    return rows
+
+
+''' Último commit de cada branch: dos commits da branch (em ordem de criação), o mais recente
+    que não é pai de outro commit da mesma branch.
+'''
+def branch_heads(branch_commits, parents):
+    branch_of = dict(branch_commits)
+    has_child = set()
+    for commit, branch_id in branch_commits:
+        for parent in parents.get(commit, ()):
+            if branch_of.get(parent) == branch_id:
+                has_child.add(parent)
+
+    heads = {}
+    for commit, branch_id in branch_commits:
+        if commit not in has_child:
+            heads[branch_id] = commit
+    return heads
+
+
+class CommitGraph:
+    PAGE_SIZE = 5000
+
+    def __init__(self, engine, page_size=PAGE_SIZE):
+        self.engine = engine
+        self.page_size = page_size
+
+    def build(self):
+        start = time.perf_counter()
+        with self.engine.begin() as connection:
+            resolved = [row[0] for row in connection.execute(text(RESOLVE_PARENTS_SQL))]
+            parents = defaultdict(list)
+            for commit, parent in connection.execute(text(EDGES_SQL)):
+                parents[commit].append(parent)
+            branch_commits = connection.execute(text(BRANCH_COMMITS_SQL)).fetchall()
+            current = dict(connection.execute(text(CURRENT_HEADS_SQL)).fetchall())
+            stale = set(connection.execute(text(REACHING_BRANCHES_SQL), {'ids': resolved}).scalars()) if resolved else set()
+
+        heads = branch_heads(branch_commits, parents)
+        branch_of = dict(branch_commits)
+        stale.update(branch_of[commit] for commit in resolved if commit in branch_of)
+        changed = {branch_id: head for branch_id, head in heads.items() if current.get(branch_id) != head or branch_id in stale}
+        rows = [(branch_id, commit, position, first_parent) for branch_id, head in changed.items() for commit, position, first_parent in walk_branch(head, parents)]
+        self.write(list(changed), rows)
+
+        report = {
+            "parents_resolved": len(resolved),
+            "branches": len(heads),
+            "rebuilt": len(changed),
+            "rows": len(rows),
+            "seconds": time.perf_counter() - start,
+        }
+        logger.info("Grafo de commits: %d de %d branches regravadas (%d linhas), %d pais resolvidos em %.2fs", report["rebuilt"], report["branches"], report["rows"], report["parents_resolved"], report["seconds"])
+        return report
+
+    ''' Substitui as linhas das branches alteradas em uma única transação.
+    '''
+    def write(self, branch_ids, rows):
+        if not branch_ids:
+            return
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(DELETE_BRANCHES_SQL, (branch_ids,))
+            execute_values(cursor, INSERT_BRANCH_COMMITS_SQL, rows, page_size=self.page_size)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Versão dos dados servidos pela API: um contador em etl.data_version incrementado a cada
+    escrita bem-sucedida nas tabelas do public (fim de uma execução do ETL ou lote de webhooks).
+    Caches de consultas usam a versão na chave, então qualquer carga os invalida sem precisar
+    saber o que mudou.
+'''
+
+logger = get_logger("data_version")
+
+CREATE_DATA_VERSION_SQL = """
+    CREATE SCHEMA IF NOT EXISTS etl;
+    CREATE TABLE IF NOT EXISTS etl.data_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0,
+        source VARCHAR(20),
+        run_id BIGINT,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+BUMP_DATA_VERSION_SQL = """
+    INSERT INTO etl.data_version (id, version, source, run_id, updated_at)
+    VALUES (TRUE, 1, :source, :run_id, CURRENT_TIMESTAMP)
+    ON CONFLICT (id)
+    DO UPDATE SET version = etl.data_version.version + 1, source = EXCLUDED.source, run_id = EXCLUDED.run_id, updated_at = CURRENT_TIMESTAMP
+    RETURNING version
+"""
+
+CURRENT_DATA_VERSION_SQL = "SELECT version, source, run_id, updated_at FROM etl.data_version"
+
+
+class DataVersion:
+    def __init__(self, engine):
+        self.engine = engine
+        self.created = False # Tabela criada por esta instância
+
+    def ensure(self, connection):
+        if not self.created:
+            connection.execute(text(CREATE_DATA_VERSION_SQL))
+            self.created = True
+
+    ''' Incrementa a versão; source: quem escreveu ('etl' ou 'webhook').
+    '''
+    def bump(self, source, run_id=None):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            version = connection.execute(text(BUMP_DATA_VERSION_SQL), {'source': source, 'run_id': run_id}).scalar_one()
+        logger.info("Versão dos dados: %d (%s)", version, source)
+        return version
+
+    ''' {"version", "source", "run_id", "updated_at"}; versão 0 se nada foi carregado ainda.
+    '''
+    def current(self):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            row = connection.execute(text(CURRENT_DATA_VERSION_SQL)).fetchone()
+        if row is None:
+            return {"version": 0, "source": None, "run_id": None, "updated_at": None}
+        return dict(row._mapping)
@@ -0,0 +1,70 @@
+from sqlalchemy import text
+from src.etl.telemetry import get_logger
+
+''' Cache de resolução de IDs de repositórios e branches, criado uma vez por execução do ETL.
+    Os mapas nome -> id e (repository_id, branch) -> id são carregados em lote no início,
+    atualizados a cada inserção e servem as buscas dos loaders direto da memória.
+    PRs de commits são resolvidos por lote (repositório, número) em uma única consulta.
+'''
+
+logger = get_logger("id_resolver")
+
+PULL_REQUEST_IDS_SQL = """
+    SELECT k.repository, k.number, p.id
+    FROM unnest(CAST(:repositories AS varchar[]), CAST(:numbers AS integer[])) AS k(repository, number)
+    JOIN repository r ON r.name = k.repository
+    JOIN pull_requests p ON p.repository_id = r.id AND p.number = k.number
+"""
+
+class IdResolver:
+    def __init__(self, engine):
+        self.engine = engine
+        self.repository_ids = {} # nome do repositório -> id
+        self.branch_ids = {} # (repository_id, nome da branch) -> id
+
+    def load(self):
+        with self.engine.connect() as connection:
+            repositories = connection.execute(text("SELECT name, id FROM repository")).fetchall()
+            branches = connection.execute(text("SELECT repository_id, name, id FROM branch")).fetchall()
+
+        self.repository_ids = {name: repository_id for name, repository_id in repositories}
+        self.branch_ids = {(repository_id, name): branch_id for repository_id, name, branch_id in branches}
+        logger.info("IDs carregados: %d repositórios, %d branches", len(self.repository_ids), len(self.branch_ids))
+
+    # --- Repositórios ---
+    def repository_id(self, connection, name):
+        repository_id = self.repository_ids.get(name)
+        if repository_id is None:
+            # Fallback: linha inserida fora deste cache (ex.: outro processo)
+            result = connection.execute(text("SELECT id FROM repository WHERE name = :name"), {'name': name}).fetchone()
+            if result:
+                repository_id = result[0]
+                self.repository_ids[name] = repository_id
+        return repository_id
+
+    def add_repository(self, name, repository_id):
+        self.repository_ids[name] = repository_id
+
+    # --- Branches ---
+    def branch_id(self, connection, repository_id, name):
+        branch_id = self.branch_ids.get((repository_id, name))
+        if branch_id is None:
+            result = connection.execute(text("SELECT id FROM branch WHERE name = :name AND repository_id = :repository_id"), {'name': name, 'repository_id': repository_id}).fetchone()
+            if result:
+                branch_id = result[0]
+                self.branch_ids[(repository_id, name)] = branch_id
+        return branch_id
+
+    def add_branch(self, repository_id, name, branch_id):
+        self.branch_ids[(repository_id, name)] = branch_id
+
+    # --- Pull requests ---
+    ''' Ids dos PRs por (repositório, número), para commits cujo PR não veio no lote do transform.
+    '''
+    def pull_request_ids(self, connection, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        params = {'repositories': [repository for repository, _ in keys], 'numbers': [number for _, number in keys]}
+        rows = connection.execute(text(PULL_REQUEST_IDS_SQL), params).fetchall()
+        return {(repository, number): pull_request_id for repository, number, pull_request_id in rows}
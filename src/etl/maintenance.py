@@ -0,0 +1,98 @@
+import time
+from sqlalchemy import text
+
+from src.assets.aux.env import env
+from src.etl.telemetry import get_logger
+
+''' Manutenção pós-load do ETL, executada ao fim de uma execução bem-sucedida:
+        1. Retenção do cache bruto do Airbyte no Postgres, conforme a política:
+             keep      mantém as tabelas como estão (padrão)
+             truncate  esvazia as tabelas de stream dos schemas de cache usados na execução e as
+                       tabelas airbyte_internal.<schema>_raw__stream_*. As tabelas internas
+                       (_airbyte_state, _airbyte_streams, ...) são mantidas, então o modo
+                       incremental continua de onde parou.
+        2. VACUUM (ANALYZE) nas tabelas carregadas, para o planner ter estatísticas atualizadas
+           para o SQL gerado logo após a sincronização.
+    O espaço liberado (pg_total_relation_size antes/depois) e o tempo gasto são reportados.
+    Execuções que falharam não passam por aqui: o cache é reaproveitado pelo --resume.
+
+    Configuração: ETL_CACHE_RETENTION (keep ou truncate) ou --cache-retention.
+'''
+
+CACHE_RETENTION = env.get("ETL_CACHE_RETENTION", "keep")
+RETENTION_POLICIES = ["keep", "truncate"]
+
+RAW_SCHEMA = "airbyte_internal"
+
+# Tabelas do ETL que recebem VACUUM (ANALYZE) após o load
+LOADED_TABLES = ["user_info", "repository", "branch", "milestone", "issue", "issue_assignees", "pull_requests", "pull_request_assignees", "commits", "parents_commits", "branch_commits"]
+
+CACHE_TABLES_SQL = r"""
+    SELECT table_schema, table_name
+    FROM information_schema.tables
+    WHERE table_type = 'BASE TABLE'
+      AND ((table_schema = ANY(:schemas) AND table_name NOT LIKE '\_airbyte\_%')
+        OR (table_schema = :raw_schema AND table_name LIKE ANY(:raw_patterns)))
+    ORDER BY table_schema, table_name
+"""
+
+TABLE_SIZE_SQL = "SELECT COALESCE(pg_total_relation_size(to_regclass(:name)), 0)"
+
+logger = get_logger("maintenance")
+
+
+def qualified(schema, table):
+    return '"{}"."{}"'.format(schema.replace('"', '""'), table.replace('"', '""'))
+
+
+class Maintenance:
+    def __init__(self, engine, cache_schemas, retention=CACHE_RETENTION, tables=LOADED_TABLES):
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(f"Política de retenção do cache desconhecida: {retention} (opções: {', '.join(RETENTION_POLICIES)})")
+        self.engine = engine
+        self.cache_schemas = list(cache_schemas) # Schemas de cache do Airbyte usados na execução
+        self.retention = retention
+        self.tables = tables
+
+    def run(self):
+        start = time.perf_counter()
+        # VACUUM não roda dentro de transação
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            cache_tables = self.cache_tables(connection) if self.retention == "truncate" else []
+            loaded_tables = [qualified("public", table) for table in self.tables]
+
+            bytes_before = self.total_size(connection, cache_tables + loaded_tables)
+
+            if cache_tables:
+                connection.execute(text(f"TRUNCATE {', '.join(cache_tables)}"))
+                logger.info("Cache do Airbyte: %d tabelas esvaziadas (%s)", len(cache_tables), ", ".join(self.cache_schemas))
+
+            for table in loaded_tables:
+                connection.execute(text(f"VACUUM (ANALYZE) {table}"))
+
+            bytes_after = self.total_size(connection, cache_tables + loaded_tables)
+
+        report = {
+            "retention": self.retention,
+            "truncated": len(cache_tables),
+            "analyzed": len(loaded_tables),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "reclaimed_bytes": max(bytes_before - bytes_after, 0),
+            "seconds": time.perf_counter() - start,
+        }
+        logger.info("Manutenção concluída em %.2fs: %d tabelas analisadas, %.1f MB liberados", report["seconds"], report["analyzed"], report["reclaimed_bytes"] / 2 ** 20)
+        return report
+
+    ''' Tabelas de stream dos schemas de cache e suas tabelas brutas em airbyte_internal (já com aspas).
+    '''
+    def cache_tables(self, connection):
+        if not self.cache_schemas:
+            return []
+        # "_" é curinga no LIKE
+        raw_patterns = [schema.replace("_", r"\_") + r"\_raw\_\_stream\_%" for schema in self.cache_schemas]
+        rows = connection.execute(text(CACHE_TABLES_SQL), {'schemas': self.cache_schemas, 'raw_schema': RAW_SCHEMA, 'raw_patterns': raw_patterns}).fetchall()
+        return [qualified(schema, table) for schema, table in rows]
+
+    def total_size(self, connection, tables):
+        return sum(connection.execute(text(TABLE_SIZE_SQL), {'name': table}).scalar_one() for table in tables)
@@ -0,0 +1,50 @@
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Atualiza bancos criados por versões anteriores do init_db.sql, que só roda em um volume vazio.
+    Os loaders gravam parents_commits.parent_number e o grafo de commits grava parent_id e
+    branch_commits; sem estas colunas/tabelas o load de commits falharia em bancos existentes.
+    Cada passo é idempotente, e o ALTER TABLE (que trava a tabela) só roda se algo estiver faltando.
+'''
+
+logger = get_logger("migrations")
+
+SCHEMA_READY_SQL = """
+    SELECT to_regclass('branch_commits') IS NOT NULL
+       AND (SELECT count(*) FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'parents_commits' AND column_name IN ('parent_number', 'parent_id')) = 2
+"""
+
+UPGRADE_SCHEMA_SQL = """
+    ALTER TABLE parents_commits
+        ADD COLUMN IF NOT EXISTS parent_number SMALLINT NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS parent_id BIGINT CONSTRAINT fk_pc_parent_id REFERENCES commits (id) ON DELETE SET NULL;
+
+    CREATE INDEX IF NOT EXISTS idx_pc_commit_id ON parents_commits (commit_id);
+    CREATE INDEX IF NOT EXISTS idx_pc_parent_id ON parents_commits (parent_id);
+
+    CREATE TABLE IF NOT EXISTS branch_commits (
+        branch_id INTEGER NOT NULL,
+        commit_id BIGINT NOT NULL,
+        position INTEGER NOT NULL,
+        first_parent BOOLEAN NOT NULL,
+        PRIMARY KEY (branch_id, commit_id),
+        CONSTRAINT fk_bc_branch FOREIGN KEY (branch_id) REFERENCES branch (id) ON DELETE CASCADE,
+        CONSTRAINT fk_bc_commit FOREIGN KEY (commit_id) REFERENCES commits (id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_bc_branch_position ON branch_commits (branch_id, position);
+    CREATE INDEX IF NOT EXISTS idx_bc_commit_id ON branch_commits (commit_id);
+"""
+
+
+''' Garante o schema atual das tabelas do ETL; retorna True se precisou atualizar.
+'''
+def upgrade_schema(engine):
+    with engine.begin() as connection:
+        if connection.execute(text(SCHEMA_READY_SQL)).scalar():
+            return False
+        connection.execute(text(UPGRADE_SCHEMA_SQL))
+    logger.warning("Schema do banco atualizado: parents_commits.parent_number/parent_id e branch_commits criados.")
+    return True
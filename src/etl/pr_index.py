@@ -0,0 +1,29 @@
+''' Índice commit -> PR montado em uma passada durante o transform em streaming.
+    Números de PR se repetem entre repositórios, então as chaves incluem o repositório:
+        (repositório, número do PR) -> id do PR   (stream pull_requests)
+        (repositório, sha)          -> número do PR (stream pull_request_commits)
+    O commit recebe o id do PR quando o PR passou pelo transform nesta execução e sempre
+    o número do PR (pull_number); PRs que não vieram no lote (ex.: sem alteração no modo
+    incremental) são resolvidos na carga por join em pull_requests (repository_id, number).
+'''
+
+
+class PullRequestIndex:
+    def __init__(self):
+        self.pull_request_ids = {} # (repositório, número do PR) -> id
+        self.commit_numbers = {} # (repositório, sha) -> número do PR
+
+    def add_pull_request(self, repository, number, pull_request_id):
+        self.pull_request_ids[(repository, number)] = pull_request_id
+
+    # Um commit listado em mais de um PR do repositório fica vinculado ao primeiro lido
+    def add_commit(self, repository, sha, number):
+        self.commit_numbers.setdefault((repository, sha), number)
+
+    ''' Retorna (id do PR, número do PR) do commit; o id é None se o PR não passou pelo transform.
+    '''
+    def link(self, repository, sha):
+        number = self.commit_numbers.get((repository, sha))
+        if number is None:
+            return None, None
+        return self.pull_request_ids.get((repository, number)), number
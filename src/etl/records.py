@@ -0,0 +1,126 @@
+''' Registros compactos produzidos pelo transform e consumidos pelos loaders.
+    Cada entidade é uma dataclass com slots (sem __dict__ por instância; todos os campos são
+    opcionais, com padrão None), e os campos carregam só o necessário para a carga:
+        - assignees: tupla de UserRecord compartilhados (um objeto por usuário no transform);
+        - parents: tupla com os SHAs dos pais (em vez dos objetos completos do GitHub);
+        - milestone_id: só o id da milestone (em vez do objeto completo);
+        - repository/branch: strings internadas (uma cópia por nome em todo o lote).
+    Os registros são Mappings (record['id'], keys(), parâmetros do SQLAlchemy), então o restante
+    do ETL continua lendo as linhas como antes.
+'''
+import datetime
+from dataclasses import dataclass
+from collections.abc import Mapping
+
+
+# Base dos registros: as subclasses são @dataclass(slots=True, eq=False), então __slots__ lista os campos
+class Record(Mapping):
+    __slots__ = ()
+
+    # Só os campos do registro são chaves (não os métodos, como keys/get)
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def as_dict(self):
+        return dict(self)
+
+    # Compara com outro registro do mesmo tipo ou com a linha em dict equivalente
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        if type(other) is type(self):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        return NotImplemented
+
+    __hash__ = None
+
+
+@dataclass(slots=True, eq=False)
+class UserRecord(Record):
+    id: int = None
+    login: str = None
+    html_url: str = None
+
+
+@dataclass(slots=True, eq=False)
+class BranchRecord(Record):
+    repository: str = None
+    branch: str = None
+
+
+@dataclass(slots=True, eq=False)
+class MilestoneRecord(Record):
+    id: int = None
+    repository: str = None
+    title: str = None
+    description: str = None
+    number: int = None
+    state: str = None
+    created_at: datetime.datetime = None
+    updated_at: datetime.datetime = None
+    creator: int = None
+
+
+@dataclass(slots=True, eq=False)
+class IssueRecord(Record):
+    id: int = None
+    title: str = None
+    body: str = None
+    number: int = None
+    html_url: str = None
+    created_at: datetime.datetime = None
+    updated_at: datetime.datetime = None
+    assignees: tuple = None
+    created_by: int = None
+    repository: str = None
+    milestone_id: int = None
+
+
+@dataclass(slots=True, eq=False)
+class PullRequestRecord(Record):
+    id: int = None
+    created_by: int = None
+    repository: str = None
+    number: int = None
+    state: str = None
+    title: str = None
+    body: str = None
+    html_url: str = None
+    created_at: datetime.datetime = None
+    updated_at: datetime.datetime = None
+    merged_at: datetime.datetime = None
+    milestone_id: int = None
+    assignees: tuple = None
+
+
+# author_login: commits de webhook (push) só trazem o login do autor; o id é resolvido na carga
+# pull_number: número do PR do commit no repositório; resolve pull_request_id na carga quando o PR não veio no lote
+@dataclass(slots=True, eq=False)
+class CommitRecord(Record):
+    user_id: int = None
+    repository: str = None
+    pull_request_id: int = None
+    branch: str = None
+    created_at: datetime.datetime = None
+    message: str = None
+    sha: str = None
+    parents: tuple = None
+    html_url: str = None
+    author_login: str = None
+    pull_number: int = None
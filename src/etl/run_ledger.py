@@ -0,0 +1,144 @@
+import hashlib
+import threading
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Livro-razão (ledger) das execuções do ETL, usado para retomar uma execução interrompida.
+    Cada execução tem uma linha em etl.runs e checkpoints em etl.run_ledger:
+        extract                  (lote 0)  extração concluída; last_key = schemas do cache usados
+        batch                    (lote N)  lote N carregado por completo; last_key = fingerprint do lote
+        <entidade>               (lote N)  linhas da entidade já commitadas no lote N (position/last_key)
+        sql_transform:<schema>   (lote 0)  transform em SQL concluído para o schema
+
+    Com --resume a última execução que não terminou com sucesso é reaberta: a extração é
+    reaproveitada do cache, lotes concluídos são pulados e cada entidade continua a partir
+    do último commit. Como os loaders fazem upsert, recarregar linhas é sempre seguro; os
+    checkpoints só evitam o trabalho repetido.
+'''
+
+logger = get_logger("run_ledger")
+
+CREATE_RUN_LEDGER_SQL = """
+    CREATE SCHEMA IF NOT EXISTS etl;
+    CREATE TABLE IF NOT EXISTS etl.runs (
+        id BIGSERIAL PRIMARY KEY,
+        status VARCHAR(20) NOT NULL DEFAULT 'running',
+        started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP WITH TIME ZONE
+    );
+    CREATE TABLE IF NOT EXISTS etl.run_ledger (
+        run_id BIGINT NOT NULL REFERENCES etl.runs (id) ON DELETE CASCADE,
+        scope VARCHAR(100) NOT NULL,
+        batch_number INTEGER NOT NULL DEFAULT 0,
+        position INTEGER NOT NULL DEFAULT 0,
+        last_key TEXT,
+        status VARCHAR(20) NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, scope, batch_number)
+    );
+"""
+
+UPSERT_CHECKPOINT_SQL = """
+    INSERT INTO etl.run_ledger (run_id, scope, batch_number, position, last_key, status, updated_at)
+    VALUES (:run_id, :scope, :batch_number, :position, :last_key, :status, CURRENT_TIMESTAMP)
+    ON CONFLICT (run_id, scope, batch_number)
+    DO UPDATE SET position = EXCLUDED.position, last_key = EXCLUDED.last_key, status = EXCLUDED.status, updated_at = CURRENT_TIMESTAMP
+"""
+
+# Chave que identifica uma linha transformada de cada entidade
+ROW_KEYS = {
+    "users": lambda row: str(row['id']),
+    "repositories": lambda row: row,
+    "branches": lambda row: f"{row['repository']}:{row['branch']}",
+    "milestones": lambda row: str(row['id']),
+    "issues": lambda row: str(row['id']),
+    "pull_requests": lambda row: str(row['id']),
+    "commits": lambda row: row['sha'],
+}
+
+
+def row_key(entity, row):
+    return ROW_KEYS[entity](row)
+
+''' Fingerprint do conteúdo de um lote (chaves de todas as linhas), para confirmar na retomada
+    que o lote regenerado a partir do cache é o mesmo que foi carregado antes.
+'''
+def batch_fingerprint(batch):
+    digest = hashlib.md5()
+    for entity, rows in batch.items():
+        for row in rows:
+            digest.update(f"{entity}:{row_key(entity, row)}\n".encode())
+    return digest.hexdigest()
+
+
+class RunLedger:
+    def __init__(self, engine):
+        self.engine = engine
+        self.run_id = None
+        self.entries = {} # (scope, lote) -> {"position", "last_key", "status"}
+        self.lock = threading.Lock() # Checkpoints chegam dos loaders em paralelo
+
+    ''' Abre uma nova execução ou, com resume=True, reabre a última que não terminou com sucesso.
+    '''
+    def start(self, resume=False):
+        with self.engine.begin() as connection:
+            connection.execute(text(CREATE_RUN_LEDGER_SQL))
+
+            previous = None
+            if resume:
+                previous = connection.execute(text("SELECT id FROM etl.runs WHERE status <> 'success' ORDER BY id DESC LIMIT 1")).fetchone()
+
+            if previous is not None:
+                self.run_id = previous[0]
+                connection.execute(text("UPDATE etl.runs SET status = 'running', finished_at = NULL WHERE id = :id"), {'id': self.run_id})
+                rows = connection.execute(text("SELECT scope, batch_number, position, last_key, status FROM etl.run_ledger WHERE run_id = :id"), {'id': self.run_id}).fetchall()
+                self.entries = {(scope, batch_number): {"position": position, "last_key": last_key, "status": status} for scope, batch_number, position, last_key, status in rows}
+                logger.info("Retomando a execução %s (%d checkpoints)", self.run_id, len(self.entries))
+            else:
+                if resume:
+                    logger.info("Nenhuma execução interrompida para retomar; iniciando uma nova.")
+                self.run_id = connection.execute(text("INSERT INTO etl.runs (status) VALUES ('running') RETURNING id")).scalar_one()
+                self.entries = {}
+                logger.info("Execução %s iniciada", self.run_id)
+        return self.run_id
+
+    def finish(self, status):
+        with self.engine.begin() as connection:
+            connection.execute(text("UPDATE etl.runs SET status = :status, finished_at = CURRENT_TIMESTAMP WHERE id = :id"), {'status': status, 'id': self.run_id})
+        logger.info("Execução %s finalizada: %s", self.run_id, status)
+
+    # --- Checkpoints ---
+    def entry(self, scope, batch_number=0):
+        with self.lock:
+            return self.entries.get((scope, batch_number))
+
+    def is_done(self, scope, batch_number=0, last_key=None):
+        entry = self.entry(scope, batch_number)
+        if entry is None or entry["status"] != "done":
+            return False
+        return last_key is None or entry["last_key"] == last_key
+
+    def checkpoint(self, scope, batch_number=0, position=0, last_key=None, status="running"):
+        with self.engine.begin() as connection:
+            connection.execute(text(UPSERT_CHECKPOINT_SQL), {
+                'run_id': self.run_id, 'scope': scope, 'batch_number': batch_number,
+                'position': position, 'last_key': last_key, 'status': status
+            })
+        with self.lock:
+            self.entries[(scope, batch_number)] = {"position": position, "last_key": last_key, "status": status}
+
+    ''' Índice da primeira linha ainda não carregada da entidade no lote. O checkpoint só é
+        aceito se a linha na posição salva ainda tiver a mesma chave; senão a entidade recomeça do zero.
+    '''
+    def resume_position(self, entity, batch_number, rows):
+        entry = self.entry(entity, batch_number)
+        if entry is None or entry["position"] == 0:
+            return 0
+
+        position = entry["position"]
+        if position <= len(rows) and row_key(entity, rows[position - 1]) == entry["last_key"]:
+            return position
+
+        logger.warning("Checkpoint de %s no lote %d não confere com os dados; recarregando a entidade.", entity, batch_number)
+        return 0
@@ -0,0 +1,100 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.etl.telemetry import get_logger
+
+''' Agendador de loads em DAG.
+    Cada nó é uma função de carga com as dependências (chaves estrangeiras) que precisam
+    terminar antes dela. Nós independentes rodam em paralelo, até max_workers por vez,
+    e o tempo de cada nó é registrado para mostrar o caminho crítico.
+'''
+
+logger = get_logger("scheduler")
+
+class LoadScheduler:
+    def __init__(self, max_workers=4):
+        self.max_workers = max(1, max_workers)
+        self.nodes = {} # nome -> função
+        self.dependencies = {} # nome -> nomes que precisam terminar antes
+        self.timings = {} # nome -> {"start", "end", "seconds"}
+        self.failed = set() # nós que falharam ou foram ignorados na última execução
+
+    def add(self, name, function, depends_on=()):
+        self.nodes[name] = function
+        self.dependencies[name] = list(depends_on)
+
+    def run(self):
+        for name, depends_on in self.dependencies.items():
+            for dependency in depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Nó '{name}' depende de '{dependency}', que não foi registrado")
+
+        results = {}
+        failed = set()
+        done = set()
+        running = {}
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(done) < len(self.nodes):
+                # Submete todos os nós cujas dependências já terminaram (na ordem de registro)
+                skipped = False
+                for name in self.nodes:
+                    if name in done or name in running.values():
+                        continue
+                    depends_on = self.dependencies[name]
+                    if any(dependency in failed for dependency in depends_on):
+                        logger.warning("Nó '%s' ignorado: uma dependência falhou.", name)
+                        failed.add(name)
+                        done.add(name)
+                        skipped = True
+                    elif all(dependency in done for dependency in depends_on):
+                        future = executor.submit(self._timed, name, origin)
+                        running[future] = name
+
+                if len(running) == 0:
+                    if not skipped and len(done) < len(self.nodes):
+                        raise ValueError("Dependências circulares entre os nós do load")
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    done.add(name)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.error("Erro no nó '%s': %s", name, e)
+                        failed.add(name)
+
+        self.failed = failed
+        self.report(origin)
+        return results
+
+    def _timed(self, name, origin):
+        start = time.perf_counter()
+        try:
+            return self.nodes[name]()
+        finally:
+            end = time.perf_counter()
+            self.timings[name] = {"start": start - origin, "end": end - origin, "seconds": end - start}
+
+    ''' Caminho crítico: partindo do nó que terminou por último, segue sempre a dependência mais lenta.
+    '''
+    def critical_path(self):
+        if len(self.timings) == 0:
+            return []
+
+        path = []
+        node = max(self.timings, key=lambda name: self.timings[name]["end"])
+        while node is not None:
+            path.append(node)
+            dependencies = [dependency for dependency in self.dependencies[node] if dependency in self.timings]
+            node = max(dependencies, key=lambda name: self.timings[name]["end"]) if dependencies else None
+        return list(reversed(path))
+
+    def report(self, origin):
+        total = time.perf_counter() - origin
+        logger.info("--- Load DAG (%d workers): %.2fs ---", self.max_workers, total)
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]["start"]):
+            logger.info("%s: início %.2fs, fim %.2fs (%.2fs)", name, timing['start'], timing['end'], timing['seconds'])
+        logger.info("Caminho crítico: %s", " -> ".join(self.critical_path()))
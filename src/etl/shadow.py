@@ -0,0 +1,162 @@
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.assets.aux.env import env
+from src.etl.maintenance import LOADED_TABLES
+from src.etl.telemetry import get_logger
+
+''' Carga blue/green (--swap-load): o ETL escreve em cópias das tabelas em um schema sombra
+    e, ao fim de uma execução bem-sucedida, as cópias substituem as tabelas do public em uma
+    única transação. Quem consulta (MyVanna.run_sql) nunca espera pelas escritas do ETL e
+    nunca vê uma sincronização pela metade.
+        1. prepare: recria o schema sombra com as tabelas do public (dados copiados antes dos
+           índices, que são construídos de uma vez; depois as chaves estrangeiras, que passam
+           a apontar para as tabelas do próprio schema sombra).
+        2. shadow_engine: conexões com search_path no schema sombra, então loaders, SQL transform e
+           grafo de commits escrevem nas cópias sem mudar nenhum SQL.
+        3. swap: move as tabelas atuais para um schema de descarte e as cópias para o public.
+           As sequences (ids SERIAL) continuam no public e só trocam de dono. O lock de cada
+           tabela é pedido com lock_timeout curto e a troca é repetida algumas vezes, para não
+           enfileirar as consultas do chat atrás de um lock esperando uma consulta longa.
+    Escritas feitas direto no public durante a carga (ex.: webhooks) ficam nas tabelas
+    antigas e são descartadas na troca; a próxima sincronização as traz do GitHub de novo.
+
+    Configuração: ETL_SHADOW_SCHEMA (padrão etl_shadow) e ETL_SWAP_LOCK_TIMEOUT (padrão 2s).
+'''
+
+SHADOW_SCHEMA = env.get("ETL_SHADOW_SCHEMA", "etl_shadow")
+SWAP_LOCK_TIMEOUT = env.get("ETL_SWAP_LOCK_TIMEOUT", "2s")
+SWAP_ATTEMPTS = 5
+
+RETIRED_SCHEMA = "etl_retired"
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+# Chaves primárias/únicas e chaves estrangeiras das tabelas do public (definições sem schema: search_path = public)
+CONSTRAINTS_SQL = """
+    SELECT c.conname, c.contype, pg_get_constraintdef(c.oid)
+    FROM pg_constraint c
+    WHERE c.conrelid = to_regclass(:table) AND c.contype IN ('p', 'u', 'f')
+    ORDER BY c.conname
+"""
+
+# Índices que não pertencem a uma constraint
+INDEXES_SQL = """
+    SELECT pg_get_indexdef(i.indexrelid)
+    FROM pg_index i
+    WHERE i.indrelid = to_regclass(:table)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u', 'x'))
+"""
+
+# Sequences das colunas SERIAL das tabelas
+OWNED_SEQUENCES_SQL = """
+    SELECT format('%I.%I', sn.nspname, s.relname), t.relname, a.attname
+    FROM pg_depend d
+    JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+    JOIN pg_namespace sn ON sn.oid = s.relnamespace
+    JOIN pg_class t ON t.oid = d.refobjid
+    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+    WHERE d.deptype = 'a' AND t.relnamespace = to_regnamespace(:schema) AND t.relname = ANY(:tables)
+"""
+
+SHADOW_TABLES_SQL = "SELECT count(*) FROM information_schema.tables WHERE table_schema = :schema AND table_name = ANY(:tables)"
+
+logger = get_logger("shadow")
+
+
+def quoted(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+class ShadowSchema:
+    def __init__(self, engine, schema=SHADOW_SCHEMA, tables=LOADED_TABLES, lock_timeout=SWAP_LOCK_TIMEOUT, attempts=SWAP_ATTEMPTS):
+        self.engine = engine # Engine do public (o mesmo das consultas)
+        self.schema = schema
+        self.tables = tables
+        self.lock_timeout = lock_timeout
+        self.attempts = attempts
+
+    def table(self, schema, table):
+        return f"{quoted(schema)}.{quoted(table)}"
+
+    ''' Cria o schema sombra com a cópia das tabelas do public.
+        reuse: mantém um schema sombra completo de uma execução interrompida (--resume), com os lotes já carregados.
+    '''
+    def prepare(self, reuse=False):
+        start = time.perf_counter()
+        with self.engine.begin() as connection:
+            if reuse and connection.execute(text(SHADOW_TABLES_SQL), {'schema': self.schema, 'tables': self.tables}).scalar_one() == len(self.tables):
+                logger.info("Schema sombra %s reaproveitado da execução anterior.", self.schema)
+                return False
+
+            connection.execute(text("SELECT set_config('search_path', 'public', true)"))
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {quoted(self.schema)} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {quoted(self.schema)}"))
+
+            foreign_keys = []
+            for table in self.tables:
+                source, target = self.table("public", table), self.table(self.schema, table)
+                constraints = connection.execute(text(CONSTRAINTS_SQL), {'table': source}).fetchall()
+                indexes = [row[0] for row in connection.execute(text(INDEXES_SQL), {'table': source})]
+
+                # Dados antes dos índices: cada índice é construído uma vez, em vez de atualizado linha a linha
+                connection.execute(text(f"CREATE TABLE {target} (LIKE {source} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)"))
+                connection.execute(text(f"INSERT INTO {target} SELECT * FROM {source}"))
+                for name, kind, definition in constraints:
+                    if kind == "f":
+                        foreign_keys.append((target, name, definition))
+                    else:
+                        connection.execute(text(f"ALTER TABLE {target} ADD CONSTRAINT {quoted(name)} {definition}"))
+                for definition in indexes:
+                    connection.execute(text(definition.replace(f" ON public.{table} ", f" ON {target} ", 1)))
+
+            # Referências sem schema nas definições passam a apontar para as tabelas do schema sombra
+            connection.execute(text("SELECT set_config('search_path', :schema, true)"), {'schema': self.schema})
+            for target, name, definition in foreign_keys:
+                connection.execute(text(f"ALTER TABLE {target} ADD CONSTRAINT {quoted(name)} {definition}"))
+
+        logger.info("Schema sombra %s criado com %d tabelas em %.2fs", self.schema, len(self.tables), time.perf_counter() - start)
+        return True
+
+    ''' Engine com search_path no schema sombra, para os loaders escreverem nas cópias.
+    '''
+    def shadow_engine(self, **kwargs):
+        return create_engine(self.engine.url, connect_args={"options": f"-c search_path={self.schema}"}, **kwargs)
+
+    ''' Troca as tabelas do public pelas do schema sombra; repete se algum lock não sair dentro do lock_timeout.
+    '''
+    def swap(self):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                start = time.perf_counter()
+                self.swap_tables()
+                break
+            except OperationalError as e:
+                if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or attempt == self.attempts:
+                    raise
+                logger.warning("Troca de tabelas aguardando consultas em andamento (tentativa %d de %d)", attempt, self.attempts)
+                time.sleep(attempt)
+        logger.info("Tabelas do schema sombra publicadas em %.3fs", time.perf_counter() - start)
+
+        # As tabelas antigas saem depois da troca: consultas que ainda as leem terminam antes do DROP
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {quoted(RETIRED_SCHEMA)} CASCADE"))
+
+    def swap_tables(self):
+        with self.engine.begin() as connection:
+            connection.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {'timeout': self.lock_timeout})
+            sequences = connection.execute(text(OWNED_SEQUENCES_SQL), {'schema': "public", 'tables': self.tables}).fetchall()
+
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {quoted(RETIRED_SCHEMA)} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {quoted(RETIRED_SCHEMA)}"))
+            # A sequence tem que estar no schema da tabela dona: fica sem dono durante a troca
+            for sequence, _, _ in sequences:
+                connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+            for table in self.tables:
+                connection.execute(text(f"ALTER TABLE {self.table('public', table)} SET SCHEMA {quoted(RETIRED_SCHEMA)}"))
+            for table in self.tables:
+                connection.execute(text(f"ALTER TABLE {self.table(self.schema, table)} SET SCHEMA public"))
+            for sequence, table, column in sequences:
+                connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {self.table('public', table)}.{quoted(column)}"))
+            connection.execute(text(f"DROP SCHEMA {quoted(self.schema)}"))
@@ -0,0 +1,315 @@
+from sqlalchemy import text
+
+from src.etl.sync_state import CURSOR_FIELDS
+from src.etl.telemetry import get_logger
+from src.etl.timezone import TIMEZONE
+
+''' Transformação executada dentro do Postgres (push-down) sobre as tabelas do cache do Airbyte.
+    Em vez de iterar read_result.streams em Python, cada tabela normalizada é preenchida
+    com um INSERT ... SELECT extraindo os campos JSON direto das tabelas do cache
+    (airbyte_raw.issues, airbyte_raw.commits, ...). Nenhuma linha atravessa para o Python,
+    então a memória do ETL não cresce com o tamanho da organização.
+
+    Só funciona quando o cache do Airbyte está no mesmo banco que as tabelas normalizadas.
+'''
+
+logger = get_logger("sql_transform")
+
+CACHE_SCHEMA = "airbyte_raw"
+
+# Colunas do cache que indicam a presença de cada entidade em uma stream
+LIST_CACHE_COLUMNS_SQL = """
+    SELECT table_name, column_name
+    FROM information_schema.columns
+    WHERE table_schema = :schema
+"""
+
+# Filtro incremental: somente registros mais novos que a marca d'água de etl.sync_state
+WATERMARK_FILTER = """
+    NOT EXISTS (
+        SELECT 1 FROM etl.sync_state w
+        WHERE w.repository = lower({alias}.repository) AND w.stream = '{stream}' AND {alias}.{cursor} <= w.watermark
+    )
+"""
+
+SAVE_WATERMARK_SQL = """
+    INSERT INTO etl.sync_state (repository, stream, watermark, synced_at)
+    SELECT lower(repository), '{stream}', MAX({cursor}), CURRENT_TIMESTAMP
+    FROM {table}
+    WHERE repository IS NOT NULL AND {cursor} IS NOT NULL
+    GROUP BY lower(repository)
+    ON CONFLICT (repository, stream)
+    DO UPDATE SET watermark = GREATEST(etl.sync_state.watermark, EXCLUDED.watermark), synced_at = CURRENT_TIMESTAMP
+"""
+
+
+class SqlTransform:
+    def __init__(self, engine, cache_schema=CACHE_SCHEMA, timezone=TIMEZONE, incremental=False, update_watermarks=True):
+        self.engine = engine
+        self.cache_schema = cache_schema
+        self.timezone = timezone
+        self.incremental = incremental
+        self.update_watermarks = update_watermarks # False: as marcas d'água são salvas depois, por save_state (ex.: --swap-load)
+        self.columns = {} # tabela do cache -> conjunto de colunas
+
+    # --- Orquestração ---
+    def run(self):
+        logger.info("--- SQL Transform Initiated (%s) ---", self.cache_schema)
+        # Uma única transação: ou todas as tabelas são preenchidas, ou nenhuma
+        with self.engine.begin() as connection:
+            self.columns = self.discover_cache_tables(connection)
+            if len(self.columns) == 0:
+                logger.warning("Nenhuma tabela de cache encontrada no schema '%s'.", self.cache_schema)
+                return {}
+
+            stats = {}
+            # Ordem de inserção é crucial devido às chaves estrangeiras
+            for table, sql in self.build_statements():
+                result = connection.execute(text(sql), {'tz': self.timezone})
+                stats[table] = result.rowcount
+                logger.info("%s: %d linhas inseridas/atualizadas", table, result.rowcount)
+
+            if self.incremental and self.update_watermarks:
+                self.save_watermarks(connection)
+
+        logger.info("--- SQL Transform Completed ---")
+        return stats
+
+    def discover_cache_tables(self, connection):
+        columns = {}
+        rows = connection.execute(text(LIST_CACHE_COLUMNS_SQL), {'schema': self.cache_schema}).fetchall()
+        for table_name, column_name in rows:
+            columns.setdefault(table_name, set()).add(column_name)
+        return columns
+
+    def has(self, stream):
+        return stream in self.columns
+
+    def table(self, stream):
+        return f'"{self.cache_schema}"."{stream}"'
+
+    # Streams sem cursor em CURSOR_FIELDS (commits) não são filtradas pela marca d'água
+    def where(self, alias, stream, extra=None):
+        conditions = [extra] if extra else []
+        cursor = CURSOR_FIELDS.get(stream)
+        if self.incremental and cursor is not None:
+            conditions.append(WATERMARK_FILTER.format(alias=alias, stream=stream, cursor=cursor))
+        return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    # Quão recente é o registro da stream (updated_at, senão created_at), para escolher entre versões do mesmo usuário
+    def recency(self, stream, alias="s"):
+        for column in ("updated_at", "created_at"):
+            if column in self.columns.get(stream, ()):
+                return f"{alias}.{column}::timestamp"
+        return "NULL::timestamp"
+
+    def localized(self, column):
+        # Mesmo efeito do handlingTimeZoneToPostgres: o horário do cache é interpretado no fuso configurado
+        return f"({column} AT TIME ZONE :tz)"
+
+    # --- Montagem dos INSERT ... SELECT ---
+    def build_statements(self):
+        statements = [
+            ("user_info", self.users_sql()),
+            ("repository", self.repositories_sql()),
+            ("branch", self.branches_sql()),
+        ]
+        if self.has("issue_milestones"):
+            statements.append(("milestone", self.milestones_sql()))
+        if self.has("issues"):
+            statements.append(("issue", self.issues_sql()))
+            statements.append(("issue_assignees", self.assignees_sql("issues", "issue", "issue_assignees", "issue_id")))
+        if self.has("pull_requests"):
+            statements.append(("pull_requests", self.pull_requests_sql()))
+            statements.append(("pull_request_assignees", self.assignees_sql("pull_requests", "pull_requests", "pull_request_assignees", "pull_request_id")))
+        if self.has("commits"):
+            statements.append(("commits", self.commits_sql()))
+            statements.append(("parents_commits", self.parents_sql()))
+
+        return [(table, sql) for table, sql in statements if sql is not None]
+
+    def users_sql(self):
+        sources = []
+        # Todas as streams com "user" (issues, pull_requests, ...)
+        for stream, columns in self.columns.items():
+            if "user" in columns:
+                sources.append(f"""SELECT s."user" AS u, {self.recency(stream)} AS seen_at FROM {self.table(stream)} s""")
+        if self.has("commits"):
+            sources.append(f"SELECT s.author AS u, {self.recency('commits')} AS seen_at FROM {self.table('commits')} s")
+        if self.has("issue_milestones"):
+            sources.append(f"SELECT s.creator AS u, {self.recency('issue_milestones')} AS seen_at FROM {self.table('issue_milestones')} s")
+        if self.has("assignees"):
+            sources.append(f"SELECT json_build_object('id', s.id, 'login', s.login, 'html_url', s.html_url) AS u, {self.recency('assignees')} AS seen_at FROM {self.table('assignees')} s")
+        if len(sources) == 0:
+            return None
+
+        # Um usuário renomeado aparece no cache com o login antigo (issues antigas) e o novo: uma linha
+        # por id, com o login do registro mais recente (o ON CONFLICT não atualiza a mesma linha duas vezes)
+        union = "\n UNION ALL ".join(sources)
+        return f"""
+            INSERT INTO user_info (id, login, html_url)
+            SELECT DISTINCT ON ((u->>'id')::bigint) (u->>'id')::bigint, lower(u->>'login'), u->>'html_url'
+            FROM ({union}) users
+            WHERE json_typeof(u) = 'object' AND u->>'login' IS NOT NULL
+            ORDER BY (u->>'id')::bigint, seen_at DESC NULLS LAST
+            ON CONFLICT (id) DO UPDATE SET login = EXCLUDED.login, html_url = EXCLUDED.html_url
+            WHERE (user_info.login, user_info.html_url) IS DISTINCT FROM (EXCLUDED.login, EXCLUDED.html_url)
+        """
+
+    def repositories_sql(self):
+        sources = [
+            f"SELECT s.repository FROM {self.table(stream)} s"
+            for stream, columns in self.columns.items() if "repository" in columns
+        ]
+        if len(sources) == 0:
+            return None
+
+        union = "\n UNION ALL ".join(sources)
+        return f"""
+            INSERT INTO repository (name)
+            SELECT DISTINCT lower(repository)
+            FROM ({union}) repos
+            WHERE repository IS NOT NULL
+            ON CONFLICT (name) DO NOTHING
+        """
+
+    def branches_sql(self):
+        sources = [
+            f"SELECT s.repository, s.branch FROM {self.table(stream)} s"
+            for stream, columns in self.columns.items() if "repository" in columns and "branch" in columns
+        ]
+        if len(sources) == 0:
+            return None
+
+        union = "\n UNION ALL ".join(sources)
+        return f"""
+            INSERT INTO branch (name, repository_id)
+            SELECT DISTINCT lower(b.branch), r.id
+            FROM ({union}) b
+            JOIN repository r ON r.name = lower(b.repository)
+            WHERE b.branch IS NOT NULL
+            ON CONFLICT (name, repository_id) DO NOTHING
+        """
+
+    def milestones_sql(self):
+        return f"""
+            INSERT INTO milestone (id, repository_id, title, description, number, state, created_at, updated_at, creator)
+            SELECT m.id, r.id, m.title, m.description, m.number, m.state,
+                   {self.localized('m.created_at')}, {self.localized('m.updated_at')}, (m.creator->>'id')::bigint
+            FROM {self.table('issue_milestones')} m
+            JOIN repository r ON r.name = lower(m.repository)
+            {self.where('m', 'issue_milestones')}
+            ON CONFLICT (id) DO UPDATE SET
+                title = EXCLUDED.title, description = EXCLUDED.description, number = EXCLUDED.number,
+                state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+            WHERE (milestone.title, milestone.description, milestone.number, milestone.state, milestone.updated_at)
+                IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.description, EXCLUDED.number, EXCLUDED.state, EXCLUDED.updated_at)
+        """
+
+    def issues_sql(self):
+        return f"""
+            INSERT INTO issue (id, title, body, number, html_url, created_at, updated_at, created_by, repository_id, milestone_id)
+            SELECT i.id, i.title, i.body, i.number, i.html_url,
+                   {self.localized('i.created_at')}, {self.localized('i.updated_at')},
+                   (i."user"->>'id')::bigint, r.id, (i.milestone->>'id')::bigint
+            FROM {self.table('issues')} i
+            JOIN repository r ON r.name = lower(i.repository)
+            {self.where('i', 'issues')}
+            ON CONFLICT (id) DO UPDATE SET
+                title = EXCLUDED.title, body = EXCLUDED.body, html_url = EXCLUDED.html_url,
+                updated_at = EXCLUDED.updated_at, milestone_id = EXCLUDED.milestone_id
+            WHERE (issue.title, issue.body, issue.html_url, issue.updated_at, issue.milestone_id)
+                IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.body, EXCLUDED.html_url, EXCLUDED.updated_at, EXCLUDED.milestone_id)
+        """
+
+    def pull_requests_sql(self):
+        return f"""
+            INSERT INTO pull_requests (id, created_by, repository_id, number, state, title, body, html_url, created_at, updated_at, milestone_id)
+            SELECT p.id, (p."user"->>'id')::bigint, r.id, p.number, p.state, p.title, p.body, p.html_url,
+                   {self.localized('p.created_at')}, {self.localized('p.updated_at')}, (p.milestone->>'id')::bigint
+            FROM {self.table('pull_requests')} p
+            JOIN repository r ON r.name = lower(p.repository)
+            {self.where('p', 'pull_requests')}
+            ON CONFLICT (id) DO UPDATE SET
+                state = EXCLUDED.state, title = EXCLUDED.title, body = EXCLUDED.body, html_url = EXCLUDED.html_url,
+                updated_at = EXCLUDED.updated_at, milestone_id = EXCLUDED.milestone_id
+            WHERE (pull_requests.state, pull_requests.title, pull_requests.body, pull_requests.html_url, pull_requests.updated_at, pull_requests.milestone_id)
+                IS DISTINCT FROM (EXCLUDED.state, EXCLUDED.title, EXCLUDED.body, EXCLUDED.html_url, EXCLUDED.updated_at, EXCLUDED.milestone_id)
+        """
+
+    # Remove assignees que saíram do registro no cache e insere os atuais (os dois conjuntos são disjuntos)
+    def assignees_sql(self, stream, target, join_table, key_column):
+        assignees = "CASE WHEN json_typeof(s.assignees) = 'array' THEN s.assignees ELSE '[]'::json END"
+        return f"""
+            WITH removed AS (
+                DELETE FROM {join_table} j
+                USING {self.table(stream)} s
+                WHERE j.{key_column} = s.id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM json_array_elements({assignees}) AS a(value)
+                      WHERE (a.value->>'id')::bigint = j.user_id
+                  )
+            )
+            INSERT INTO {join_table} ({key_column}, user_id)
+            SELECT t.id, u.id
+            FROM {self.table(stream)} s
+            JOIN {target} t ON t.id = s.id
+            CROSS JOIN LATERAL json_array_elements({assignees}) AS a(value)
+            JOIN user_info u ON u.id = (a.value->>'id')::bigint
+            ON CONFLICT DO NOTHING
+        """
+
+    def commits_sql(self):
+        # Vínculo commit -> PR por (repositório, número do PR), resolvido no próprio join
+        pr_join = "LEFT JOIN (SELECT NULL::varchar AS sha, NULL::bigint AS pull_request_id) pr ON FALSE"
+        if self.has("pull_request_commits"):
+            pr_join = f"""
+            LEFT JOIN (
+                SELECT DISTINCT ON (prc.sha) prc.sha, p.id AS pull_request_id
+                FROM {self.table('pull_request_commits')} prc
+                JOIN repository pr_repo ON pr_repo.name = lower(prc.repository)
+                JOIN pull_requests p ON p.repository_id = pr_repo.id AND p.number = prc.pull_number
+                ORDER BY prc.sha, p.id
+            ) pr ON pr.sha = c.sha"""
+
+        return f"""
+            INSERT INTO commits (user_id, branch_id, pull_request_id, created_at, message, sha, html_url)
+            SELECT DISTINCT ON (c.sha) (c.author->>'id')::bigint, b.id, pr.pull_request_id,
+                   {self.localized('c.created_at')}, c.commit->>'message', c.sha, c.html_url
+            FROM {self.table('commits')} c
+            JOIN repository r ON r.name = lower(c.repository)
+            JOIN user_info u ON u.id = (c.author->>'id')::bigint
+            LEFT JOIN branch b ON b.repository_id = r.id AND b.name = lower(c.branch)
+            {pr_join}
+            {self.where('c', 'commits', extra="json_typeof(c.author) = 'object'")}
+            ORDER BY c.sha
+            ON CONFLICT (sha) DO UPDATE SET pull_request_id = EXCLUDED.pull_request_id
+            WHERE EXCLUDED.pull_request_id IS NOT NULL AND commits.pull_request_id IS DISTINCT FROM EXCLUDED.pull_request_id
+        """
+
+    def parents_sql(self):
+        return f"""
+            INSERT INTO parents_commits (parent_sha, commit_id, parent_number)
+            SELECT DISTINCT ON (p.value->>'sha', t.id) p.value->>'sha', t.id, p.number - 1
+            FROM {self.table('commits')} c
+            JOIN commits t ON t.sha = c.sha
+            CROSS JOIN LATERAL json_array_elements(
+                CASE WHEN json_typeof(c.parents) = 'array' THEN c.parents ELSE '[]'::json END
+            ) WITH ORDINALITY AS p(value, number)
+            ORDER BY p.value->>'sha', t.id, p.number
+            ON CONFLICT (parent_sha, commit_id) DO NOTHING
+        """
+
+    # --- Modo incremental ---
+    ''' Salva as marcas d'água a partir do cache, fora da transação do transform.
+    '''
+    def save_state(self):
+        with self.engine.begin() as connection:
+            self.columns = self.discover_cache_tables(connection)
+            self.save_watermarks(connection)
+
+    def save_watermarks(self, connection):
+        for stream, cursor in CURSOR_FIELDS.items():
+            if self.has(stream):
+                connection.execute(text(SAVE_WATERMARK_SQL.format(stream=stream, cursor=cursor, table=self.table(stream))))
+        logger.info("Marcas d'água atualizadas a partir do cache.")
@@ -0,0 +1,100 @@
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Fila de sincronizações em etl.sync_requests, compartilhada pela API e pelo worker do ETL.
+    A API só grava pedidos (status pending); o worker reivindica todos os pendentes de uma vez
+    (uma sincronização atende a todos) e registra o resultado e a execução (etl.runs) usada.
+        pending -> running -> success | failed
+'''
+
+logger = get_logger("sync_requests")
+
+CREATE_SYNC_REQUESTS_SQL = """
+    CREATE SCHEMA IF NOT EXISTS etl;
+    CREATE TABLE IF NOT EXISTS etl.sync_requests (
+        id BIGSERIAL PRIMARY KEY,
+        reason VARCHAR(20) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        run_id BIGINT,
+        requested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP WITH TIME ZONE,
+        finished_at TIMESTAMP WITH TIME ZONE
+    );
+"""
+
+REQUEST_COLUMNS = "id, reason, status, run_id, requested_at, started_at, finished_at"
+
+CLAIM_SQL = """
+    UPDATE etl.sync_requests SET status = 'running', started_at = CURRENT_TIMESTAMP
+    WHERE status = 'pending'
+    RETURNING id
+"""
+
+FINISH_SQL = """
+    UPDATE etl.sync_requests SET status = :status, run_id = :run_id, finished_at = CURRENT_TIMESTAMP
+    WHERE id = ANY(:ids)
+"""
+
+
+class SyncRequests:
+    def __init__(self, engine):
+        self.engine = engine
+        self.created = False
+
+    def ensure(self, connection):
+        if not self.created:
+            connection.execute(text(CREATE_SYNC_REQUESTS_SQL))
+            self.created = True
+
+    ''' Enfileira um pedido; se já houver um pendente, ele é retornado no lugar de um novo.
+        Retorna (pedido, criado).
+    '''
+    def request(self, reason):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            pending = connection.execute(text(f"SELECT {REQUEST_COLUMNS} FROM etl.sync_requests WHERE status = 'pending' ORDER BY id LIMIT 1")).fetchone()
+            if pending is not None:
+                return dict(pending._mapping), False
+            row = connection.execute(text(f"INSERT INTO etl.sync_requests (reason) VALUES (:reason) RETURNING {REQUEST_COLUMNS}"), {'reason': reason}).fetchone()
+        logger.info("Sincronização %s pedida (%s)", row.id, reason)
+        return dict(row._mapping), True
+
+    def pending(self):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            return connection.execute(text("SELECT count(*) FROM etl.sync_requests WHERE status = 'pending'")).scalar_one()
+
+    ''' Marca todos os pendentes como em execução e retorna os ids.
+    '''
+    def claim(self):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            return [row[0] for row in connection.execute(text(CLAIM_SQL))]
+
+    def finish(self, ids, status, run_id=None):
+        with self.engine.begin() as connection:
+            connection.execute(text(FINISH_SQL), {'ids': list(ids), 'status': status, 'run_id': run_id})
+
+    ''' Pedidos que ficaram em execução quando o worker parou no meio (o chamador garante que
+        nenhuma sincronização está rodando).
+    '''
+    def abandon_running(self):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            abandoned = connection.execute(text("UPDATE etl.sync_requests SET status = 'failed', finished_at = CURRENT_TIMESTAMP WHERE status = 'running'")).rowcount
+        if abandoned:
+            logger.warning("%d pedidos de sincronização interrompidos marcados como failed.", abandoned)
+        return abandoned
+
+    def get(self, request_id):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            row = connection.execute(text(f"SELECT {REQUEST_COLUMNS} FROM etl.sync_requests WHERE id = :id"), {'id': request_id}).fetchone()
+        return None if row is None else dict(row._mapping)
+
+    def recent(self, limit=10):
+        with self.engine.begin() as connection:
+            self.ensure(connection)
+            rows = connection.execute(text(f"SELECT {REQUEST_COLUMNS} FROM etl.sync_requests ORDER BY id DESC LIMIT :limit"), {'limit': limit}).fetchall()
+        return [dict(row._mapping) for row in rows]
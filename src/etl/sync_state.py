@@ -0,0 +1,94 @@
+
+from sqlalchemy import text
+
+from src.etl.telemetry import get_logger
+
+''' Marcas d'água (high-watermarks) por repositório/stream para o modo incremental.
+    Guarda o maior cursor (updated_at) já carregado de cada stream, para que
+    a próxima execução transforme somente os registros alterados desde então.
+'''
+
+logger = get_logger("sync_state")
+
+# Campo de cursor de cada stream incremental do source-github. Commits não têm marca d'água: a data
+# do commit é a do autor, não a da chegada ao GitHub (um commit antigo enviado depois de um mais novo,
+# ou de uma branch nova/rebaseada, ficaria abaixo da marca e seria pulado para sempre). Eles passam
+# sempre pelo transform e o upsert do loader ignora os que não mudaram.
+CURSOR_FIELDS = {
+    "issues": "updated_at",
+    "pull_requests": "updated_at",
+    "issue_milestones": "updated_at",
+}
+
+CREATE_SYNC_STATE_SQL = """
+    CREATE SCHEMA IF NOT EXISTS etl;
+    CREATE TABLE IF NOT EXISTS etl.sync_state (
+        repository VARCHAR(255) NOT NULL,
+        stream VARCHAR(100) NOT NULL,
+        watermark TIMESTAMP NOT NULL,
+        synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (repository, stream)
+    );
+"""
+
+UPSERT_SYNC_STATE_SQL = """
+    INSERT INTO etl.sync_state (repository, stream, watermark, synced_at)
+    VALUES (:repository, :stream, :watermark, CURRENT_TIMESTAMP)
+    ON CONFLICT (repository, stream)
+    DO UPDATE SET watermark = GREATEST(etl.sync_state.watermark, EXCLUDED.watermark), synced_at = CURRENT_TIMESTAMP
+"""
+
+
+class SyncState:
+    def __init__(self, engine):
+        self.engine = engine
+        self.watermarks = {} # (repositorio, stream) -> último cursor carregado
+        self.pending = {} # (repositorio, stream) -> maior cursor visto nesta execução
+
+    def load(self):
+        with self.engine.connect() as connection:
+            connection.execute(text(CREATE_SYNC_STATE_SQL))
+            rows = connection.execute(text("SELECT repository, stream, watermark FROM etl.sync_state")).fetchall()
+            connection.commit()
+
+        self.watermarks = {(repository, stream): watermark for repository, stream, watermark in rows}
+        logger.info("Marcas d'água carregadas: %d", len(self.watermarks))
+        return self.watermarks
+
+    ''' Retorna True se o registro mudou desde a última execução (ou se a stream não é incremental).
+        Também registra o cursor do registro para ser salvo após o load.
+    '''
+    def is_new(self, stream_name, record):
+        cursor_field = CURSOR_FIELDS.get(stream_name.lower())
+        if cursor_field is None:
+            return True
+
+        cursor = getattr(record, cursor_field, None)
+        repository = getattr(record, 'repository', None)
+        if cursor is None or repository is None:
+            return True
+
+        key = (repository.lower(), stream_name.lower())
+        watermark = self.watermarks.get(key)
+        if watermark is not None and cursor <= watermark:
+            return False
+
+        if key not in self.pending or cursor > self.pending[key]:
+            self.pending[key] = cursor
+        return True
+
+    ''' Persiste as novas marcas d'água. Deve ser chamado somente após um load bem sucedido.
+    '''
+    def save(self):
+        if len(self.pending) == 0:
+            logger.info("Nenhuma marca d'água nova para salvar.")
+            return
+
+        with self.engine.connect() as connection:
+            for (repository, stream), watermark in self.pending.items():
+                connection.execute(text(UPSERT_SYNC_STATE_SQL), {'repository': repository, 'stream': stream, 'watermark': watermark})
+            connection.commit()
+
+        self.watermarks.update(self.pending)
+        logger.info("Marcas d'água salvas: %d", len(self.pending))
+        self.pending = {}
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+
+from src.assets.aux.env import env
+
+''' Instrumentação do ETL: logs com nível, log por linha amostrado, contadores por tabela
+    e tempos por etapa (extract, transform, load.<tabela>). No fim da execução um resumo em
+    JSON é gravado para ser coletado e comparado entre execuções.
+
+    Configuração por variáveis de ambiente:
+        ETL_LOG_LEVEL         nível dos logs (DEBUG, INFO, WARNING, ...). Logs por linha só saem em DEBUG.
+        ETL_LOG_SAMPLE_EVERY  em DEBUG, registra 1 a cada N linhas de cada tabela.
+        ETL_SUMMARY_PATH      arquivo do resumo JSON (vazio desabilita).
+'''
+
+LOG_LEVEL = env.get("ETL_LOG_LEVEL", "INFO")
+LOG_SAMPLE_EVERY = int(env.get("ETL_LOG_SAMPLE_EVERY", "1000"))
+SUMMARY_PATH = env.get("ETL_SUMMARY_PATH", "etl_run_summary.json")
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+logger = logging.getLogger("etl")
+
+
+def get_logger(name):
+    return logging.getLogger(f"etl.{name}")
+
+''' Instala um único handler em stdout para a árvore de loggers "etl" (idempotente).
+'''
+def configure_logging(level=LOG_LEVEL):
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+class Telemetry:
+    def __init__(self, sample_every=LOG_SAMPLE_EVERY, summary_path=SUMMARY_PATH):
+        self.sample_every = max(1, sample_every)
+        self.summary_path = summary_path
+        self.lock = threading.Lock() # Loaders rodam em paralelo (LoadScheduler)
+        self.counters = {} # tabela -> {"inserted", "updated", "unchanged", "rows", "errors", ...}
+        self.stages = {} # etapa -> {"seconds", "rows", "calls"}
+        self.seen_rows = {} # tabela -> linhas vistas, para a amostragem do log por linha
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.start = time.perf_counter()
+
+    # --- Contadores ---
+    def count(self, table, key, amount=1):
+        with self.lock:
+            counters = self.counters.setdefault(table, {})
+            counters[key] = counters.get(key, 0) + amount
+
+    ''' Log por linha amostrado: a mensagem só é formatada quando DEBUG está habilitado e
+        a linha cai na amostra (a primeira e depois 1 a cada sample_every).
+    '''
+    def row(self, table, message, *args):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        with self.lock:
+            seen = self.seen_rows.get(table, 0)
+            self.seen_rows[table] = seen + 1
+        if seen % self.sample_every == 0:
+            get_logger("rows").debug(f"[{table} #{seen + 1}] {message}", *args)
+
+    # --- Etapas ---
+    @contextmanager
+    def stage(self, name, rows=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start, rows)
+
+    def add_stage(self, name, seconds, rows=0):
+        with self.lock:
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "rows": 0, "calls": 0})
+            stage["seconds"] += seconds
+            stage["rows"] += rows
+            stage["calls"] += 1
+
+    ''' Itera sobre um gerador medindo o tempo gasto dentro dele (ex.: transform em streaming,
+        que é intercalado com o load de cada lote). size(item) informa quantas linhas o item tem.
+    '''
+    def timed_iter(self, name, iterable, size=None):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_stage(name, time.perf_counter() - start)
+                return
+            self.add_stage(name, time.perf_counter() - start, size(item) if size else 0)
+            yield item
+
+    # --- Resumo ---
+    def summary(self, status="success"):
+        with self.lock:
+            stages = {}
+            for name, stage in self.stages.items():
+                rate = stage["rows"] / stage["seconds"] if stage["seconds"] > 0 else None
+                stages[name] = dict(stage, rows_per_sec=rate)
+            return {
+                "status": status,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "seconds": time.perf_counter() - self.start,
+                "stages": stages,
+                "tables": {table: dict(counters) for table, counters in self.counters.items()},
+            }
+
+    def write_summary(self, status="success"):
+        summary = self.summary(status)
+        for name, stage in summary["stages"].items():
+            logger.info("Etapa %s: %.2fs, %d linhas", name, stage["seconds"], stage["rows"])
+
+        if self.summary_path:
+            try:
+                with open(self.summary_path, "w") as file:
+                    json.dump(summary, file, indent=2, default=str)
+                logger.info("Resumo da execução salvo em %s", self.summary_path)
+            except OSError as e:
+                logger.error("Não foi possível salvar o resumo da execução: %s", e)
+        return summary
@@ -0,0 +1,31 @@
+import pytz
+import pandas as pd
+
+from src.assets.aux.env import env
+
+''' Normalização de fuso horário dos timestamps carregados.
+    Os horários do GitHub chegam sem fuso (naive) e são interpretados no fuso configurado,
+    sem mudar os componentes de hora (mesmo efeito do pytz localize com is_dst=None).
+    A versão vetorizada converte uma coluna inteira do lote com pandas tz_localize em vez de
+    chamar pytz.timezone(...).localize(...) linha a linha.
+
+    Configuração: ETL_TIMEZONE (padrão America/Sao_Paulo).
+'''
+
+TIMEZONE = env.get("ETL_TIMEZONE", "America/Sao_Paulo")
+
+
+def localize(naive_datetime, timezone=TIMEZONE):
+    # 'is_dst=None' levanta erro em horários ambíguos/inexistentes (troca de horário de verão)
+    return pytz.timezone(timezone).localize(naive_datetime, is_dst=None)
+
+''' Localiza uma coluna de timestamps de uma vez. Horários ambíguos ou inexistentes levantam
+    erro, como no localize com is_dst=None; valores nulos continuam None.
+'''
+def localize_many(naive_datetimes, timezone=TIMEZONE):
+    if len(naive_datetimes) == 0:
+        return []
+
+    index = pd.DatetimeIndex(naive_datetimes)
+    localized = index.tz_localize(pytz.timezone(timezone), ambiguous="raise", nonexistent="raise")
+    return [None if value is pd.NaT else value for value in localized.to_pydatetime()]
@@ -0,0 +1,186 @@
+''' Transform em streaming das streams do Airbyte.
+    Cada stream tem um handler (gerador) registrado em uma tabela de despacho, a deduplicação
+    usa índices hash (set/dict) e os registros transformados são entregues aos loaders em lotes
+    de tamanho limitado, então a memória fica estável e o tempo cresce linearmente com os registros.
+    As linhas são registros compactos (src/etl/records.py), sem referências aos objetos do Airbyte.
+'''
+import sys
+
+from src.etl.pr_index import PullRequestIndex
+from src.etl.records import UserRecord, BranchRecord, MilestoneRecord, IssueRecord, PullRequestRecord, CommitRecord
+
+# Entidades produzidas pelo transform, na ordem em que os loaders precisam recebê-las
+ENTITIES = ["users", "repositories", "branches", "milestones", "issues", "pull_requests", "commits"]
+
+# Ordem de processamento das streams com handler: entidades referenciadas por chave estrangeira
+# (milestones, pull requests) e o índice commit -> PR precisam existir antes de quem os usa
+STREAM_ORDER = ["assignees", "issue_milestones", "issues", "pull_requests", "pull_request_commits", "commits"]
+
+BATCH_SIZE = 5000
+
+
+class StreamTransformer:
+    def __init__(self, sync_state=None, batch_size=BATCH_SIZE):
+        self.sync_state = sync_state
+        self.batch_size = batch_size
+
+        # Índices para deduplicação em O(1)
+        self.user_logins = set() # logins ja inseridos no users
+        self.repositories = set() # repos ja inseridos
+        self.repo_branches = set() # (repo, branch) ja inseridos
+        self.pull_requests = PullRequestIndex() # (repositório, número do PR) e (repositório, sha) -> PR
+        self.assignees = {} # id do usuário -> UserRecord compartilhado pelos assignees
+        self.names = {} # nome de repo/branch como veio -> minúsculo internado (uma cópia por nome no lote)
+
+        # Tabela de despacho: stream -> handler
+        self.handlers = {
+            "assignees": self.transform_assignee,
+            "issue_milestones": self.transform_milestone,
+            "issues": self.transform_issue,
+            "pull_requests": self.transform_pull_request,
+            "pull_request_commits": self.transform_pull_request_commit,
+            "commits": self.transform_commit,
+        }
+
+    # --- Pipeline ---
+    def ordered_streams(self, read_result):
+        streams = {stream_name.lower(): dataset for stream_name, dataset in read_result.streams.items()}
+        # Streams sem handler vêm primeiro: só contribuem com usuários, repositórios e branches
+        for stream_name, dataset in streams.items():
+            if stream_name not in self.handlers:
+                yield stream_name, dataset
+        for stream_name in STREAM_ORDER:
+            if stream_name in streams:
+                yield stream_name, streams[stream_name]
+
+    ''' Gera pares (entidade, linha) para todos os registros, sem materializar as streams.
+    '''
+    def records(self, read_result):
+        for stream_name, dataset in self.ordered_streams(read_result):
+            handler = self.handlers.get(stream_name)
+            for record in dataset:
+                # Modo incremental: ignora registros que não mudaram desde a última execução
+                if self.sync_state is not None and not self.sync_state.is_new(stream_name, record):
+                    continue
+
+                yield from self.transform_common(record)
+                if handler is not None:
+                    yield from handler(record)
+
+    ''' Agrupa os registros em lotes de no máximo batch_size linhas, no formato esperado por ETL.load_data.
+    '''
+    def batches(self, read_result):
+        batch = self.empty_batch()
+        size = 0
+        for entity, row in self.records(read_result):
+            batch[entity].append(row)
+            size += 1
+            if size >= self.batch_size:
+                yield batch
+                batch = self.empty_batch()
+                size = 0
+
+        if size > 0:
+            yield batch
+
+    ''' Transforma tudo em um único lote (comportamento do data_transform original).
+    '''
+    def collect(self, read_result):
+        batch = self.empty_batch()
+        for entity, row in self.records(read_result):
+            batch[entity].append(row)
+        return batch
+
+    def empty_batch(self):
+        return {entity: [] for entity in ENTITIES}
+
+    # --- Handlers ---
+    def user_row(self, user):
+        user_login = user['login'].lower()
+        if user_login in self.user_logins:
+            return None
+        self.user_logins.add(user_login)
+        return UserRecord(user['id'], user_login, user['html_url'])
+
+    def name(self, value):
+        name = self.names.get(value)
+        if name is None:
+            name = self.names[value] = sys.intern(value.lower())
+        return name
+
+    # Um UserRecord por usuário, compartilhado por todas as issues/PRs em que ele é assignee
+    def assignee_rows(self, assignees):
+        rows = []
+        for user in assignees or ():
+            row = self.assignees.get(user['id'])
+            if row is None:
+                row = self.assignees[user['id']] = UserRecord(user['id'], user['login'].lower(), user['html_url'])
+            rows.append(row)
+        return tuple(rows)
+
+    ## Populando usuários, repos e branches em todas as streams
+    def transform_common(self, record):
+        user = getattr(record, 'user', None)
+        if user:
+            row = self.user_row(user)
+            if row is not None:
+                yield "users", row
+
+        repository = getattr(record, 'repository', None)
+        if repository:
+            repository = self.name(repository)
+            if repository not in self.repositories:
+                self.repositories.add(repository)
+                yield "repositories", repository
+
+            branch = getattr(record, 'branch', None)
+            if branch:
+                branch = self.name(branch)
+                if (repository, branch) not in self.repo_branches:
+                    self.repo_branches.add((repository, branch))
+                    yield "branches", BranchRecord(repository, branch)
+
+    # Stream assignees adiciona mais usuarios, se possível
+    def transform_assignee(self, record):
+        row = self.user_row({"id": record.id, "login": record.login, "html_url": record.html_url})
+        if row is not None:
+            yield "users", row
+
+    def transform_milestone(self, record):
+        yield "milestones", MilestoneRecord(
+            id=record.id, repository=self.name(record.repository), title=record.title, description=record.description, number=record.number, state=record.state, created_at=record.created_at, updated_at=record.updated_at, creator=record.creator['id']
+        )
+
+    def transform_issue(self, record):
+        yield "issues", IssueRecord(
+            id=record.id, title=record.title, body=record.body, number=record.number, html_url=record.html_url, created_at=record.created_at, updated_at=record.updated_at, assignees=self.assignee_rows(record.assignees), created_by=record.user['id'], repository=self.name(record.repository), milestone_id=record.milestone['id'] if record.milestone else None
+        )
+
+    def transform_pull_request(self, record):
+        repository = self.name(record.repository)
+        self.pull_requests.add_pull_request(repository, record.number, record.id)
+        yield "pull_requests", PullRequestRecord(
+            id=record.id, created_by=record.user['id'], repository=repository, number=record.number, state=record.state, title=record.title, body=record.body, html_url=record.html_url, created_at=record.created_at, updated_at=record.updated_at, merged_at=record.merged_at, milestone_id=record.milestone['id'] if record.milestone else None, assignees=self.assignee_rows(record.assignees)
+        )
+
+    ## Vinculando commits a suas pull requests
+    def transform_pull_request_commit(self, record):
+        self.pull_requests.add_commit(self.name(record.repository), record.sha, record.pull_number)
+        yield from ()
+
+    def transform_commit(self, record):
+        # caso nao tenha author no commit, ele será ignorado.
+        # possivelmente problemas de vinculo email no commit -> email cadastrado no github
+        author = getattr(record, 'author', None)
+        if not author:
+            return
+
+        row = self.user_row(author)
+        if row is not None:
+            yield "users", row
+
+        repository = self.name(record.repository)
+        pull_request_id, pull_number = self.pull_requests.link(repository, record.sha)
+        yield "commits", CommitRecord(
+            user_id=author['id'], repository=repository, pull_request_id=pull_request_id, pull_number=pull_number, branch=self.name(record.branch), created_at=record.created_at, message=record.commit['message'], sha=record.sha, parents=tuple(parent['sha'] for parent in record.parents or ()), html_url=record.html_url
+        )
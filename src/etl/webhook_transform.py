@@ -0,0 +1,126 @@
+import sys
+import datetime
+
+from src.etl.transform import ENTITIES
+from src.etl.records import UserRecord, BranchRecord, MilestoneRecord, IssueRecord, PullRequestRecord, CommitRecord
+
+''' Transform dos eventos de webhook do GitHub (push, issues, pull_request) para as mesmas
+    linhas que o StreamTransformer entrega aos loaders, então os eventos são gravados pelo
+    mesmo caminho de escrita do ETL (BulkLoader, upsert com detecção de mudança).
+
+    Os horários do webhook chegam em ISO 8601 com fuso; são convertidos para UTC sem fuso,
+    como os registros do cache do Airbyte, e depois localizados pelo loader igual ao ETL.
+'''
+
+
+def parse_timestamp(value):
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def repository_name(payload):
+    return sys.intern(payload['repository']['full_name'].lower())
+
+
+def user_row(user):
+    return UserRecord(user['id'], user['login'].lower(), user['html_url'])
+
+
+class WebhookTransformer:
+    def __init__(self):
+        # Tabela de despacho: evento (X-GitHub-Event) -> handler
+        self.handlers = {
+            "push": self.transform_push,
+            "issues": self.transform_issues,
+            "pull_request": self.transform_pull_request,
+        }
+
+    def supports(self, event):
+        return event in self.handlers
+
+    ''' Retorna um lote no formato de ETL.load_data ({entidade: [linhas]}).
+        Payloads sem os campos esperados levantam KeyError/TypeError/ValueError.
+    '''
+    def transform(self, event, payload):
+        batch = {entity: [] for entity in ENTITIES}
+        for entity, row in self.handlers[event](payload):
+            batch[entity].append(row)
+        return batch
+
+    # --- Comuns ---
+    def repository(self, payload):
+        yield "repositories", repository_name(payload)
+
+    def users(self, *users):
+        for user in users:
+            if user:
+                yield "users", user_row(user)
+
+    def milestone(self, payload, milestone):
+        if not milestone:
+            return
+        yield from self.users(milestone['creator'])
+        yield "milestones", MilestoneRecord(
+            id=milestone['id'], repository=repository_name(payload), title=milestone['title'], description=milestone['description'], number=milestone['number'], state=milestone['state'], created_at=parse_timestamp(milestone['created_at']), updated_at=parse_timestamp(milestone['updated_at']), creator=milestone['creator']['id']
+        )
+
+    # --- Handlers ---
+    ''' Push: commits novos da branch. O payload não traz os pais de cada commit, e a lista de commits
+        não é uma cadeia (merges intercalam os commits da outra branch e o GitHub limita o tamanho):
+        os commits são gravados sem pais, que chegam com o stream de commits do ETL.
+        O autor só tem o login; o id vem do sender quando é a mesma pessoa, senão fica para o loader resolver.
+    '''
+    def transform_push(self, payload):
+        if payload.get('deleted') or not payload['ref'].startswith("refs/heads/"):
+            return # Branch removida ou tag: nada a gravar
+
+        repository = repository_name(payload)
+        branch = sys.intern(payload['ref'][len("refs/heads/"):].lower())
+        sender = payload['sender']
+        yield from self.repository(payload)
+        yield from self.users(sender)
+        yield "branches", BranchRecord(repository, branch)
+
+        for commit in payload['commits']:
+            login = (commit['author'].get('username') or "").lower()
+            yield "commits", CommitRecord(
+                user_id=sender['id'] if login == sender['login'].lower() else None, author_login=login or None,
+                repository=repository, pull_request_id=None, branch=branch, created_at=parse_timestamp(commit['timestamp']),
+                message=commit['message'], sha=commit['id'], parents=(), html_url=commit['url']
+            )
+
+    def transform_issues(self, payload):
+        if payload['action'] == "deleted":
+            return
+
+        issue = payload['issue']
+        yield from self.repository(payload)
+        yield from self.users(issue['user'], *issue['assignees'])
+        yield from self.milestone(payload, issue['milestone'])
+        yield "issues", IssueRecord(
+            id=issue['id'], title=issue['title'], body=issue['body'], number=issue['number'], html_url=issue['html_url'], created_at=parse_timestamp(issue['created_at']), updated_at=parse_timestamp(issue['updated_at']), assignees=tuple(user_row(user) for user in issue['assignees']), created_by=issue['user']['id'], repository=repository_name(payload), milestone_id=issue['milestone']['id'] if issue['milestone'] else None
+        )
+
+    def transform_pull_request(self, payload):
+        pr = payload['pull_request']
+        yield from self.repository(payload)
+        yield from self.users(pr['user'], *pr['assignees'])
+        yield from self.milestone(payload, pr['milestone'])
+        yield "pull_requests", PullRequestRecord(
+            id=pr['id'], created_by=pr['user']['id'], repository=repository_name(payload), number=pr['number'], state=pr['state'], title=pr['title'], body=pr['body'], html_url=pr['html_url'], created_at=parse_timestamp(pr['created_at']), updated_at=parse_timestamp(pr['updated_at']), merged_at=parse_timestamp(pr['merged_at']), milestone_id=pr['milestone']['id'] if pr['milestone'] else None, assignees=tuple(user_row(user) for user in pr['assignees'])
+        )
+
+
+''' Junta vários lotes em um só. Os eventos podem chegar fora de ordem: a escrita em lote do BulkLoader
+    deduplica por chave ficando a versão com o maior updated_at, e não sobrescreve uma linha mais recente.
+'''
+def merge_batches(batches):
+    merged = {entity: [] for entity in ENTITIES}
+    for batch in batches:
+        for entity, rows in batch.items():
+            merged[entity].extend(rows)
+    return merged
@@ -0,0 +1,109 @@
+import time
+import multiprocessing
+from sqlalchemy import text
+
+from src.assets.aux.env import env
+from src.etl.ETL import ETL
+from src.etl.sync_requests import SyncRequests
+from src.etl.telemetry import configure_logging, get_logger
+
+''' Sincronização em segundo plano: um processo separado da API executa o ETL (sempre
+    incremental) a cada ETL_SYNC_INTERVAL segundos e atende os pedidos feitos pela API
+    (POST /admin/etl/sync grava em etl.sync_requests, consultada a cada ETL_SYNC_POLL_SECONDS).
+    A API sobe sem esperar a extração e nunca divide processo (GIL, memória) com o ETL.
+    Um advisory lock no Postgres garante uma sincronização por vez, mesmo com mais de um
+    worker; pedidos que chegam durante uma sincronização ficam para a próxima.
+
+    Configuração: ETL_SYNC_INTERVAL (padrão 3600; 0 = só sob pedido) ou --sync-interval,
+    e ETL_SYNC_POLL_SECONDS (padrão 5).
+'''
+
+SYNC_INTERVAL = int(env.get("ETL_SYNC_INTERVAL", "3600"))
+SYNC_POLL_SECONDS = float(env.get("ETL_SYNC_POLL_SECONDS", "5"))
+
+# Chave do pg_try_advisory_lock das sincronizações
+SYNC_LOCK_KEY = 7_301_001
+
+logger = get_logger("sync_worker")
+
+
+class SyncWorker:
+    def __init__(self, etl, interval=SYNC_INTERVAL, poll_seconds=SYNC_POLL_SECONDS, run_on_start=True):
+        self.etl = etl
+        self.engine = etl.engine
+        self.requests = SyncRequests(self.engine)
+        self.interval = interval
+        self.poll_seconds = poll_seconds
+        # Próxima sincronização agendada (time.monotonic); None = só sob pedido
+        self.next_run = time.monotonic() if run_on_start else self.schedule_next()
+
+    def schedule_next(self):
+        return time.monotonic() + self.interval if self.interval > 0 else None
+
+    def serve_forever(self):
+        logger.info("Worker de sincronização iniciado (intervalo: %s)", f"{self.interval}s" if self.interval > 0 else "somente sob pedido")
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Erro no worker de sincronização: %s", e)
+            time.sleep(self.poll_seconds)
+
+    ''' Sincroniza se houver pedido pendente ou se a sincronização agendada venceu.
+        Retorna o status da sincronização ou None se nada rodou.
+    '''
+    def tick(self):
+        due = self.next_run is not None and time.monotonic() >= self.next_run
+        if not due and not self.requests.pending():
+            return None
+        return self.sync(reason="schedule" if due else None)
+
+    ''' Executa o ETL sob o advisory lock, para os pedidos pendentes (e um pedido do agendamento,
+        se reason for informado).
+    '''
+    def sync(self, reason=None):
+        with self.engine.connect() as lock:
+            if not lock.execute(text("SELECT pg_try_advisory_lock(:key)"), {'key': SYNC_LOCK_KEY}).scalar():
+                lock.commit()
+                logger.info("Outra sincronização em andamento; pedidos continuam na fila.")
+                return None
+            lock.commit()
+            try:
+                self.requests.abandon_running()
+                if reason is not None:
+                    self.requests.request(reason)
+                ids = self.requests.claim()
+
+                logger.info("Sincronização iniciada (pedidos %s)", ids)
+                try:
+                    success = self.etl.run()
+                except Exception as e:
+                    logger.error("Erro na sincronização: %s", e)
+                    success = False
+
+                status = "success" if success else "failed"
+                ledger = self.etl.ledger
+                self.requests.finish(ids, status, run_id=ledger.run_id if ledger is not None else None)
+                self.next_run = self.schedule_next()
+                return status
+            finally:
+                lock.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': SYNC_LOCK_KEY})
+                lock.commit()
+
+
+''' Alvo do processo do worker (ETL criado dentro do processo filho).
+'''
+def run_worker(repos, streams, github_token, options, interval=SYNC_INTERVAL, run_on_start=True):
+    configure_logging()
+    etl = ETL(repos, streams, github_token, **{**options, "incremental": True})
+    SyncWorker(etl, interval=interval, run_on_start=run_on_start).serve_forever()
+
+
+''' Inicia o worker em um processo separado (spawn, como os shards da extração) e o retorna.
+'''
+def start_worker(repos, streams, github_token, options, interval=SYNC_INTERVAL, run_on_start=True):
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=run_worker, args=(repos, streams, github_token, options, interval, run_on_start), name="etl-sync-worker")
+    process.start()
+    logger.info("Worker de sincronização no processo %s", process.pid)
+    return process
@@ -0,0 +1,56 @@
+"""
+Testes para os endpoints de administração da sincronização (/admin/etl/sync)
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.endpoints import admin as admin_module
+
+TOKEN = "token-de-teste"
+
+
+@pytest.fixture
+def controller():
+    controller = admin_module.admin
+    with patch.object(controller, "token", TOKEN), \
+         patch.object(controller, "engine", MagicMock()), \
+         patch.object(controller, "requests", MagicMock()), \
+         patch.object(controller, "data_version", MagicMock()):
+        yield controller
+
+
+@pytest.fixture
+def client(controller):
+    app = FastAPI()
+    app.include_router(admin_module.router)
+    return TestClient(app)
+
+
+class TestAdminEndpoints:
+
+    def test_requires_a_valid_token(self, client, controller):
+        assert client.post("/admin/etl/sync").status_code == 401
+        assert client.get("/admin/etl/sync", headers={"Authorization": "Bearer errado"}).status_code == 401
+
+        with patch.object(controller, "token", ""):
+            assert client.post("/admin/etl/sync", headers={"Authorization": f"Bearer {TOKEN}"}).status_code == 503
+
+        controller.requests.request.assert_not_called()
+
+    def test_trigger_queues_a_request(self, client, controller):
+        controller.requests.request.return_value = ({"id": 3, "reason": "manual", "status": "pending"}, True)
+
+        response = client.post("/admin/etl/sync", headers={"Authorization": f"Bearer {TOKEN}"})
+
+        assert response.status_code == 202
+        assert response.json() == {"status": "queued", "request": {"id": 3, "reason": "manual", "status": "pending"}}
+        controller.requests.request.assert_called_once_with("manual")
+
+    def test_unknown_request_is_404(self, client, controller):
+        controller.requests.get.return_value = None
+
+        response = client.get("/admin/etl/sync/99", headers={"Authorization": f"Bearer {TOKEN}"})
+
+        assert response.status_code == 404
@@ -0,0 +1,72 @@
+"""
+Testes para a extração particionada (shards) do Airbyte
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from src.etl import airbyte as airbyte_module
+from src.etl.airbyte import split_repos, read_cached, make_cache, extract_sharded, ShardedReadResult, ShardExtractionError
+
+
+class TestShardedExtraction:
+
+    def test_split_repos_is_stable_and_complete(self):
+        repos = [f"owner/repo{i}" for i in range(20)]
+
+        shards = split_repos(repos, 4)
+        reordered = split_repos(list(reversed(repos)) + ["owner/new"], 4)
+
+        assert sorted(repo for shard_repos in shards.values() for repo in shard_repos) == sorted(repos)
+        for shard, shard_repos in shards.items():
+            assert set(shard_repos) <= set(reordered[shard])
+
+    def test_single_shard_keeps_all_repos(self):
+        assert split_repos(["a/b", "c/d"], 1) == {0: ["a/b", "c/d"]}
+
+    def test_streams_from_all_shards_are_merged(self):
+        first = MagicMock()
+        first.streams = {"issues": [1, 2], "commits": ["a"]}
+        second = MagicMock()
+        second.streams = {"issues": [3]}
+
+        streams = ShardedReadResult([first, second]).streams
+
+        assert list(streams["issues"]) == [1, 2, 3]
+        assert len(streams["issues"]) == 3
+        assert list(streams["commits"]) == ["a"]
+
+    def test_duckdb_cache_uses_one_local_file_per_shard(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(airbyte_module, "DUCKDB_CACHE_DIR", str(tmp_path))
+
+        result = read_cached(["airbyte_raw_shard_0", "airbyte_raw_shard_1"], cache_backend="duckdb")
+
+        assert result.schemas == ["airbyte_raw_shard_0", "airbyte_raw_shard_1"]
+        assert sorted(path.name for path in tmp_path.glob("*.duckdb")) == ["cache_airbyte_raw_shard_0.duckdb", "cache_airbyte_raw_shard_1.duckdb"]
+        assert result.streams == {}
+
+    def test_unknown_cache_backend_raises(self):
+        with pytest.raises(ValueError):
+            make_cache("airbyte_raw", "sqlite")
+
+    def test_failed_shard_fails_the_extraction(self, monkeypatch):
+        extracted = []
+
+        def extract_shard(repos, streams, github_token, incremental, schema_name, cache_backend):
+            if "owner/broken" in repos:
+                raise RuntimeError("API rate limit exceeded")
+            extracted.append(schema_name)
+            return schema_name
+
+        # Threads no lugar de processos: o extract_shard falso não precisa ser serializável
+        monkeypatch.setattr(airbyte_module, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+        monkeypatch.setattr(airbyte_module, "extract_shard", extract_shard)
+        repos = ["owner/broken"] + [f"owner/repo{i}" for i in range(8)]
+        assert split_repos(repos, 2)[1][0] == "owner/broken"
+
+        with pytest.raises(ShardExtractionError) as error:
+            extract_sharded(repos, ["issues"], "token", shards=2, max_workers=2)
+
+        assert error.value.shards == [1]
+        # O outro shard termina mesmo assim
+        assert extracted == ["airbyte_raw_shard_0"]
@@ -10,6 +10,7 @@ def mock_vanna():
         mock_vn = MagicMock()
         mock_vn.generate_sql.return_value = "SELECT * FROM issues LIMIT 10;"
         mock_vn.run_sql.return_value = [("issue1", "open"), ("issue2", "closed")]
+        mock_vn.run_sql_page.return_value = (["title", "state"], [("issue1", "open"), ("issue2", "closed")], False)
         mock_vn.train.return_value = None
         MockVanna.return_value = mock_vn
         yield mock_vn
@@ -45,7 +46,7 @@ class TestFastAPI:
         assert "output" in response.json()
         
         mock_vanna.generate_sql.assert_called_once_with("Quais são as issues abertas?")
-        mock_vanna.run_sql.assert_called_once()
+        mock_vanna.run_sql_page.assert_called_once()
     
     def test_ask_endpoint_error(self, client, mock_vanna, mock_genai):
 
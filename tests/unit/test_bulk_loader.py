@@ -0,0 +1,176 @@
+"""
+Testes para o upsert com detecção de mudança do bulk loader
+"""
+import pytest
+import datetime
+from functools import partial
+from unittest.mock import MagicMock, patch
+from sqlalchemy import text
+
+from src.etl.bulk_loader import BulkLoader
+from src.etl.timezone import localize_many
+from src.etl.records import UserRecord, BranchRecord, MilestoneRecord, IssueRecord, PullRequestRecord, CommitRecord
+
+
+@pytest.fixture
+def loader():
+    return BulkLoader(MagicMock(), localize=lambda value: value)
+
+
+class TestBulkLoader:
+
+    def test_report_splits_inserted_updated_and_unchanged(self, loader):
+        loader._report("issue", 5, 1.0, [(1, True), (2, False)])
+
+        assert loader.stats["issue"]["inserted"] == 1
+        assert loader.stats["issue"]["updated"] == 1
+        assert loader.stats["issue"]["unchanged"] == 3
+
+    def test_report_accumulates_across_chunks(self, loader):
+        loader._report("issue", 3, 1.0, [(1, True)])
+        loader._report("issue", 2, 0.5, [(2, False), (3, True)])
+
+        assert loader.stats["issue"] == {"rows": 5, "seconds": 1.5, "rows_per_sec": 5 / 1.5, "inserted": 2, "updated": 1, "unchanged": 2}
+
+    def test_failed_chunk_keeps_earlier_counts(self, loader):
+        loader._report("issue", 3, 1.0, [(1, True), (2, True), (3, True)])
+        loader.engine.raw_connection.return_value.cursor.side_effect = Exception("deadlock detected")
+
+        assert loader._execute("issue", "INSERT", [(4,)]) is None
+        assert (loader.stats["issue"]["rows"], loader.stats["issue"]["inserted"], loader.stats["issue"]["errors"]) == (4, 3, 1)
+
+    def test_duplicated_records_keep_last_version(self, loader):
+        records = [{"id": 1, "title": "old"}, {"id": 1, "title": "new"}, {"id": 2, "title": "x"}]
+
+        assert loader._unique(records) == [{"id": 1, "title": "new"}, {"id": 2, "title": "x"}]
+
+    def test_assignees_synced_only_for_changed_rows(self, loader):
+        with patch("src.etl.bulk_loader.execute_values") as execute_values:
+            assert loader._sync_assignees("issue_assignees", "DELETE", "INSERT", [(1, True), (2, False)], [(1, 10), (2, 11), (3, 12)])
+
+        connection = loader.engine.raw_connection.return_value
+        connection.cursor.return_value.execute.assert_called_once_with("DELETE", ([2],))
+        assert execute_values.call_args[0][2] == [(1, 10), (2, 11)]
+        connection.commit.assert_called_once()
+
+    def test_failed_assignee_insert_keeps_the_old_assignees(self, loader):
+        with patch("src.etl.bulk_loader.execute_values", side_effect=Exception("deadlock detected")):
+            assert not loader._sync_assignees("issue_assignees", "DELETE", "INSERT", [(2, False)], [(2, 11)])
+
+        # A remoção e a inserção estão na mesma transação: o rollback desfaz a remoção
+        connection = loader.engine.raw_connection.return_value
+        connection.cursor.return_value.execute.assert_called_once_with("DELETE", ([2],))
+        connection.commit.assert_not_called()
+        connection.rollback.assert_called_once()
+        assert loader.engine.raw_connection.call_count == 1
+
+    def test_removed_assignees_are_deleted_without_new_rows(self, loader):
+        with patch("src.etl.bulk_loader.execute_values") as execute_values:
+            assert loader._sync_assignees("issue_assignees", "DELETE", "INSERT", [(2, False)], [])
+
+        loader.engine.raw_connection.return_value.cursor.return_value.execute.assert_called_once_with("DELETE", ([2],))
+        execute_values.assert_not_called()
+
+
+ALICE = UserRecord(1, "alice", "https://github.com/alice")
+BOB = UserRecord(2, "bob", "https://github.com/bob")
+CREATED = datetime.datetime(2025, 3, 10, 12, 0)
+
+
+def issue(id, repository, number, title="bug", assignees=(ALICE,)):
+    return IssueRecord(id=id, title=title, body=None, number=number, html_url=f"https://github.com/{repository}/issues/{number}", created_at=CREATED, updated_at=CREATED, assignees=assignees, created_by=1, repository=repository, milestone_id=None)
+
+
+def pull_request(id, repository, number, milestone_id=None, assignees=(BOB,)):
+    return PullRequestRecord(id=id, created_by=2, repository=repository, number=number, state="open", title="feature", body=None, html_url=f"https://github.com/{repository}/pull/{number}", created_at=CREATED, updated_at=CREATED, merged_at=None, milestone_id=milestone_id, assignees=assignees)
+
+
+def commit(sha, repository, branch, parents=(), user_id=1, author_login=None, pull_number=None):
+    return CommitRecord(user_id=user_id, repository=repository, pull_request_id=None, branch=branch, created_at=CREATED, message=sha, sha=sha, parents=parents, html_url=None, author_login=author_login, pull_number=pull_number)
+
+
+def batch():
+    # Dois repositórios com o mesmo número de PR e a mesma branch: os ids saem do join por repositório
+    return {
+        "users": [ALICE, BOB],
+        "repositories": ["owner/a", "owner/b"],
+        "branches": [BranchRecord("owner/a", "main"), BranchRecord("owner/b", "main")],
+        "milestones": [MilestoneRecord(id=50, repository="owner/b", title="v1", description=None, number=1, state="open", created_at=CREATED, updated_at=CREATED, creator=1)],
+        "issues": [issue(10, "owner/a", 1), issue(20, "owner/b", 1, assignees=(ALICE, BOB))],
+        "pull_requests": [pull_request(100, "owner/a", 7), pull_request(200, "owner/b", 7, milestone_id=50)],
+        "commits": [
+            commit("c1", "owner/b", "main", pull_number=7),
+            commit("c2", "owner/b", "main", parents=("c1", "x9"), author_login="bob", user_id=None),
+            commit("c3", "owner/a", "main", author_login="desconhecido", user_id=None),
+        ],
+    }
+
+
+@pytest.fixture
+def db_loader(db):
+    return new_loader(db)
+
+
+def new_loader(db):
+    return BulkLoader(db, partial(localize_many, timezone="America/Sao_Paulo"))
+
+
+def rows(db, sql):
+    with db.connect() as connection:
+        return [tuple(row) for row in connection.execute(text(sql))]
+
+
+class TestBulkLoaderDatabase:
+
+    def test_load_batch_resolves_ids_through_repository_joins(self, db, db_loader):
+        assert db_loader.load_batch(batch()) is True
+
+        repository = dict(rows(db, "SELECT name, id FROM repository"))
+        branch = dict(rows(db, "SELECT repository_id, id FROM branch WHERE name = 'main'"))
+        assert rows(db, "SELECT id, repository_id FROM issue ORDER BY id") == [(10, repository["owner/a"]), (20, repository["owner/b"])]
+        assert rows(db, "SELECT id, repository_id, milestone_id FROM pull_requests ORDER BY id") == [(100, repository["owner/a"], None), (200, repository["owner/b"], 50)]
+        assert rows(db, "SELECT repository_id FROM milestone") == [(repository["owner/b"],)]
+        # PR pelo (repositório, número); branch do repositório do commit; autor pelo login; autor desconhecido fica de fora
+        assert rows(db, "SELECT sha, user_id, branch_id, pull_request_id FROM commits ORDER BY sha") == [
+            ("c1", 1, branch[repository["owner/b"]], 200),
+            ("c2", 2, branch[repository["owner/b"]], None),
+        ]
+        assert rows(db, "SELECT created_at FROM commits WHERE sha = 'c1'") == [(datetime.datetime(2025, 3, 10, 15, 0, tzinfo=datetime.timezone.utc),)]
+
+    def test_load_batch_inserts_child_rows(self, db, db_loader):
+        assert db_loader.load_batch(batch()) is True
+
+        assert rows(db, "SELECT issue_id, user_id FROM issue_assignees ORDER BY 1, 2") == [(10, 1), (20, 1), (20, 2)]
+        assert rows(db, "SELECT pull_request_id, user_id FROM pull_request_assignees ORDER BY 1") == [(100, 2), (200, 2)]
+        assert rows(db, "SELECT c.sha, pc.parent_sha, pc.parent_number FROM parents_commits pc JOIN commits c ON c.id = pc.commit_id ORDER BY 3") == [("c2", "c1", 0), ("c2", "x9", 1)]
+
+    def test_resync_only_writes_changed_rows(self, db, db_loader):
+        db_loader.load_batch(batch())
+        before = dict(rows(db, "SELECT id, xmin::text FROM issue"))
+
+        # Mesmas linhas de novo (um loader por lote, como no ETL): nada chega ao ON CONFLICT, nenhuma versão nova da linha
+        resync = new_loader(db)
+        resync.load_issues(batch()["issues"])
+        assert (resync.stats["issue"]["inserted"], resync.stats["issue"]["updated"], resync.stats["issue"]["unchanged"]) == (0, 0, 2)
+        assert dict(rows(db, "SELECT id, xmin::text FROM issue")) == before
+
+        # Um campo alterado: só essa linha é atualizada, e os assignees dela são sincronizados
+        changed = new_loader(db)
+        changed.load_issues([issue(10, "owner/a", 1, title="bug corrigido", assignees=(BOB,)), issue(20, "owner/b", 1, assignees=(ALICE, BOB))])
+        after = dict(rows(db, "SELECT id, xmin::text FROM issue"))
+        assert (changed.stats["issue"]["updated"], changed.stats["issue"]["unchanged"]) == (1, 1)
+        assert after[20] == before[20] and after[10] != before[10]
+        assert rows(db, "SELECT title FROM issue WHERE id = 10") == [("bug corrigido",)]
+        assert rows(db, "SELECT issue_id, user_id FROM issue_assignees ORDER BY 1, 2") == [(10, 2), (20, 1), (20, 2)]
+
+    def test_stats_cover_every_commit_every_chunk(self, db, db_loader):
+        db_loader.load_batch({**batch(), "issues": []})
+        issues = [issue(number, "owner/a", number) for number in range(1, 6)]
+
+        # Como ETL.checkpointed_load: um commit a cada commit_every (2) linhas
+        for start in range(0, len(issues), 2):
+            db_loader.load_issues(issues[start:start + 2])
+
+        stats = db_loader.stats["issue"]
+        assert (stats["rows"], stats["inserted"], stats["updated"], stats["unchanged"]) == (5, 5, 0, 0)
+        assert db_loader.stats["issue_assignees"]["rows"] == 5
@@ -0,0 +1,63 @@
+"""
+Testes para a materialização do grafo de commits (branch_commits)
+"""
+from sqlalchemy import text
+
+from src.etl.commit_graph import CommitGraph, walk_branch, branch_heads
+
+
+# main: 1 <- 2 <- 4 (merge de 3) <- 5;  feature: 1 <- 3
+PARENTS = {2: [1], 3: [1], 4: [2, 3], 5: [4]}
+
+
+class TestCommitGraph:
+
+    def test_merged_commits_take_the_position_of_the_merge(self):
+        rows = {commit: (position, first_parent) for commit, position, first_parent in walk_branch(5, PARENTS)}
+
+        assert rows == {1: (1, True), 2: (2, True), 4: (3, True), 3: (3, False), 5: (4, True)}
+
+    def test_head_is_the_latest_commit_without_children_in_the_branch(self):
+        # (commit, branch) em ordem de criação; o commit 6 é de outra branch e não conta como filho
+        branch_commits = [(1, 10), (2, 10), (3, 20), (4, 10), (5, 10), (6, 20)]
+        parents = {**PARENTS, 6: [5]}
+
+        assert branch_heads(branch_commits, parents) == {10: 5, 20: 6}
+
+    def test_cycles_and_missing_parents_do_not_loop(self):
+        rows = walk_branch(2, {2: [1], 1: [2]})
+
+        assert sorted(commit for commit, _, _ in rows) == [1, 2]
+        assert walk_branch(7, {}) == [(7, 1, True)]
+
+
+def insert_commit(connection, sha, branch_id, created_at, parents=()):
+    commit_id = connection.execute(text("INSERT INTO commits (user_id, branch_id, created_at, message, sha) VALUES (1, :branch, :created_at, :sha, :sha) RETURNING id"), {'branch': branch_id, 'created_at': created_at, 'sha': sha}).scalar_one()
+    for number, parent in enumerate(parents):
+        connection.execute(text("INSERT INTO parents_commits (parent_sha, commit_id, parent_number) VALUES (:parent, :commit, :number)"), {'parent': parent, 'commit': commit_id, 'number': number})
+    return commit_id
+
+
+class TestCommitGraphBuild:
+
+    def test_history_loaded_later_rebuilds_branch_without_moving_the_head(self, db):
+        # main: a <- b <- c, mas a chega só na segunda carga (ex.: antes era cortado por um commit sem autor)
+        with db.begin() as connection:
+            connection.execute(text("INSERT INTO user_info (id, login, html_url) VALUES (1, 'dev', 'https://github.com/dev')"))
+            connection.execute(text("INSERT INTO repository (id, name) VALUES (1, 'owner/repo')"))
+            connection.execute(text("INSERT INTO branch (id, name, repository_id) VALUES (1, 'main', 1)"))
+            b = insert_commit(connection, "b", 1, "2025-01-02", ["a"])
+            c = insert_commit(connection, "c", 1, "2025-01-03", ["b"])
+
+        first = CommitGraph(db).build()
+        with db.begin() as connection:
+            a = insert_commit(connection, "a", 1, "2025-01-01")
+        second = CommitGraph(db).build()
+
+        with db.connect() as connection:
+            rows = connection.execute(text("SELECT commit_id, position, first_parent FROM branch_commits WHERE branch_id = 1 ORDER BY position")).fetchall()
+        assert (first["rebuilt"], first["parents_resolved"]) == (1, 1)
+        assert (second["rebuilt"], second["parents_resolved"]) == (1, 1)
+        assert [tuple(row) for row in rows] == [(a, 1, True), (b, 2, True), (c, 3, True)]
+        # Nada novo: nenhuma branch regravada
+        assert CommitGraph(db).build()["rebuilt"] == 0
@@ -0,0 +1,50 @@
+"""
+Testes para o cache de resolução de IDs do ETL
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from src.etl.id_resolver import IdResolver
+
+
+@pytest.fixture
+def resolver():
+    resolver = IdResolver(MagicMock())
+    resolver.repository_ids = {"owner/repo": 1}
+    resolver.branch_ids = {(1, "main"): 10}
+    return resolver
+
+
+class TestIdResolver:
+
+    def test_cached_lookups_do_not_hit_database(self, resolver):
+        connection = MagicMock()
+
+        assert resolver.repository_id(connection, "owner/repo") == 1
+        assert resolver.branch_id(connection, 1, "main") == 10
+        connection.execute.assert_not_called()
+
+    def test_miss_falls_back_to_database_and_is_cached(self, resolver):
+        connection = MagicMock()
+        connection.execute.return_value.fetchone.return_value = (2,)
+
+        assert resolver.repository_id(connection, "owner/other") == 2
+        assert resolver.repository_id(connection, "owner/other") == 2
+        connection.execute.assert_called_once()
+
+    def test_inserted_ids_are_registered(self, resolver):
+        connection = MagicMock()
+        resolver.add_branch(1, "dev", 11)
+
+        assert resolver.branch_id(connection, 1, "dev") == 11
+        connection.execute.assert_not_called()
+
+    def test_pull_requests_resolved_in_a_single_query(self, resolver):
+        connection = MagicMock()
+        connection.execute.return_value.fetchall.return_value = [("owner/repo", 7, 70)]
+
+        ids = resolver.pull_request_ids(connection, {("owner/repo", 7), ("owner/repo", 8)})
+
+        assert ids == {("owner/repo", 7): 70}
+        assert connection.execute.call_count == 1
+        assert resolver.pull_request_ids(connection, set()) == {}
@@ -0,0 +1,52 @@
+"""
+Testes para a manutenção pós-load do ETL (retenção do cache do Airbyte + VACUUM ANALYZE)
+"""
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import text
+
+from src.etl.maintenance import Maintenance
+
+
+class TestMaintenance:
+
+    def test_keep_policy_only_analyzes_loaded_tables(self, fake_engine):
+        engine, executed = fake_engine(rows=[("airbyte_raw", "issues")])
+
+        report = Maintenance(engine, ["airbyte_raw"], retention="keep", tables=["issue", "commits"]).run()
+
+        assert not any(sql.startswith("TRUNCATE") for sql in executed)
+        assert [sql for sql in executed if sql.startswith("VACUUM")] == ['VACUUM (ANALYZE) "public"."issue"', 'VACUUM (ANALYZE) "public"."commits"']
+        assert report["truncated"] == 0 and report["analyzed"] == 2
+
+    def test_truncate_policy_empties_cache_and_reports_reclaimed_space(self, fake_engine):
+        cache_tables = [("airbyte_raw", "issues"), ("airbyte_internal", "airbyte_raw_raw__stream_issues")]
+        # Tamanhos antes (2 do cache + 1 carregada) e depois
+        engine, executed = fake_engine(rows=cache_tables, scalars=[4096, 1024, 512, 0, 0, 512])
+
+        report = Maintenance(engine, ["airbyte_raw"], retention="truncate", tables=["issue"]).run()
+
+        assert 'TRUNCATE "airbyte_raw"."issues", "airbyte_internal"."airbyte_raw_raw__stream_issues"' in executed
+        assert report["truncated"] == 2
+        assert report["reclaimed_bytes"] == 4096 + 1024
+
+    def test_unknown_policy_raises(self):
+        with pytest.raises(ValueError):
+            Maintenance(MagicMock(), ["airbyte_raw"], retention="drop")
+
+    def test_truncate_policy_on_a_real_database(self, db):
+        with db.begin() as connection:
+            connection.execute(text("DROP SCHEMA IF EXISTS airbyte_raw_test CASCADE; CREATE SCHEMA airbyte_raw_test"))
+            connection.execute(text("CREATE TABLE airbyte_raw_test.issues AS SELECT g AS id, repeat('x', 1000) AS body FROM generate_series(1, 500) g"))
+            connection.execute(text("INSERT INTO repository (name) VALUES ('owner/repo')"))
+
+        try:
+            report = Maintenance(db, ["airbyte_raw_test"], retention="truncate", tables=["repository"]).run()
+
+            with db.connect() as connection:
+                assert connection.execute(text("SELECT count(*) FROM airbyte_raw_test.issues")).scalar_one() == 0
+                assert connection.execute(text("SELECT count(*) FROM repository")).scalar_one() == 1
+            assert report["truncated"] == 1 and report["reclaimed_bytes"] > 0
+        finally:
+            with db.begin() as connection:
+                connection.execute(text("DROP SCHEMA airbyte_raw_test CASCADE"))
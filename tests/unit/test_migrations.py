@@ -0,0 +1,29 @@
+"""
+Testes para a atualização do schema de bancos criados por versões anteriores do init_db.sql
+"""
+from sqlalchemy import text
+
+from src.etl.migrations import upgrade_schema
+
+
+def columns(connection, table):
+    return {row[0] for row in connection.execute(text("SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = :table"), {'table': table})}
+
+
+class TestUpgradeSchema:
+
+    def test_old_database_gets_commit_graph_columns_and_table(self, db):
+        with db.begin() as connection:
+            # Banco criado antes do grafo de commits
+            connection.execute(text("DROP TABLE branch_commits; ALTER TABLE parents_commits DROP COLUMN parent_number, DROP COLUMN parent_id"))
+
+        assert upgrade_schema(db) is True
+
+        with db.connect() as connection:
+            assert {"parent_number", "parent_id"} <= columns(connection, "parents_commits")
+            assert {"branch_id", "commit_id", "position", "first_parent"} == columns(connection, "branch_commits")
+            indexes = {row[0] for row in connection.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"))}
+        assert {"idx_pc_commit_id", "idx_pc_parent_id", "idx_bc_branch_position", "idx_bc_commit_id"} <= indexes
+
+    def test_current_schema_is_left_alone(self, db):
+        assert upgrade_schema(db) is False
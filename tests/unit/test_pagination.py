@@ -0,0 +1,59 @@
+"""
+Testes para a leitura paginada do SQL gerado (cursor server-side + token de página)
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from src.api.database.pagination import fetch_page, encode_token, decode_token, PageTokenError
+
+SECRET = b"segredo-de-teste"
+
+
+def fake_connection(rows):
+    conn = MagicMock(autocommit=True)
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.description = [MagicMock(), MagicMock()]
+    cursor.description[0].name, cursor.description[1].name = "repositorio", "total"
+    cursor.fetchmany.side_effect = lambda size: rows[:size]
+    return conn, cursor
+
+
+class TestFetchPage:
+
+    def test_reads_one_row_past_the_limit_to_detect_more(self):
+        conn, cursor = fake_connection([("oraculo", 3), ("docs", 2), ("site", 1)])
+
+        columns, rows, has_more = fetch_page(conn, "SELECT * FROM contagem;", offset=4, limit=2)
+
+        assert columns == ["repositorio", "total"]
+        assert rows == [("oraculo", 3), ("docs", 2)] and has_more is True
+        assert conn.cursor.call_args.kwargs["name"].startswith("vanna_")
+        cursor.execute.assert_called_once_with("SELECT * FROM contagem")
+        cursor.scroll.assert_called_once_with(4)
+        # Transação do cursor desfeita e autocommit da conexão do pool restaurado
+        conn.rollback.assert_called_once()
+        assert conn.autocommit is True
+
+    def test_last_page(self):
+        conn, cursor = fake_connection([("oraculo", 3)])
+
+        _, rows, has_more = fetch_page(conn, "SELECT 1", limit=2)
+
+        assert rows == [("oraculo", 3)] and has_more is False
+        cursor.scroll.assert_not_called()
+
+
+class TestPageToken:
+
+    def test_round_trip(self):
+        token = encode_token("SELECT * FROM commits", 500, secret=SECRET)
+
+        assert decode_token(token, secret=SECRET) == ("SELECT * FROM commits", 500)
+
+    def test_tampered_or_foreign_tokens_are_rejected(self):
+        token = encode_token("SELECT * FROM commits", 500, secret=SECRET)
+        forged = encode_token("SELECT * FROM user_info", 0, secret=b"outro-segredo")
+
+        for bad in [forged, token[:-1] + ("0" if token[-1] != "0" else "1"), "lixo"]:
+            with pytest.raises(PageTokenError):
+                decode_token(bad, secret=SECRET)
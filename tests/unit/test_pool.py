@@ -0,0 +1,69 @@
+"""
+Testes para o pool de conexões do Vanna (run_sql / get_schema)
+"""
+import pytest
+import psycopg2
+from unittest.mock import MagicMock, patch
+
+from src.api.database.pool import ConnectionPool
+
+
+def fake_connection():
+    conn = MagicMock(closed=0, autocommit=False)
+    conn.set_session.side_effect = lambda autocommit: setattr(conn, "autocommit", autocommit)
+    return conn
+
+
+@pytest.fixture
+def threaded_pool():
+    with patch("src.api.database.pool.ThreadedConnectionPool") as pool_class:
+        yield pool_class.return_value
+
+
+class TestConnectionPool:
+
+    def test_session_is_configured_once_and_connection_reused(self, threaded_pool):
+        conn = fake_connection()
+        threaded_pool.getconn.return_value = conn
+        pool = ConnectionPool("postgresql://x", maxconn=2, ping_seconds=60)
+
+        for _ in range(3):
+            with pool.connection() as borrowed:
+                assert borrowed is conn
+
+        conn.set_session.assert_called_once_with(autocommit=True)
+        assert "default_transaction_read_only=on" in pool.options
+        threaded_pool.putconn.assert_called_with(conn, close=False)
+        assert pool.stats == {"checkouts": 3, "pings": 0, "discarded": 0}
+
+    def test_idle_connection_that_fails_the_ping_is_replaced(self, threaded_pool):
+        stale, fresh = fake_connection(), fake_connection()
+        stale.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("server closed the connection")
+        threaded_pool.getconn.side_effect = [stale, fresh]
+        pool = ConnectionPool("postgresql://x", ping_seconds=0)
+        pool.last_used[id(stale)] = 0
+
+        with pool.connection() as borrowed:
+            assert borrowed is fresh
+
+        threaded_pool.putconn.assert_any_call(stale, close=True)
+        assert pool.stats["pings"] == 1 and pool.stats["discarded"] == 1
+
+    def test_lost_connection_is_discarded_but_sql_errors_keep_it(self, threaded_pool):
+        conn = fake_connection()
+        threaded_pool.getconn.return_value = conn
+        pool = ConnectionPool("postgresql://x", maxconn=1)
+
+        with pytest.raises(psycopg2.errors.QueryCanceled):
+            with pool.connection():
+                raise psycopg2.errors.QueryCanceled("canceling statement due to statement timeout")
+        threaded_pool.putconn.assert_called_with(conn, close=False)
+
+        with pytest.raises(psycopg2.OperationalError):
+            with pool.connection():
+                conn.closed = 2
+                raise psycopg2.OperationalError("terminating connection")
+        threaded_pool.putconn.assert_called_with(conn, close=True)
+        # O slot volta para o semáforo mesmo com erro
+        with pool.connection():
+            pass
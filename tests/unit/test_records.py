@@ -0,0 +1,29 @@
+"""
+Testes para os registros compactos do transform
+"""
+import pytest
+
+from src.etl.records import CommitRecord, UserRecord
+
+
+class TestRecord:
+
+    def test_key_access_like_a_dict(self):
+        user = UserRecord(1, "alice", "url")
+
+        assert user["login"] == "alice" and user.get("missing") is None
+        assert user == {"id": 1, "login": "alice", "html_url": "url"}
+        assert list(user.keys()) == ["id", "login", "html_url"]
+        with pytest.raises(KeyError):
+            user["keys"]
+
+        user["id"] = 2
+        assert user.as_dict()["id"] == 2
+
+    def test_fields_default_to_none_and_no_instance_dict(self):
+        commit = CommitRecord(sha="abc", parents=())
+
+        assert commit["author_login"] is None and commit["user_id"] is None
+        assert not hasattr(commit, "__dict__")
+        with pytest.raises(TypeError):
+            CommitRecord(unknown=1)
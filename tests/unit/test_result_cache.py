@@ -0,0 +1,78 @@
+"""
+Testes para o cache de resultados do SQL gerado (SQL normalizado + versão dos dados)
+"""
+from unittest.mock import patch
+
+from src.api.database.result_cache import ResultCache, normalize_sql
+
+
+def fresh_cache(**kwargs):
+    # ResultCache é singleton: os testes usam instâncias próprias
+    cache = object.__new__(ResultCache)
+    cache.__init__(**kwargs)
+    return cache
+
+
+class TestNormalizeSql:
+
+    def test_equivalent_queries_share_a_key(self):
+        first = """
+            -- PRs abertos por repositório
+            SELECT r.name, COUNT(*) FROM pull_requests p JOIN repository r ON r.id = p.repository_id
+            WHERE p.state IN ('open', 'draft') GROUP BY r.name;
+        """
+        second = "select r.name, count(*)\nfrom pull_requests p join repository r on r.id = p.repository_id where p.state in ('draft','open') group by r.name"
+
+        assert normalize_sql(first) == normalize_sql(second)
+
+    def test_literals_and_quoted_identifiers_keep_their_case(self):
+        normalized = normalize_sql("SELECT \"Login\" FROM user_info WHERE login = 'BPThiago'  /* autor */")
+
+        assert normalized == "select \"Login\" from user_info where login = 'BPThiago'"
+        assert normalize_sql("SELECT 1 WHERE x IN (3, 1, 2)") == "select 1 where x in (1, 2, 3)"
+
+    def test_in_lists_inside_literals_are_not_sorted(self):
+        first = normalize_sql("SELECT id FROM issue WHERE title = 'x in (2, 1)'")
+        second = normalize_sql("SELECT id FROM issue WHERE title = 'x in (1, 2)'")
+
+        assert first != second
+        assert first == "select id from issue where title = 'x in (2, 1)'"
+
+    def test_dollar_quoted_literals_keep_their_case(self):
+        assert normalize_sql("SELECT id FROM issue WHERE title = $$Foo$$") != normalize_sql("SELECT id FROM issue WHERE title = $$foo$$")
+        assert normalize_sql("SELECT $t$It's -- IN (2, 1)$t$") == "select $t$It's -- IN (2, 1)$t$"
+        assert normalize_sql("SELECT 1 WHERE x IN (-2, 'a', $$b$$)") == normalize_sql("select 1 where x in ($$b$$,'a',- 2)")
+
+
+class TestResultCache:
+
+    def test_lru_eviction_and_stats(self):
+        cache = fresh_cache(max_entries=2, version_ttl=60)
+        cache.refresh_version(lambda: 1)
+        for key in ["a", "b"]:
+            cache.put(key, ([], [(key,)], False), 1)
+
+        cache.get("a") # "a" passa a ser o mais recente
+        cache.put("c", ([], [("c",)], False), 1)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (3, 1, 1, 2)
+
+    def test_new_data_version_invalidates_after_the_ttl(self):
+        cache = fresh_cache(max_entries=10, version_ttl=5)
+        with patch("src.api.database.result_cache.time.monotonic", side_effect=[0, 1, 10]):
+            cache.refresh_version(lambda: 1)
+            cache.put("a", ([], [(1,)], False), 1)
+
+            # Dentro do TTL a versão não é relida
+            assert cache.refresh_version(lambda: 2) == 1
+            assert cache.get("a") is not None
+
+            assert cache.refresh_version(lambda: 2) == 2
+            assert cache.get("a") is None
+
+        # Página lida na versão anterior não entra
+        cache.put("b", ([], [(1,)], False), 1)
+        assert cache.stats()["entries"] == 0 and cache.stats()["invalidations"] == 1
@@ -0,0 +1,45 @@
+"""
+Testes para os checkpoints de retomada do ETL
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from src.etl.run_ledger import RunLedger, batch_fingerprint
+
+
+@pytest.fixture
+def ledger():
+    ledger = RunLedger(MagicMock())
+    ledger.run_id = 1
+    ledger.entries = {
+        ("batch", 1): {"position": 0, "last_key": "abc", "status": "done"},
+        ("commits", 2): {"position": 2, "last_key": "c1", "status": "running"},
+    }
+    return ledger
+
+
+class TestRunLedger:
+
+    def test_batch_is_done_only_with_same_fingerprint(self, ledger):
+        assert ledger.is_done("batch", 1, last_key="abc") is True
+        assert ledger.is_done("batch", 1, last_key="other") is False
+        assert ledger.is_done("batch", 2) is False
+
+    def test_resume_position_continues_after_last_commit(self, ledger):
+        rows = [{"sha": "c0"}, {"sha": "c1"}, {"sha": "c2"}]
+
+        assert ledger.resume_position("commits", 2, rows) == 2
+        assert ledger.resume_position("commits", 3, rows) == 0
+
+    def test_resume_position_restarts_when_data_changed(self, ledger):
+        rows = [{"sha": "c9"}, {"sha": "c8"}, {"sha": "c2"}]
+
+        assert ledger.resume_position("commits", 2, rows) == 0
+
+    def test_batch_fingerprint_depends_on_row_keys(self):
+        batch = {"users": [{"id": 1, "login": "a"}], "repositories": ["owner/repo"]}
+        same = {"users": [{"id": 1, "login": "renamed"}], "repositories": ["owner/repo"]}
+        other = {"users": [{"id": 2, "login": "a"}], "repositories": ["owner/repo"]}
+
+        assert batch_fingerprint(batch) == batch_fingerprint(same)
+        assert batch_fingerprint(batch) != batch_fingerprint(other)
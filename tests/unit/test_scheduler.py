@@ -0,0 +1,57 @@
+"""
+Testes para o agendador de loads em DAG do ETL
+"""
+import threading
+import time
+import pytest
+
+from src.etl.scheduler import LoadScheduler
+
+
+class TestLoadScheduler:
+
+    def test_dependencies_finish_before_dependents(self):
+        order = []
+        lock = threading.Lock()
+
+        def node(name, delay=0):
+            def run():
+                time.sleep(delay)
+                with lock:
+                    order.append(name)
+                return name
+            return run
+
+        scheduler = LoadScheduler(max_workers=4)
+        scheduler.add("users", node("users", 0.05))
+        scheduler.add("repositories", node("repositories"))
+        scheduler.add("branches", node("branches"), ["repositories"])
+        scheduler.add("commits", node("commits"), ["users", "branches"])
+
+        results = scheduler.run()
+
+        assert order.index("commits") > order.index("users")
+        assert order.index("branches") > order.index("repositories")
+        assert results["commits"] == "commits"
+        assert scheduler.critical_path() == ["users", "commits"]
+
+    def test_dependents_of_failed_node_are_skipped(self):
+        executed = []
+
+        def fail():
+            raise RuntimeError("falha")
+
+        scheduler = LoadScheduler(max_workers=2)
+        scheduler.add("users", fail)
+        scheduler.add("issues", lambda: executed.append("issues"), ["users"])
+
+        scheduler.run()
+
+        assert executed == []
+
+    def test_unknown_dependency_raises(self):
+        scheduler = LoadScheduler()
+        scheduler.add("issues", lambda: None, ["milestones"])
+
+        with pytest.raises(ValueError):
+            scheduler.run()
@@ -0,0 +1,82 @@
+"""
+Testes para a carga blue/green (schema sombra + troca das tabelas)
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.etl.shadow import ShadowSchema
+
+
+def lock_timeout():
+    error = MagicMock(pgcode="55P03")
+    return OperationalError("ALTER TABLE", {}, error)
+
+
+class TestShadowSchema:
+
+    def test_sequences_are_released_before_the_tables_move(self, fake_engine):
+        engine, executed = fake_engine(rows=[('public.commits_id_seq', 'commits', 'id')])
+
+        ShadowSchema(engine, schema="shadow", tables=["commits", "parents_commits"]).swap_tables()
+
+        statements = [sql for sql in executed if sql.startswith("ALTER")]
+        assert statements == [
+            'ALTER SEQUENCE public.commits_id_seq OWNED BY NONE',
+            'ALTER TABLE "public"."commits" SET SCHEMA "etl_retired"',
+            'ALTER TABLE "public"."parents_commits" SET SCHEMA "etl_retired"',
+            'ALTER TABLE "shadow"."commits" SET SCHEMA public',
+            'ALTER TABLE "shadow"."parents_commits" SET SCHEMA public',
+            'ALTER SEQUENCE public.commits_id_seq OWNED BY "public"."commits"."id"',
+        ]
+
+    def test_swap_retries_while_locks_are_busy(self):
+        shadow = ShadowSchema(MagicMock(), attempts=3)
+
+        with patch.object(shadow, "swap_tables", side_effect=[lock_timeout(), None]) as swap_tables, patch("src.etl.shadow.time.sleep"):
+            shadow.swap()
+
+        assert swap_tables.call_count == 2
+
+    def test_swap_gives_up_after_last_attempt(self):
+        shadow = ShadowSchema(MagicMock(), attempts=2)
+
+        with patch.object(shadow, "swap_tables", side_effect=lock_timeout()), patch("src.etl.shadow.time.sleep"):
+            with pytest.raises(OperationalError):
+                shadow.swap()
+
+
+class TestShadowSchemaDatabase:
+
+    def test_swap_publishes_shadow_data_and_sequences_keep_working(self, db):
+        with db.begin() as connection:
+            connection.execute(text("INSERT INTO repository (name) VALUES ('owner/antigo'), ('owner/mantido')"))
+
+        shadow = ShadowSchema(db, schema="etl_shadow")
+        shadow.prepare()
+        shadow_engine = shadow.shadow_engine()
+        try:
+            # O ETL escreve só nas cópias; o public continua como estava até a troca
+            with shadow_engine.begin() as connection:
+                connection.execute(text("DELETE FROM repository WHERE name = 'owner/antigo'"))
+                connection.execute(text("INSERT INTO repository (name) VALUES ('owner/novo')"))
+        finally:
+            shadow_engine.dispose()
+        with db.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM public.repository WHERE name = 'owner/antigo'")).scalar_one() == 1
+
+        shadow.swap()
+
+        with db.begin() as connection:
+            names = connection.execute(text("SELECT name FROM public.repository ORDER BY id")).scalars().all()
+            new_id = connection.execute(text("INSERT INTO repository (name) VALUES ('owner/depois') RETURNING id")).scalar_one()
+            # As chaves estrangeiras seguiram as tabelas: branch referencia o repository publicado
+            connection.execute(text("INSERT INTO branch (name, repository_id) VALUES ('main', :id)"), {'id': new_id})
+            max_id = connection.execute(text("SELECT max(id) FROM repository WHERE name <> 'owner/depois'")).scalar_one()
+            sequence = connection.execute(text("SELECT pg_get_serial_sequence('public.repository', 'id')")).scalar_one()
+            schemas = connection.execute(text("SELECT count(*) FROM pg_namespace WHERE nspname IN ('etl_shadow', 'etl_retired')")).scalar_one()
+        assert names == ["owner/mantido", "owner/novo"]
+        assert new_id > max_id
+        assert sequence == "public.repository_id_seq"
+        assert schemas == 0
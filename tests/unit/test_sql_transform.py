@@ -0,0 +1,151 @@
+"""
+Testes para a montagem do transform em SQL sobre o cache do Airbyte
+"""
+import pytest
+import datetime
+from unittest.mock import MagicMock
+from sqlalchemy import text
+
+from src.etl.sql_transform import SqlTransform
+from src.etl.sync_state import SyncState
+from src.etl.timezone import localize_many
+
+
+@pytest.fixture
+def cache_columns():
+    return {
+        "issues": {"id", "repository", "user", "assignees", "milestone", "updated_at"},
+        "commits": {"sha", "repository", "branch", "author", "parents", "created_at"},
+        "pull_request_commits": {"sha", "repository", "pull_number"},
+    }
+
+
+class TestSqlTransform:
+
+    def test_statements_follow_foreign_key_order(self, cache_columns):
+        transform = SqlTransform(MagicMock())
+        transform.columns = cache_columns
+
+        tables = [table for table, sql in transform.build_statements()]
+
+        assert tables == ["user_info", "repository", "branch", "issue", "issue_assignees", "commits", "parents_commits"]
+
+    def test_commits_link_pull_requests_by_repository_and_number(self, cache_columns):
+        transform = SqlTransform(MagicMock())
+        transform.columns = cache_columns
+
+        sql = transform.commits_sql()
+
+        assert "p.repository_id = pr_repo.id AND p.number = prc.pull_number" in sql
+
+    def test_incremental_filter_uses_watermarks(self, cache_columns):
+        transform = SqlTransform(MagicMock(), incremental=True)
+        transform.columns = cache_columns
+
+        assert "etl.sync_state" in transform.issues_sql()
+        assert "etl.sync_state" not in SqlTransform(MagicMock()).issues_sql()
+
+
+CACHE_SCHEMA_SQL = """
+    CREATE SCHEMA airbyte_raw_test;
+    CREATE TABLE airbyte_raw_test.issues (id bigint, repository varchar, "user" json, assignees json, milestone json, title text, body text, number bigint, html_url text, created_at timestamp, updated_at timestamp);
+    CREATE TABLE airbyte_raw_test.pull_requests (id bigint, repository varchar, "user" json, assignees json, milestone json, number bigint, state varchar, title text, body text, html_url text, created_at timestamp, updated_at timestamp);
+    CREATE TABLE airbyte_raw_test.commits (sha varchar, repository varchar, branch varchar, author json, commit json, parents json, html_url text, created_at timestamp);
+    CREATE TABLE airbyte_raw_test.pull_request_commits (sha varchar, repository varchar, pull_number bigint);
+"""
+
+ALICE = '{"id": 1, "login": "Alice", "html_url": "https://github.com/alice"}'
+BOB = '{"id": 2, "login": "bob", "html_url": "https://github.com/bob"}'
+
+# Horário de verão de São Paulo (2018): o fuso do dia é -02
+CREATED = datetime.datetime(2018, 12, 1, 10, 30)
+
+CACHE_ROWS_SQL = [
+    ("INSERT INTO airbyte_raw_test.issues VALUES (10, 'Owner/A', :alice, :assignees, NULL, 'bug', NULL, 1, 'u', :created, :created)", {"assignees": f"[{BOB}]"}),
+    # Mesmo número de PR nos dois repositórios
+    ("INSERT INTO airbyte_raw_test.pull_requests VALUES (100, 'owner/a', :bob, '[]', NULL, 7, 'open', 'pr a', NULL, 'u', :created, :created)", {}),
+    ("INSERT INTO airbyte_raw_test.pull_requests VALUES (200, 'owner/b', :bob, '[]', NULL, 7, 'open', 'pr b', NULL, 'u', :created, :created)", {}),
+    ("INSERT INTO airbyte_raw_test.commits VALUES ('c1', 'owner/b', 'Main', :alice, '{\"message\": \"primeiro\"}', '[]', 'u', :created)", {}),
+    ("INSERT INTO airbyte_raw_test.commits VALUES ('c2', 'owner/b', 'main', :bob, '{\"message\": \"merge\"}', '[{\"sha\": \"c1\"}, {\"sha\": \"x9\"}]', 'u', :created)", {}),
+    ("INSERT INTO airbyte_raw_test.pull_request_commits VALUES ('c1', 'owner/b', 7)", {}),
+]
+
+
+@pytest.fixture
+def cache(db):
+    with db.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS airbyte_raw_test CASCADE"))
+        connection.execute(text(CACHE_SCHEMA_SQL))
+        for sql, params in CACHE_ROWS_SQL:
+            connection.execute(text(sql), {"alice": ALICE, "bob": BOB, "created": CREATED, **params})
+    yield "airbyte_raw_test"
+    with db.begin() as connection:
+        connection.execute(text("DROP SCHEMA airbyte_raw_test CASCADE"))
+
+
+def snapshot(db):
+    with db.connect() as connection:
+        return {
+            table: sorted(tuple(row) for row in connection.execute(text(f"SELECT xmin::text, * FROM {table}")))
+            for table in ["user_info", "repository", "branch", "issue", "issue_assignees", "pull_requests", "commits", "parents_commits"]
+        }
+
+
+class TestSqlTransformDatabase:
+
+    def test_commits_link_to_the_pull_request_of_their_repository(self, db, cache):
+        SqlTransform(db, cache_schema=cache, timezone="America/Sao_Paulo").run()
+
+        with db.connect() as connection:
+            commits = dict(connection.execute(text("SELECT sha, pull_request_id FROM commits")).fetchall())
+            parents = connection.execute(text("SELECT parent_sha, parent_number FROM parents_commits ORDER BY parent_number")).fetchall()
+            assignees = connection.execute(text("SELECT issue_id, user_id FROM issue_assignees")).fetchall()
+        assert commits == {"c1": 200, "c2": None}
+        assert [tuple(row) for row in parents] == [("c1", 0), ("x9", 1)]
+        assert [tuple(row) for row in assignees] == [(10, 2)]
+
+    def test_second_run_is_a_no_op(self, db, cache):
+        SqlTransform(db, cache_schema=cache).run()
+        before = snapshot(db)
+
+        stats = SqlTransform(db, cache_schema=cache).run()
+
+        assert set(stats.values()) == {0}
+        assert snapshot(db) == before
+
+    def test_timestamps_are_localized_like_the_row_path(self, db, cache):
+        SqlTransform(db, cache_schema=cache, timezone="America/Sao_Paulo").run()
+
+        expected = localize_many([CREATED], timezone="America/Sao_Paulo")[0]
+        with db.connect() as connection:
+            issue = connection.execute(text("SELECT created_at, updated_at FROM issue")).fetchone()
+            commit = connection.execute(text("SELECT created_at FROM commits WHERE sha = 'c1'")).scalar_one()
+        assert issue.created_at == expected and issue.updated_at == expected and commit == expected
+        assert expected.utcoffset() == datetime.timedelta(hours=-2)
+
+    def test_incremental_run_keeps_older_dated_commits_that_arrive_later(self, db, cache):
+        SyncState(db).load() # Cria etl.sync_state, como o ETL no modo incremental
+        SqlTransform(db, cache_schema=cache, incremental=True).run()
+        # Commit com data do autor anterior à dos já sincronizados, enviado depois (branch nova, rebase, push atrasado)
+        with db.begin() as connection:
+            connection.execute(text("INSERT INTO airbyte_raw_test.commits VALUES ('c0', 'owner/b', 'feature', :alice, '{\"message\": \"antigo\"}', '[]', 'u', :created)"), {"alice": ALICE, "created": CREATED - datetime.timedelta(days=30)})
+
+        SqlTransform(db, cache_schema=cache, incremental=True).run()
+
+        with db.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM commits WHERE sha = 'c0'")).scalar_one() == 1
+            assert connection.execute(text("SELECT count(*) FROM etl.sync_state WHERE stream = 'commits'")).scalar_one() == 0
+
+    def test_renamed_user_keeps_the_most_recent_login(self, db, cache):
+        # Mesmo id com o login antigo (issue 10, commit c1) e o novo, em uma issue atualizada depois
+        renamed = '{"id": 1, "login": "Alice-Renamed", "html_url": "https://github.com/alice-renamed"}'
+        with db.begin() as connection:
+            connection.execute(text("INSERT INTO airbyte_raw_test.issues VALUES (11, 'owner/a', :renamed, '[]', NULL, 'bug 2', NULL, 2, 'u', :created, :updated)"), {"renamed": renamed, "created": CREATED, "updated": CREATED + datetime.timedelta(days=1)})
+
+        SqlTransform(db, cache_schema=cache).run()
+
+        with db.connect() as connection:
+            users = connection.execute(text("SELECT id, login, html_url FROM user_info ORDER BY id")).fetchall()
+            authors = connection.execute(text("SELECT DISTINCT created_by FROM issue")).fetchall()
+        assert [tuple(row) for row in users] == [(1, "alice-renamed", "https://github.com/alice-renamed"), (2, "bob", "https://github.com/bob")]
+        assert [tuple(row) for row in authors] == [(1,)]
@@ -0,0 +1,53 @@
+"""
+Testes para as marcas d'água do modo incremental do ETL
+"""
+import datetime
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.etl.sync_state import SyncState
+
+
+@pytest.fixture
+def sync_state():
+    state = SyncState(MagicMock())
+    state.watermarks = {
+        ("owner/repo", "issues"): datetime.datetime(2025, 6, 1, 12, 0, 0)
+    }
+    return state
+
+
+class TestSyncState:
+
+    def test_record_older_than_watermark_is_skipped(self, sync_state):
+        record = SimpleNamespace(repository="Owner/Repo", updated_at=datetime.datetime(2025, 5, 1))
+
+        assert sync_state.is_new("issues", record) is False
+        assert sync_state.pending == {}
+
+    def test_record_newer_than_watermark_is_kept(self, sync_state):
+        record = SimpleNamespace(repository="owner/repo", updated_at=datetime.datetime(2025, 7, 1))
+
+        assert sync_state.is_new("issues", record) is True
+        assert sync_state.pending[("owner/repo", "issues")] == datetime.datetime(2025, 7, 1)
+
+    def test_pending_keeps_highest_cursor(self, sync_state):
+        sync_state.is_new("issues", SimpleNamespace(repository="owner/repo", updated_at=datetime.datetime(2025, 8, 2)))
+        sync_state.is_new("issues", SimpleNamespace(repository="owner/repo", updated_at=datetime.datetime(2025, 8, 1)))
+
+        assert sync_state.pending[("owner/repo", "issues")] == datetime.datetime(2025, 8, 2)
+
+    def test_older_dated_commit_synced_after_a_newer_one_is_kept(self, sync_state):
+        # Commit de terça sincronizado primeiro; o de segunda só foi enviado na quarta
+        assert sync_state.is_new("commits", SimpleNamespace(repository="owner/repo", created_at=datetime.datetime(2025, 8, 5)))
+        sync_state.watermarks.update(sync_state.pending)
+
+        assert sync_state.is_new("commits", SimpleNamespace(repository="owner/repo", created_at=datetime.datetime(2025, 8, 4))) is True
+        assert ("owner/repo", "commits") not in sync_state.pending
+
+    def test_non_incremental_stream_is_always_new(self, sync_state):
+        record = SimpleNamespace(login="someone")
+
+        assert sync_state.is_new("assignees", record) is True
+        assert sync_state.pending == {}
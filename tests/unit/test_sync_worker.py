@@ -0,0 +1,62 @@
+"""
+Testes para o worker de sincronização em segundo plano
+"""
+from unittest.mock import MagicMock, patch
+
+from src.etl.worker import SyncWorker
+
+
+def fake_etl(locked=True, run=True):
+    etl = MagicMock()
+    lock = etl.engine.connect.return_value.__enter__.return_value
+    lock.execute.return_value.scalar.return_value = locked
+    if isinstance(run, Exception):
+        etl.run.side_effect = run
+    else:
+        etl.run.return_value = run
+    etl.ledger.run_id = 42
+    return etl
+
+
+def worker(etl, **kwargs):
+    with patch("src.etl.worker.SyncRequests") as requests_class:
+        sync_worker = SyncWorker(etl, poll_seconds=0, **kwargs)
+    sync_worker.requests = requests_class.return_value
+    sync_worker.requests.pending.return_value = 0
+    sync_worker.requests.claim.return_value = [7]
+    return sync_worker
+
+
+class TestSyncWorker:
+
+    def test_scheduled_sync_runs_etl_and_records_the_run(self):
+        etl = fake_etl()
+        sync_worker = worker(etl, interval=60, run_on_start=True)
+
+        assert sync_worker.tick() == "success"
+
+        sync_worker.requests.request.assert_called_once_with("schedule")
+        sync_worker.requests.finish.assert_called_once_with([7], "success", run_id=42)
+        # Próxima só depois do intervalo
+        assert sync_worker.tick() is None
+        etl.run.assert_called_once()
+
+    def test_pending_request_runs_without_schedule(self):
+        etl = fake_etl(run=RuntimeError("GitHub fora do ar"))
+        sync_worker = worker(etl, interval=0, run_on_start=False)
+        sync_worker.requests.pending.return_value = 1
+
+        assert sync_worker.tick() == "failed"
+
+        sync_worker.requests.request.assert_not_called()
+        sync_worker.requests.finish.assert_called_once_with([7], "failed", run_id=42)
+
+    def test_busy_lock_leaves_requests_queued(self):
+        etl = fake_etl(locked=False)
+        sync_worker = worker(etl, interval=60, run_on_start=True)
+
+        assert sync_worker.tick() is None
+
+        etl.run.assert_not_called()
+        sync_worker.requests.claim.assert_not_called()
+        assert sync_worker.next_run is not None
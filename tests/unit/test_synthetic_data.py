@@ -0,0 +1,55 @@
+"""
+Testes para o gerador de dados sintéticos e o benchmark offline do ETL
+"""
+import pytest
+
+from benchmarks.synthetic import generate
+from benchmarks.bench_etl import regressions
+from src.etl.transform import StreamTransformer
+
+
+@pytest.fixture(scope="module")
+def read_result():
+    return generate(repos=4, users=30, commits=600, seed=7)
+
+
+class TestSyntheticGitHub:
+
+    def test_same_seed_generates_same_data(self, read_result):
+        again = generate(repos=4, users=30, commits=600, seed=7)
+
+        assert again.counts() == read_result.counts()
+        assert [c.sha for c in again.streams["commits"]] == [c.sha for c in read_result.streams["commits"]]
+        assert [i.title for i in again.streams["issues"]] == [i.title for i in read_result.streams["issues"]]
+
+    def test_references_are_consistent(self, read_result):
+        streams = read_result.streams
+        shas = {commit.sha for commit in streams["commits"]}
+        pr_numbers = {(pr.repository, pr.number) for pr in streams["pull_requests"]}
+        milestone_ids = {milestone.id for milestone in streams["issue_milestones"]}
+
+        assert len(shas) == 600
+        assert all(parent["sha"] in shas for commit in streams["commits"] for parent in commit.parents)
+        assert all(link.sha in shas and (link.repository, link.pull_number) in pr_numbers for link in streams["pull_request_commits"])
+        assert all(issue.milestone is None or issue.milestone["id"] in milestone_ids for issue in streams["issues"])
+
+    def test_transform_consumes_generated_streams(self, read_result):
+        batch = StreamTransformer().collect(read_result)
+
+        authored = sum(1 for commit in read_result.streams["commits"] if commit.author)
+        assert len(batch["repositories"]) == 4
+        assert len(batch["commits"]) == authored
+        assert len(batch["issues"]) == len(read_result.streams["issues"])
+        assert len({user["login"] for user in batch["users"]}) == len(batch["users"])
+
+
+class TestBenchmarkRegressions:
+
+    def test_flags_slower_or_heavier_stages(self):
+        baseline = {"small": {"transform": {"rows_per_sec": 1000, "peak_mb": 10.0}, "load.users": {"rows_per_sec": 100, "peak_mb": None}}}
+        results = {"small": {"transform": {"rows_per_sec": 700, "peak_mb": 13.0}, "load.users": {"rows_per_sec": 95, "peak_mb": None}}}
+
+        found = regressions(results, baseline, tolerance=0.2)
+
+        assert len(found) == 2
+        assert all(message.startswith("small/transform") for message in found)
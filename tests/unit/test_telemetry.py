@@ -0,0 +1,65 @@
+"""
+Testes para a instrumentação (logs amostrados, contadores e resumo) do ETL
+"""
+import json
+import logging
+from unittest.mock import patch
+
+from src.etl.telemetry import Telemetry, logger
+
+
+class TestTelemetry:
+
+    def test_counters_and_stages_are_accumulated(self):
+        telemetry = Telemetry(summary_path="")
+        telemetry.count("issue", "inserted", 2)
+        telemetry.count("issue", "inserted")
+        with telemetry.stage("load.issues", rows=3):
+            pass
+        with telemetry.stage("load.issues", rows=2):
+            pass
+
+        summary = telemetry.summary()
+
+        assert summary["tables"]["issue"]["inserted"] == 3
+        assert summary["stages"]["load.issues"]["rows"] == 5
+        assert summary["stages"]["load.issues"]["calls"] == 2
+
+    def test_row_logs_are_sampled(self):
+        telemetry = Telemetry(sample_every=10, summary_path="")
+        logger.setLevel(logging.DEBUG)
+        try:
+            with patch("src.etl.telemetry.get_logger") as get_logger:
+                for index in range(25):
+                    telemetry.row("commits", "Commit %s", index)
+        finally:
+            logger.setLevel(logging.INFO)
+
+        assert get_logger.return_value.debug.call_count == 3
+
+    def test_row_logs_skipped_without_debug(self):
+        telemetry = Telemetry(sample_every=1, summary_path="")
+        logger.setLevel(logging.INFO)
+        with patch("src.etl.telemetry.get_logger") as get_logger:
+            telemetry.row("commits", "Commit %s", 1)
+
+        get_logger.assert_not_called()
+
+    def test_timed_iter_counts_rows(self):
+        telemetry = Telemetry(summary_path="")
+
+        items = list(telemetry.timed_iter("transform", [[1, 2], [3]], size=len))
+
+        assert items == [[1, 2], [3]]
+        assert telemetry.stages["transform"]["rows"] == 3
+
+    def test_summary_is_written_as_json(self, tmp_path):
+        path = tmp_path / "summary.json"
+        telemetry = Telemetry(summary_path=str(path))
+        telemetry.count("commits", "errors")
+
+        telemetry.write_summary(status="failed")
+
+        summary = json.loads(path.read_text())
+        assert summary["status"] == "failed"
+        assert summary["tables"]["commits"]["errors"] == 1
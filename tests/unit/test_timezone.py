@@ -0,0 +1,28 @@
+"""
+Testes para a normalização vetorizada de fuso horário do ETL
+"""
+import datetime
+import pytest
+import pytz
+
+from src.etl.timezone import localize, localize_many
+
+
+class TestTimezone:
+
+    def test_vectorized_matches_per_row_localize(self):
+        values = [datetime.datetime(2019, 1, 15, 10, 30), datetime.datetime(2023, 7, 1, 23, 59, 59, 123456)]
+
+        result = localize_many(values, "America/Sao_Paulo")
+
+        assert result == [localize(value, "America/Sao_Paulo") for value in values]
+        assert [value.utcoffset() for value in result] == [datetime.timedelta(hours=-2), datetime.timedelta(hours=-3)]
+
+    def test_nonexistent_time_raises_like_pytz(self):
+        # Início do horário de verão de 2018: 00:00 -> 01:00
+        with pytest.raises(pytz.NonExistentTimeError):
+            localize_many([datetime.datetime(2018, 11, 4, 0, 30)], "America/Sao_Paulo")
+
+    def test_nulls_and_empty_batches(self):
+        assert localize_many([]) == []
+        assert localize_many([None], "UTC") == [None]
@@ -0,0 +1,72 @@
+"""
+Testes para o treino incremental do Vanna (Chroma persistente)
+"""
+import json
+from unittest.mock import MagicMock
+
+from src.api.database.training import IncrementalTraining
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = {}
+        self.added = []
+
+    def get(self, include=None):
+        return {"ids": list(self.documents)}
+
+    def add(self, ids, documents):
+        self.added.extend(ids)
+        self.documents.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for item_id in ids:
+            del self.documents[item_id]
+
+
+def fake_vanna():
+    vn = MagicMock()
+    vn.ddl_collection, vn.documentation_collection, vn.sql_collection = FakeCollection(), FakeCollection(), FakeCollection()
+    vn.generate_question.side_effect = lambda sql: f"pergunta para {sql}"
+    return vn
+
+
+def train(vn, ddl, sqls):
+    training = IncrementalTraining(vn)
+    training.add(ddl=ddl)
+    training.add(documentation="Table: commits")
+    for sql in sqls:
+        training.add(sql=sql)
+    return training.sync()
+
+
+class TestIncrementalTraining:
+
+    def test_restart_with_same_items_embeds_nothing(self):
+        vn = fake_vanna()
+
+        assert train(vn, "CREATE TABLE commits ();", ["SELECT 1", "SELECT 2"]) == {"added": 4, "deleted": 0, "kept": 0}
+        assert train(vn, "CREATE TABLE commits ();", ["SELECT 1", "SELECT 2"]) == {"added": 0, "deleted": 0, "kept": 4}
+
+        # A pergunta só é gerada (LLM) para SQLs novos
+        assert vn.generate_question.call_count == 2
+        document = json.loads(vn.sql_collection.documents[vn.sql_collection.added[0]])
+        assert document == {"question": "pergunta para SELECT 1", "sql": "SELECT 1"}
+
+    def test_changed_items_replace_stale_ones(self):
+        vn = fake_vanna()
+        train(vn, "CREATE TABLE commits ();", ["SELECT 1", "SELECT 2"])
+
+        report = train(vn, "CREATE TABLE commits (id bigint);", ["SELECT 1", "SELECT 3"])
+
+        assert report == {"added": 2, "deleted": 2, "kept": 2}
+        assert list(vn.ddl_collection.documents.values()) == ["CREATE TABLE commits (id bigint);"]
+        assert sorted(json.loads(doc)["sql"] for doc in vn.sql_collection.documents.values()) == ["SELECT 1", "SELECT 3"]
+
+    def test_empty_ddl_keeps_the_trained_schema(self):
+        vn = fake_vanna()
+        train(vn, "CREATE TABLE commits ();", ["SELECT 1"])
+
+        train(vn, "", ["SELECT 1"])
+
+        assert list(vn.ddl_collection.documents.values()) == ["CREATE TABLE commits ();"]
@@ -0,0 +1,100 @@
+"""
+Testes para o transform em streaming do ETL
+"""
+import datetime
+import pytest
+from types import SimpleNamespace
+
+from src.etl.transform import StreamTransformer
+
+
+def make_user(user_id, login):
+    return {"id": user_id, "login": login, "html_url": f"https://github.com/{login}"}
+
+
+@pytest.fixture
+def read_result():
+    created_at = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    issue = SimpleNamespace(
+        id=1, title="Issue", body=None, number=1, html_url="url", created_at=created_at, updated_at=created_at,
+        assignees=[], user=make_user(10, "Alice"), repository="Owner/Repo", milestone=None
+    )
+    pull_request = SimpleNamespace(
+        id=2, title="PR", body=None, number=7, html_url="url", created_at=created_at, updated_at=created_at,
+        merged_at=None, state="open", assignees=[], user=make_user(10, "alice"), repository="owner/repo", milestone=None
+    )
+    commit = SimpleNamespace(
+        sha="abc", repository="owner/repo", branch="Main", created_at=created_at, html_url="url",
+        commit={"message": "msg"}, author=make_user(11, "bob"), parents=[]
+    )
+    orphan_commit = SimpleNamespace(
+        sha="def", repository="owner/repo", branch="main", created_at=created_at, html_url="url",
+        commit={"message": "msg"}, author=None, parents=[]
+    )
+    pr_commit = SimpleNamespace(sha="abc", pull_number=7, repository="owner/repo")
+
+    # A ordem das streams no read_result não importa: o transformer segue STREAM_ORDER
+    return SimpleNamespace(streams={
+        "commits": [commit, orphan_commit],
+        "pull_request_commits": [pr_commit],
+        "pull_requests": [pull_request],
+        "issues": [issue],
+    })
+
+
+class TestStreamTransformer:
+
+    def test_collect_dedups_users_repos_and_branches(self, read_result):
+        data = StreamTransformer().collect(read_result)
+
+        assert [user["login"] for user in data["users"]] == ["alice", "bob"]
+        assert data["repositories"] == ["owner/repo"]
+        assert data["branches"] == [{"repository": "owner/repo", "branch": "main"}]
+
+    def test_commit_is_linked_to_pull_request(self, read_result):
+        data = StreamTransformer().collect(read_result)
+
+        assert len(data["commits"]) == 1
+        assert data["commits"][0]["pull_request_id"] == 2
+
+    def test_batches_are_bounded(self, read_result):
+        batches = list(StreamTransformer(batch_size=2).batches(read_result))
+
+        assert all(sum(len(rows) for rows in batch.values()) <= 2 for batch in batches)
+        assert sum(len(batch["commits"]) for batch in batches) == 1
+
+    def test_rows_keep_only_what_the_loaders_need(self, read_result):
+        alice = make_user(10, "Alice")
+        read_result.streams["issues"][0].assignees = [alice]
+        read_result.streams["pull_requests"][0].assignees = [dict(alice)]
+        read_result.streams["issues"][0].milestone = {"id": 99, "title": "v1"}
+        read_result.streams["commits"][0].parents = [{"sha": "p1", "url": "url"}, {"sha": "p2", "url": "url"}]
+
+        data = StreamTransformer().collect(read_result)
+        issue, pull_request, commit = data["issues"][0], data["pull_requests"][0], data["commits"][0]
+
+        assert issue["milestone_id"] == 99 and pull_request["milestone_id"] is None
+        assert issue["assignees"][0] is pull_request["assignees"][0] # Um registro por usuário
+        assert commit["parents"] == ("p1", "p2")
+        assert commit["repository"] is issue["repository"] is data["repositories"][0]
+
+    def test_commits_link_to_pull_requests_of_their_own_repository(self, read_result):
+        other_pr = SimpleNamespace(**{**vars(read_result.streams["pull_requests"][0]), "id": 3, "repository": "owner/other"})
+        other_commit = SimpleNamespace(**{**vars(read_result.streams["commits"][0]), "sha": "xyz", "repository": "owner/other"})
+        read_result.streams["pull_requests"].append(other_pr) # Mesmo número 7 em outro repositório
+        read_result.streams["commits"].append(other_commit)
+        read_result.streams["pull_request_commits"] += [
+            SimpleNamespace(sha="xyz", pull_number=7, repository="Owner/Other"),
+            SimpleNamespace(sha="abc", pull_number=8, repository="owner/repo"), # PR fora do lote
+        ]
+
+        links = {commit["sha"]: (commit["pull_request_id"], commit["pull_number"]) for commit in StreamTransformer().collect(read_result)["commits"]}
+
+        assert links == {"abc": (2, 7), "xyz": (3, 7)}
+
+    def test_pull_request_outside_the_batch_keeps_its_number(self, read_result):
+        read_result.streams.pop("pull_requests") # Ex.: PR sem alteração no modo incremental
+
+        commit = StreamTransformer().collect(read_result)["commits"][0]
+
+        assert commit["pull_request_id"] is None and commit["pull_number"] == 7
@@ -0,0 +1,179 @@
+"""
+Testes para a ingestão de webhooks do GitHub (payloads gravados em fixtures/webhooks)
+"""
+import hmac
+import json
+import queue
+import hashlib
+import datetime
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.etl.webhook_transform import WebhookTransformer, merge_batches
+from src.etl.bulk_loader import BulkLoader
+from src.api.endpoints import webhooks as webhooks_module
+
+FIXTURES = Path(__file__).parent / "fixtures" / "webhooks"
+SECRET = "segredo-de-teste"
+
+
+def fixture_body(event):
+    return (FIXTURES / f"{event}.json").read_bytes()
+
+
+def issue_event(updated_at, title, assignees=None):
+    # Mesmo issue da fixture em outra versão (edição anterior/posterior)
+    payload = json.loads(fixture_body("issues"))
+    payload["issue"].update(updated_at=updated_at, title=title)
+    if assignees is not None:
+        payload["issue"]["assignees"] = assignees
+    return WebhookTransformer().transform("issues", payload)
+
+
+def sign(body, secret=SECRET):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def controller():
+    controller = webhooks_module.webhooks
+    with patch.object(controller, "secret", SECRET), \
+         patch.object(controller, "queue", queue.Queue(maxsize=2)), \
+         patch.object(controller, "start"):
+        yield controller
+
+
+@pytest.fixture
+def client(controller):
+    app = FastAPI()
+    app.include_router(webhooks_module.router)
+    return TestClient(app)
+
+
+class TestWebhookTransformer:
+
+    def test_push_commits_have_no_invented_parents(self):
+        batch = WebhookTransformer().transform("push", json.loads(fixture_body("push")))
+
+        first, second = batch["commits"]
+        assert batch["repositories"] == ["bpthiago/oraculo"]
+        assert batch["branches"] == [{"repository": "bpthiago/oraculo", "branch": "feature-login"}]
+        assert first["user_id"] == 81234567
+        assert first["created_at"] == datetime.datetime(2025, 3, 10, 17, 22, 5)
+        # Autor diferente do sender: id resolvido pelo login na escrita
+        assert second["user_id"] is None and second["author_login"] == "maria-dev"
+        # A ordem do payload não é a cadeia de pais: eles vêm do stream de commits do ETL
+        assert first["parents"] == () and second["parents"] == ()
+
+    def test_issue_event_includes_milestone_and_assignees(self):
+        batch = WebhookTransformer().transform("issues", json.loads(fixture_body("issues")))
+
+        issue = batch["issues"][0]
+        assert issue["milestone_id"] == 11223344
+        assert [user["login"] for user in issue["assignees"]] == ["bpthiago", "maria-dev"]
+        assert batch["milestones"][0]["creator"] == 81234567
+        assert {user["id"] for user in batch["users"]} == {81234567, 91234567}
+
+    def test_pull_request_event(self):
+        batch = WebhookTransformer().transform("pull_request", json.loads(fixture_body("pull_request")))
+
+        pr = batch["pull_requests"][0]
+        assert pr["state"] == "closed" and pr["number"] == 43
+        assert pr["merged_at"] == datetime.datetime(2025, 3, 11, 10, 45, 29)
+        assert batch["milestones"] == []
+
+
+class TestWebhookEndpoint:
+
+    def test_rejects_invalid_signature(self, client, controller):
+        body = fixture_body("issues")
+        response = client.post("/webhooks/github", content=body, headers={"X-GitHub-Event": "issues", "X-Hub-Signature-256": sign(body, "outro")})
+
+        assert response.status_code == 401
+        assert controller.queue.empty()
+
+    def test_queues_signed_event(self, client, controller):
+        body = fixture_body("pull_request")
+        response = client.post("/webhooks/github", content=body, headers={"X-GitHub-Event": "pull_request", "X-Hub-Signature-256": sign(body)})
+
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        assert controller.queue.get_nowait()["pull_requests"][0]["id"] == 2345678901
+
+    def test_full_queue_returns_503(self, client, controller):
+        body = fixture_body("push")
+        headers = {"X-GitHub-Event": "push", "X-Hub-Signature-256": sign(body)}
+        statuses = [client.post("/webhooks/github", content=body, headers=headers).status_code for _ in range(3)]
+
+        assert statuses == [202, 202, 503]
+
+    def test_ignores_unsupported_events(self, client):
+        body = b'{"zen": "Keep it logically awesome."}'
+        response = client.post("/webhooks/github", content=body, headers={"X-GitHub-Event": "star", "X-Hub-Signature-256": sign(body)})
+
+        assert response.json()["status"] == "ignored"
+
+
+class TestWebhookWrites:
+
+    def test_drain_writes_queued_events_in_one_batch(self, controller):
+        for event in ["issues", "pull_request"]:
+            controller.receive(event, fixture_body(event), sign(fixture_body(event)))
+
+        data_version = MagicMock()
+        with patch("src.api.controller.WebhookController.BulkLoader") as loader_class, \
+             patch.object(controller, "engine", MagicMock()), \
+             patch.object(controller, "data_version", data_version):
+            loader_class.return_value.load_batch.return_value = True
+            controller.drain()
+
+        loader_class.return_value.load_batch.assert_called_once()
+        batch = loader_class.return_value.load_batch.call_args[0][0]
+        assert len(batch["issues"]) == 1 and len(batch["pull_requests"]) == 1
+        assert controller.queue.empty()
+        data_version.bump.assert_called_once_with("webhook")
+
+    def test_resolve_authors_skips_unknown_logins(self):
+        engine = MagicMock()
+        engine.raw_connection.return_value.cursor.return_value.fetchall.return_value = [("maria-dev", 91234567)]
+        commits = [
+            {"sha": "a", "user_id": 1, "author_login": "bpthiago"},
+            {"sha": "b", "user_id": None, "author_login": "maria-dev"},
+            {"sha": "c", "user_id": None, "author_login": "desconhecido"},
+        ]
+
+        resolved = BulkLoader(engine, localize=list).resolve_authors(commits)
+
+        assert [(commit["sha"], commit["user_id"]) for commit in resolved] == [("a", 1), ("b", 91234567)]
+
+
+class TestWebhookWritesDatabase:
+
+    def stored_issue(self, db):
+        with db.connect() as connection:
+            title = connection.execute(text("SELECT title FROM issue")).scalar_one()
+            assignees = connection.execute(text("SELECT count(*) FROM issue_assignees")).scalar_one()
+        return title, assignees
+
+    def test_redelivered_older_event_does_not_overwrite_a_newer_one(self, db):
+        newer = issue_event("2025-03-10T19:02:11Z", "versão nova")
+        older = issue_event("2025-03-10T18:00:00Z", "versão antiga", assignees=[])
+
+        assert BulkLoader(db, localize=list).load_batch(newer)
+        assert BulkLoader(db, localize=list).load_batch(older)
+
+        assert self.stored_issue(db) == ("versão nova", 2)
+
+    def test_out_of_order_events_in_one_batch_keep_the_newest(self, db):
+        batch = merge_batches([
+            issue_event("2025-03-10T19:02:11Z", "versão nova"),
+            issue_event("2025-03-10T18:00:00Z", "versão antiga", assignees=[]),
+        ])
+
+        assert BulkLoader(db, localize=list).load_batch(batch)
+
+        assert self.stored_issue(db) == ("versão nova", 2)